@@ -15,4 +15,7 @@ poetry install --no-root --no-interaction
 poetry run python manage.py collectstatic --noinput
 
 # Apply migrations
-poetry run python manage.py migrate
\ No newline at end of file
+poetry run python manage.py migrate
+
+# Demo data and the superuser on a fresh database (no-op once rooms exist)
+poetry run python manage.py seed_demo_data
@@ -7,3 +7,10 @@ class ChatcampusappConfig(AppConfig):
 
     def ready(self):
         import chatcampusapp.signals
+        from django.db.backends.signals import connection_created
+        from chatcampusapp.utils.query_budget import install_query_counting
+        from chatcampusapp.utils.tracing import install_query_tracing
+        connection_created.connect(install_query_counting, dispatch_uid="query_budget_install_query_counting")
+        connection_created.connect(install_query_tracing, dispatch_uid="tracing_install_query_tracing")
+        from chatcampusapp.channel_serializers import register
+        register()
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import time
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .db_routers import areplica_reads
+from .models import Room
+from .payloads import ahomepage_payload, auser_profile_payload, compressed_room_detail_payload
+from .tasks import warm_up_dashboard_view_cache, warm_up_room_detail_view_cache, warm_up_user_profile_view_cache
+from .utils import async_cache, codec, redis_tracking, search_admission
+from .utils.auth_cache import aactive_user_id
+from .utils.json_stream import CompressedJSON, CompressedJSONResponse
+from .utils.room_events import room_events_since, room_group_name
+from .utils.search import normalize_query
+from .views import HomePageAPIView, RoomDetailMessageCreateAPIView, UserProfileAPIView
+
+logger = logging.getLogger("dashboard")
+User = get_user_model()
+
+# Non-GET requests to the async read endpoints go to the DRF views
+sync_homepage_view = HomePageAPIView.as_view()
+sync_room_detail_view = RoomDetailMessageCreateAPIView.as_view()
+sync_user_profile_view = UserProfileAPIView.as_view()
+
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MILLISECONDS = 3000
+
+
+async def authenticate_request(request, allow_query_token=True):
+    """
+    Resolve the id of an active user from a JWT in the Authorization header,
+    or from the `token` query parameter since EventSource cannot set headers.
+    """
+    jwt_auth = JWTAuthentication()
+    try:
+        header = jwt_auth.get_header(request)
+        raw_token = jwt_auth.get_raw_token(header) if header else None
+        if not raw_token and allow_query_token:
+            raw_token = request.GET.get("token")
+        if not raw_token:
+            return None
+        # Signature and expiry checks are CPU only; the active-user check is cached
+        validated_token = jwt_auth.get_validated_token(raw_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except (AuthenticationFailed, InvalidToken, KeyError):
+        return None
+    return await aactive_user_id(user_id)
+
+
+def unauthenticated_response():
+    response = JsonResponse({
+        "detail": "Authentication credentials were not provided."
+    }, status=401)
+    response["WWW-Authenticate"] = JWTAuthentication().authenticate_header(None)
+    return response
+
+
+def json_response(data, status=200):
+    response = HttpResponse(codec.dumps(data), status=status, content_type="application/json")
+    # Like DRF's Response.data, which the API tests read
+    response.data = data
+    return response
+
+
+def format_sse(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {codec.dumps_text(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def room_event_to_sse(event):
+    # Same payloads as the ChatRoom WebSocket frames
+    if event["type"] == "chat_message":
+        data = {"type": "chat_message", "message": event["message"]}
+    elif event["type"] == "chat_message_delete":
+        data = {"type": "chat_message_delete", "message_id": event["message_id"]}
+    else:
+        return None
+    return format_sse(data, event=event["type"], event_id=event.get("event_id"))
+
+
+async def room_event_stream(room_id, last_event_id):
+    channel_layer = get_channel_layer()
+    group_name = room_group_name(room_id)
+    channel_name = await channel_layer.new_channel()
+    # Join the group before reading the replay log so nothing falls in between
+    await channel_layer.group_add(group_name, channel_name)
+    try:
+        yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+        # Live events at or below the newest replayed id repeat the replay (the
+        # log is in id order). Nothing else is skipped: broadcasts from
+        # different workers can arrive out of id order.
+        replayed_up_to = last_event_id
+        if last_event_id is not None:
+            events, complete = await sync_to_async(room_events_since)(room_id, last_event_id)
+            if not complete:
+                # The client missed more than the log holds; it must refetch the room
+                yield format_sse({"type": "resync"}, event="resync")
+            for event in events:
+                yield room_event_to_sse(event)
+                replayed_up_to = max(replayed_up_to, event["event_id"])
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    channel_layer.receive(channel_name), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            event_id = event.get("event_id")
+            if replayed_up_to is not None and event_id is not None and event_id <= replayed_up_to:
+                continue
+            payload = room_event_to_sse(event)
+            if payload:
+                yield payload
+    finally:
+        await channel_layer.group_discard(group_name, channel_name)
+
+
+# Server-sent events fallback for clients that cannot open a WebSocket
+@require_GET
+async def room_events_view(request, pk):
+    user_id = await authenticate_request(request)
+    if user_id is None:
+        return unauthenticated_response()
+
+    if not await Room.objects.filter(id=pk).aexists():
+        return JsonResponse({"detail": "No Room matches the given query."}, status=404)
+
+    last_event_id = request.headers.get(
+        "Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        room_event_stream(pk, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    # Keeps GZipMiddleware from buffering the stream into separate gzip members
+    response["Content-Encoding"] = "identity"
+    return response
+
+
+# Async versions of the read endpoints in views.py, used when
+# settings.ASYNC_READ_VIEWS is on. Cache hits never leave the event loop;
+# misses build the same payloads with the async ORM.
+async def cached_read(request, cache_key, build, warm_up, warm_up_arg, popularity_key, admit=None):
+    user_id = await authenticate_request(request, allow_query_token=False)
+    if user_id is None:
+        return unauthenticated_response()
+    data = await async_cache.aget(cache_key)
+    if not data:
+        async with areplica_reads(user_id):
+            data = await build()
+        if data is None:
+            return None
+        if admit is None or await admit():
+            await sync_to_async(warm_up.delay)(warm_up_arg)
+    await redis_tracking.atrack(popularity_key, warm_up_arg)
+    if isinstance(data, CompressedJSON):
+        return CompressedJSONResponse(data, request)
+    return json_response(data)
+
+
+@csrf_exempt
+async def homepage_view(request):
+    if request.method != "GET":
+        return await sync_to_async(sync_homepage_view)(request)
+    t0 = time.perf_counter()
+    q = normalize_query(request.GET.get("q", ""))
+    cache_key = f'homepage_cache_{q}' if q else 'homepage_cache'
+    # Search pages are only cached once the query repeats
+    admit = (lambda: search_admission.aadmit(q)) if q else None
+    response = await cached_read(request, cache_key, lambda: ahomepage_payload(q, request),
+                                 warm_up_dashboard_view_cache, q, redis_tracking.POPULAR_QUERIES, admit)
+    logger.info("Dashboard async %.0f ms", (time.perf_counter()-t0)*1000)
+    return response
+
+
+@csrf_exempt
+async def room_detail_view(request, pk):
+    # Posting a message stays on the DRF view
+    if request.method != "GET":
+        return await sync_to_async(sync_room_detail_view)(request, pk=pk)
+    # Streamed into a compressed buffer in one worker thread rather than
+    # holding every message as a dict on the event loop
+    build = sync_to_async(compressed_room_detail_payload)
+    response = await cached_read(request, f"RoomID{pk}", lambda: build(pk, request),
+                                 warm_up_room_detail_view_cache, pk, redis_tracking.POPULAR_ROOMS)
+    if response is None:
+        return JsonResponse({"detail": "No Room matches the given query."}, status=404)
+    return response
+
+
+@csrf_exempt
+async def user_profile_view(request, pk):
+    if request.method != "GET":
+        return await sync_to_async(sync_user_profile_view)(request, pk=pk)
+    t0 = time.perf_counter()
+    response = await cached_read(request, f"UserID{pk}", lambda: auser_profile_payload(pk, request),
+                                 warm_up_user_profile_view_cache, pk, redis_tracking.POPULAR_USERS)
+    if response is None:
+        return JsonResponse({"detail": "No User matches the given query."}, status=404)
+    logger.info("UserProfile async %.0f ms", (time.perf_counter()-t0)*1000)
+    return response
+
+
+# QueryBudgetMiddleware looks budgets up on the resolved view; these serve the
+# same routes and payloads as the DRF views (other methods are delegated)
+homepage_view.query_budget = HomePageAPIView.query_budget
+room_detail_view.query_budget = RoomDetailMessageCreateAPIView.query_budget
+user_profile_view.query_budget = UserProfileAPIView.query_budget
@@ -0,0 +1,63 @@
+import json
+import os
+import resource
+
+# Benchmark name -> module. Modules keep their Django imports inside run() so
+# the `benchmark` command stays cheap to load.
+BENCHMARKS = {
+    "cachecodec": "chatcampusapp.benchmarks.cachecodec",
+    "chatroom": "chatcampusapp.benchmarks.chatroom",
+    "endpoints": "chatcampusapp.benchmarks.endpoints",
+    "imports": "chatcampusapp.benchmarks.imports",
+    "readpath": "chatcampusapp.benchmarks.readpath",
+    "rendering": "chatcampusapp.benchmarks.rendering",
+    "search": "chatcampusapp.benchmarks.search",
+    "serializers": "chatcampusapp.benchmarks.serializers",
+}
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_samples))) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def summarize(samples):
+    """Summary statistics for a list of latency samples (milliseconds)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def rss_bytes(pid=None):
+    """Resident set size of `pid` (default: this process) in bytes."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid:
+        return None
+    # ru_maxrss is the peak, in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def write_report(report, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as fp:
+        json.dump(report, fp, indent=2, sort_keys=True, default=str)
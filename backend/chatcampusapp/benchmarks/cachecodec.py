@@ -0,0 +1,106 @@
+"""Redis memory and GET latency of cached payloads per cache format.
+
+Builds real homepage, room detail (rooms closest to --room-sizes messages)
+and user profile payloads, then for each --formats entry stores them in
+Redis under scratch keys and measures encoded size, MEMORY USAGE, encode and
+decode time, and GET plus decode latency. "pickle" is django-redis's default
+serializer, i.e. the state before CodecSerializer.
+"""
+import time
+
+from chatcampusapp.benchmarks import summarize
+
+FORMATS = ["pickle", "json", "json+zlib", "msgpack", "msgpack+zlib", "msgpack+zstd", "msgpack+lz4"]
+SCRATCH_PREFIX = "benchmark:cachecodec:"
+
+
+def add_arguments(parser):
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--room-sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--min-bytes", type=int, default=1024,
+                        help="CACHE_COMPRESS_MIN_BYTES for the compressed formats.")
+    parser.add_argument("--repeat", type=int, default=50)
+
+
+def payloads(room_sizes):
+    from django.db.models import Count
+    from chatcampusapp.benchmarks.endpoints import rooms_by_size
+    from chatcampusapp.models import User
+    from chatcampusapp.payloads import homepage_payload, room_detail_payload, user_profile_payload
+
+    rooms = rooms_by_size(room_sizes)
+    if not rooms:
+        raise SystemExit("Needs rooms with messages; run generate_data first.")
+    user = User.objects.annotate(rooms=Count("room_owner")).order_by("-rooms").first()
+    built = {"homepage_cache": homepage_payload(""), f"UserID{user.id}": user_profile_payload(user.id)}
+    for room_id, _ in rooms.values():
+        built[f"RoomID{room_id}"] = room_detail_payload(room_id)
+    return built
+
+
+def serializer_for(name, min_bytes):
+    from django.test import override_settings
+    from django_redis.serializers.pickle import PickleSerializer
+    from chatcampusapp.cache_serializers import COMPRESSORS, CodecSerializer
+
+    if name == "pickle":
+        return PickleSerializer({}), override_settings()
+    cache_format, _, compressor = name.partition("+")
+    if compressor and not COMPRESSORS[compressor][3]:
+        return None, None
+    return CodecSerializer({}), override_settings(
+        CACHE_FORMAT=cache_format, CACHE_COMPRESSOR=compressor or "none",
+        CACHE_COMPRESS_MIN_BYTES=min_bytes)
+
+
+def measure(connection, key, serializer, payload, repeat):
+    from redis.exceptions import ResponseError
+
+    # CodecSerializer's payload format, as InstrumentedClient stores these keys
+    dumps = getattr(serializer, "dumps_payload", serializer.dumps)
+    started = time.perf_counter()
+    stored = dumps(payload)
+    encode_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    serializer.loads(stored)
+    decode_ms = (time.perf_counter() - started) * 1000
+
+    connection.set(key, stored)
+    try:
+        redis_bytes = connection.memory_usage(key)
+    except ResponseError:
+        redis_bytes = None  # servers without MEMORY USAGE
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serializer.loads(connection.get(key))
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.delete(key)
+    return {
+        "bytes": len(stored),
+        "redis_bytes": redis_bytes,
+        "encode_ms": round(encode_ms, 3),
+        "decode_ms": round(decode_ms, 3),
+        "get_ms": summarize(latencies),
+    }
+
+
+def run(stdout, options):
+    from django_redis import get_redis_connection
+
+    connection = get_redis_connection("default")
+    built = payloads(options["room_sizes"])
+    results = {}
+    for name in options["formats"]:
+        serializer, settings_override = serializer_for(name, options["min_bytes"])
+        if serializer is None:
+            stdout.write(f"{name}: compressor not installed, skipped")
+            continue
+        with settings_override:
+            results[name] = {key: measure(connection, SCRATCH_PREFIX + key, serializer, payload,
+                                          options["repeat"])
+                             for key, payload in built.items()}
+        total = sum(entry["bytes"] for entry in results[name].values())
+        get_p50 = sum(entry["get_ms"]["p50"] for entry in results[name].values())
+        stdout.write(f"{name}: {total:,} bytes for {len(built)} payloads, GET+decode p50 sum {get_p50:.3f} ms")
+    return {"payloads": sorted(built), "formats": results}
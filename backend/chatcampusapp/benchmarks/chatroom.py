@@ -0,0 +1,288 @@
+"""Load test the ChatRoom WebSocket consumer with simulated clients.
+
+Each client authenticates with a locally minted JWT, then drives a mix of
+`send_message` and `delete_message` actions. Broadcast latency is measured
+at every receiving client from the moment the action was sent.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from chatcampusapp.benchmarks import rss_bytes, summarize
+
+LOADTEST_TOPIC = "Load Testing"
+BODY_PREFIX = "loadtest"
+
+
+def add_arguments(parser):
+    parser.add_argument("--clients", type=int, default=50,
+                        help="Number of simulated WebSocket clients.")
+    parser.add_argument("--rooms", type=int, default=1,
+                        help="Number of rooms the clients are spread across.")
+    parser.add_argument("--messages", type=int, default=20,
+                        help="Actions sent by each client.")
+    parser.add_argument("--delete-ratio", type=float, default=0.1,
+                        help="Fraction of actions that delete one of the client's own messages.")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="Actions per second per client (0 sends as fast as possible).")
+    parser.add_argument("--url",
+                        help="Base URL of a running daphne/uvicorn server, e.g. ws://127.0.0.1:8000. "
+                             "Without it the ASGI application is driven in-process.")
+    parser.add_argument("--server-pid", type=int,
+                        help="PID of the server process whose RSS is reported when --url is used.")
+    parser.add_argument("--connect-timeout", type=float, default=10)
+    parser.add_argument("--drain-timeout", type=float, default=10,
+                        help="Seconds to wait for outstanding broadcasts after sending stops.")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def prepare_fixtures(clients, rooms):
+    """Create (or reuse) load test users and rooms, and mint their tokens."""
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+    from chatcampusapp.models import Room, Topic
+    from chatcampusapp.utils.topics import adjust_topic_room_count
+
+    User = get_user_model()
+    emails = [f"{BODY_PREFIX}{i}@example.com" for i in range(clients)]
+    # bulk_create skips post_save, so fixture setup does not trigger cache warming
+    User.objects.bulk_create(
+        [User(email=email, first_name=email.split("@")[0]) for email in emails],
+        ignore_conflicts=True)
+    users = {user.email: user for user in User.objects.filter(email__in=emails)}
+
+    topic, _ = Topic.objects.get_or_create(topic_name=LOADTEST_TOPIC)
+    room_names = [f"Load test room {i}" for i in range(rooms)]
+    existing = set(Room.objects.filter(
+        topic=topic, room_name__in=room_names).values_list("room_name", flat=True))
+    Room.objects.bulk_create([
+        Room(room_name=name, room_description="Load test room",
+             topic=topic, owner=users[emails[0]])
+        for name in room_names if name not in existing
+    ])
+    adjust_topic_room_count(topic.id, rooms - len(existing))
+    room_ids = list(Room.objects.filter(
+        topic=topic, room_name__in=room_names).order_by("id").values_list("id", flat=True))
+
+    tokens = [(users[email].id, str(AccessToken.for_user(users[email])))
+              for email in emails]
+    return tokens, room_ids
+
+
+class InProcessConnection:
+    def __init__(self, path):
+        from channels.testing import WebsocketCommunicator
+        from chatcampuspro.asgi import application
+        self.communicator = WebsocketCommunicator(application, path)
+
+    async def connect(self, timeout):
+        connected, code = await self.communicator.connect(timeout)
+        if not connected:
+            raise ConnectionError(f"Connection rejected with code {code}")
+
+    async def send(self, text):
+        await self.communicator.send_to(text_data=text)
+
+    async def recv(self, timeout=None):
+        # A communicator timeout cancels the application, so idle receivers
+        # wait "forever" and are cancelled by the driver instead.
+        return await self.communicator.receive_from(timeout or 3600)
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class RemoteConnection:
+    def __init__(self, url):
+        self.url = url
+        self.websocket = None
+
+    async def connect(self, timeout):
+        from websockets.asyncio.client import connect
+        self.websocket = await asyncio.wait_for(connect(self.url), timeout)
+
+    async def send(self, text):
+        await self.websocket.send(text)
+
+    async def recv(self, timeout=None):
+        return await asyncio.wait_for(self.websocket.recv(), timeout)
+
+    async def close(self):
+        await self.websocket.close()
+
+
+class LoadStats:
+    def __init__(self):
+        self.connect_ms = []
+        self.broadcast_ms = []
+        self.delete_ms = []
+        self.sent_at = {}
+        self.delete_sent_at = {}
+        self.sent = 0
+        self.deleted = 0
+        self.errors = 0
+        self.deliveries = 0
+        self.expected_deliveries = 0
+        self.peak_rss = 0
+
+    async def drained(self, timeout):
+        deadline = time.perf_counter() + timeout
+        while self.deliveries < self.expected_deliveries and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+
+class SimulatedClient:
+    def __init__(self, index, room_id, token, connection, stats):
+        self.index = index
+        self.room_id = room_id
+        self.token = token
+        self.connection = connection
+        self.stats = stats
+        self.room_size = 0
+        self.pending_bodies = set()
+        self.own_message_ids = []
+
+    async def connect(self, timeout):
+        started = time.perf_counter()
+        await self.connection.connect(timeout)
+        await self.expect("connection_established", timeout)
+        await self.connection.send(json.dumps({"action": "Auth_Check", "token": self.token}))
+        await self.expect("auth_success", timeout)
+        self.stats.connect_ms.append((time.perf_counter() - started) * 1000)
+
+    async def expect(self, frame_type, timeout):
+        while True:
+            data = self.handle(await self.connection.recv(timeout))
+            if data.get("type") == frame_type:
+                return data
+
+    async def receive_loop(self):
+        while True:
+            self.handle(await self.connection.recv())
+
+    async def send_loop(self, actions, delete_ratio, interval, rng):
+        for seq in range(actions):
+            self.stats.expected_deliveries += self.room_size
+            if self.own_message_ids and rng.random() < delete_ratio:
+                message_id = self.own_message_ids.pop(
+                    rng.randrange(len(self.own_message_ids)))
+                self.stats.delete_sent_at[message_id] = time.perf_counter()
+                self.stats.deleted += 1
+                await self.connection.send(json.dumps({
+                    "action": "delete_message", "message_id": message_id}))
+            else:
+                body = f"{BODY_PREFIX} {self.index}:{seq}"
+                self.pending_bodies.add(body)
+                self.stats.sent_at[body] = time.perf_counter()
+                self.stats.sent += 1
+                await self.connection.send(json.dumps({
+                    "action": "send_message", "body": body}))
+            await asyncio.sleep(interval)
+
+    def handle(self, frame):
+        now = time.perf_counter()
+        data = json.loads(frame)
+        frame_type = data.get("type")
+        if frame_type == "chat_message":
+            message = data["message"]
+            body = message.get("body")
+            sent_at = self.stats.sent_at.get(body)
+            if sent_at is not None:
+                self.stats.broadcast_ms.append((now - sent_at) * 1000)
+                self.stats.deliveries += 1
+            if body in self.pending_bodies:
+                self.pending_bodies.discard(body)
+                self.own_message_ids.append(message["id"])
+        elif frame_type == "chat_message_delete":
+            sent_at = self.stats.delete_sent_at.get(data.get("message_id"))
+            if sent_at is not None:
+                self.stats.delete_ms.append((now - sent_at) * 1000)
+                self.stats.deliveries += 1
+        elif frame_type == "error":
+            self.stats.errors += 1
+        return data
+
+
+async def sample_rss(pid, stats):
+    while True:
+        stats.peak_rss = max(stats.peak_rss, rss_bytes(pid) or 0)
+        await asyncio.sleep(0.5)
+
+
+async def drive(tokens, room_ids, options, stdout):
+    stats = LoadStats()
+    rng = random.Random(options["seed"])
+    url = options["url"]
+    pid = options["server_pid"] if url else None
+
+    clients = []
+    for index, (_, token) in enumerate(tokens):
+        room_id = room_ids[index % len(room_ids)]
+        path = f"/ws/chat/{room_id}/"
+        connection = (RemoteConnection(url.rstrip("/") + path) if url
+                      else InProcessConnection(path))
+        clients.append(SimulatedClient(index, room_id, token, connection, stats))
+
+    rss_before = rss_bytes(pid)
+    sampler = asyncio.create_task(sample_rss(pid, stats))
+
+    results = await asyncio.gather(
+        *(client.connect(options["connect_timeout"]) for client in clients),
+        return_exceptions=True)
+    connected = [client for client, result in zip(clients, results)
+                 if not isinstance(result, BaseException)]
+    stdout.write(f"Connected {len(connected)}/{len(clients)} clients")
+
+    room_sizes = Counter(client.room_id for client in connected)
+    for client in connected:
+        client.room_size = room_sizes[client.room_id]
+
+    receivers = [asyncio.create_task(client.receive_loop())
+                 for client in connected]
+    interval = 1 / options["rate"] if options["rate"] else 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client.send_loop(options["messages"], options["delete_ratio"], interval, rng)
+        for client in connected))
+    send_elapsed = time.perf_counter() - started
+    await stats.drained(options["drain_timeout"])
+    total_elapsed = time.perf_counter() - started
+
+    for receiver in receivers:
+        receiver.cancel()
+    await asyncio.gather(*receivers, return_exceptions=True)
+    await asyncio.gather(*(client.connection.close() for client in connected),
+                         return_exceptions=True)
+    sampler.cancel()
+    rss_after = rss_bytes(pid)
+
+    actions = stats.sent + stats.deleted
+    return {
+        "mode": "remote" if url else "in-process",
+        "clients": len(clients),
+        "connected": len(connected),
+        "rooms": len(room_ids),
+        "actions": {"sent": stats.sent, "deleted": stats.deleted, "errors": stats.errors},
+        "connect_latency_ms": summarize(stats.connect_ms),
+        "broadcast_latency_ms": summarize(stats.broadcast_ms),
+        "delete_broadcast_latency_ms": summarize(stats.delete_ms),
+        "throughput": {
+            "actions_per_sec": round(actions / send_elapsed, 2) if send_elapsed else None,
+            "deliveries_per_sec": round(stats.deliveries / total_elapsed, 2) if total_elapsed else None,
+            "deliveries": stats.deliveries,
+            "expected_deliveries": stats.expected_deliveries,
+        },
+        "server_rss_bytes": {
+            "before": rss_before,
+            "after": rss_after,
+            "peak": max(stats.peak_rss, rss_after or 0),
+        },
+    }
+
+
+def run(stdout, options):
+    tokens, room_ids = prepare_fixtures(options["clients"], options["rooms"])
+    return asyncio.run(drive(tokens, room_ids, options, stdout))
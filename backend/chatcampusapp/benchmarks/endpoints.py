@@ -0,0 +1,219 @@
+"""Latency, queries and allocations per request for the REST endpoints.
+
+Runs each scenario --repeat times through the full middleware stack with the
+Django test client, against whatever the database holds (see generate_data):
+homepage cold/warm with and without ?q=, room details for rooms closest to
+--room-sizes messages, user profile, topic list, message create/delete and
+room create. A second, shorter pass under tracemalloc measures allocations.
+
+--save-baseline writes the results for later runs; --baseline compares with
+them and fails the command on regressions beyond --threshold.
+"""
+import json
+import time
+import tracemalloc
+import uuid
+
+from chatcampusapp.benchmarks import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--alloc-repeat", type=int, default=10,
+                        help="Requests per scenario in the tracemalloc pass.")
+    parser.add_argument("--room-sizes", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="Benchmark the rooms whose message counts are closest to these.")
+    parser.add_argument("--query", default="python", help="Search term for the ?q= homepage scenarios.")
+    parser.add_argument("--scenarios", nargs="+", help="Only run scenarios starting with these names.")
+    parser.add_argument("--baseline", help="Compare against this baseline (or benchmark --json report).")
+    parser.add_argument("--save-baseline", help="Write these results as a baseline file.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative slowdown of p50/p95 latency and allocations.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore latency changes smaller than this, whatever the ratio.")
+
+
+class Scenario:
+    """
+    `prepare()` runs untimed before every request and returns (method, path,
+    data); `cleanup()` runs once after the scenario.
+    """
+
+    def __init__(self, name, prepare, cleanup=None):
+        self.name = name
+        self.prepare = prepare
+        self.cleanup = cleanup or (lambda: None)
+
+
+def rooms_by_size(sizes):
+    """{target size: (room id, message count)} for the closest existing rooms."""
+    from django.db.models import Count
+    from chatcampusapp.models import Message
+
+    counts = list(Message.objects.order_by().values_list("room").annotate(n=Count("id")))
+    chosen = {}
+    for size in sizes:
+        if counts:
+            chosen[size] = min(counts, key=lambda row: abs(row[1] - size))
+    return chosen
+
+
+def build_scenarios(options):
+    from django.core.cache import cache
+    from django.db.models import Count
+    from chatcampusapp.models import Message, Room, Topic, User
+    from chatcampusapp.utils.search import normalize_query
+
+    rooms = rooms_by_size(options["room_sizes"])
+    if not rooms:
+        raise SystemExit("Needs rooms with messages; run generate_data first.")
+    # The busiest owner, so the profile page is the expensive kind
+    user = User.objects.annotate(rooms=Count("room_owner")).order_by("-rooms").first()
+    room_id = rooms[min(rooms)][0]
+    topic = Topic.objects.order_by("-room_count").values_list("topic_name", flat=True).first() or "Python"
+    q = normalize_query(options["query"])
+
+    def get(path, *keys):
+        def prepare():
+            cache.delete_many(keys)
+            return "get", path, None
+        return prepare
+
+    def create_message():
+        return "post", f"/api/roomDetails/{room_id}/", {"body": f"Benchmark message {uuid.uuid4().hex}"}
+
+    def delete_message():
+        message = Message.objects.create(owner=user, room_id=room_id, body="Benchmark message to delete")
+        return "delete", f"/api/messageDelete/{message.id}/", None
+
+    def create_room():
+        return "post", "/api/rooms/", {"topic": topic, "room_name": f"Benchmark room {uuid.uuid4().hex[:8]}",
+                                       "room_description": "Created by the endpoints benchmark."}
+
+    def remove_created():
+        Message.objects.filter(room_id=room_id, body__startswith="Benchmark message").delete()
+        Room.objects.filter(owner=user, room_name__startswith="Benchmark room").delete()
+
+    scenarios = [
+        Scenario("homepage_cold", get("/api/", "homepage_cache")),
+        Scenario("homepage_warm", get("/api/")),
+        Scenario("homepage_q_cold", get(f"/api/?q={q}", f"homepage_cache_{q}")),
+        Scenario("homepage_q_warm", get(f"/api/?q={q}")),
+    ]
+    for size, (room, messages) in sorted(rooms.items()):
+        scenarios += [
+            Scenario(f"room_detail_{size}_cold", get(f"/api/roomDetails/{room}/", f"RoomID{room}")),
+            Scenario(f"room_detail_{size}_warm", get(f"/api/roomDetails/{room}/")),
+        ]
+    scenarios += [
+        Scenario("user_profile_cold", get(f"/api/user/profile/{user.id}/", f"UserID{user.id}")),
+        Scenario("topic_list", get("/api/topics/")),
+        Scenario("message_create", create_message, remove_created),
+        Scenario("message_delete", delete_message, remove_created),
+        Scenario("room_create", create_room, remove_created),
+    ]
+    if options["scenarios"]:
+        scenarios = [s for s in scenarios if s.name.startswith(tuple(options["scenarios"]))]
+    context = {"user_id": user.id, "rooms": {size: {"id": room, "messages": messages}
+                                             for size, (room, messages) in rooms.items()}}
+    return user, scenarios, context
+
+
+def request(client, headers, method, path, data):
+    if data is None:
+        return getattr(client, method)(path, **headers)
+    return getattr(client, method)(path, data=json.dumps(data), content_type="application/json", **headers)
+
+
+def measure(client, headers, scenario, repeat, alloc_repeat):
+    from chatcampusapp.utils.query_budget import QueryCounter
+
+    # Untimed warm-up: connections, imports, and the cache for *_warm scenarios
+    for _ in range(2):
+        request(client, headers, *scenario.prepare())
+
+    latencies, queries, statuses = [], [], set()
+    for _ in range(repeat):
+        method, path, data = scenario.prepare()
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            response = request(client, headers, method, path, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        statuses.add(response.status_code)
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_repeat):
+            method, path, data = scenario.prepare()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            request(client, headers, method, path, data)
+            allocations.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+    scenario.cleanup()
+    return {
+        "latency_ms": summarize(latencies),
+        "queries": max(queries),
+        "peak_alloc_kb": round(sum(allocations) / len(allocations), 1) if allocations else None,
+        "statuses": sorted(statuses),
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Regressions of `results` against `baseline`, as readable strings."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not isinstance(previous, dict) or "latency_ms" not in previous:
+            continue
+        for stat in ("p50", "p95"):
+            old, new = previous["latency_ms"].get(stat), current["latency_ms"].get(stat)
+            if old and new and new > old * (1 + threshold) and new - old >= min_delta_ms:
+                regressions.append(f"{name}: {stat} {old} ms -> {new} ms")
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: {previous['queries']} -> {current['queries']} queries")
+        old, new = previous.get("peak_alloc_kb"), current["peak_alloc_kb"]
+        if old and new and new > old * (1 + threshold):
+            regressions.append(f"{name}: peak allocations {old} KiB -> {new} KiB")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as fp:
+        data = json.load(fp)
+    # Accept a full `benchmark --json` report as well as a saved baseline
+    data = data.get("results", data)
+    return data.get("scenarios", data)
+
+
+def run(stdout, options):
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    from chatcampusapp.benchmarks import write_report
+
+    with override_settings(SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=["*"]):
+        user, scenarios, context = build_scenarios(options)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+        client = Client()
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = measure(client, headers, scenario,
+                                             options["repeat"], options["alloc_repeat"])
+            latency = results[scenario.name]["latency_ms"]
+            stdout.write(f"{scenario.name}: p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                         f"{results[scenario.name]['queries']} queries, "
+                         f"{results[scenario.name]['peak_alloc_kb']} KiB")
+
+    report = {**context, "scenarios": results}
+    if options["save_baseline"]:
+        write_report(report, options["save_baseline"])
+        stdout.write(f"Baseline written to {options['save_baseline']}")
+    if options["baseline"]:
+        report["regressions"] = compare(results, load_baseline(options["baseline"]),
+                                        options["threshold"], options["min_delta_ms"])
+        for regression in report["regressions"]:
+            stdout.write(f"REGRESSION {regression}")
+    return report
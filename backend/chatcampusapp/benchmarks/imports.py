@@ -0,0 +1,95 @@
+"""Import time of the ASGI app, the Celery worker and plain Django setup.
+
+Each target is imported --repeat times in a fresh `python -X importtime`
+process using the current settings module. The report gives the median total
+import time and wall-clock start-up, the packages that cost the most, and the
+slowest chatcampusapp modules. --budget-ms and --forbid turn cold-start
+growth and heavy imports creeping back into start-up into regressions.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+TARGETS = {
+    "asgi": "from chatcampuspro.asgi import application",
+    # What `celery -A chatcampuspro worker` imports before taking tasks
+    "celery": ("import django; django.setup(); from chatcampuspro.celery import app; "
+               "app.loader.import_default_modules()"),
+    "django": "import django; django.setup()",
+}
+
+
+def add_arguments(parser):
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list per target.")
+    parser.add_argument("--budget-ms", type=float,
+                        help="Fail when a target's median import time exceeds this.")
+    parser.add_argument("--forbid", nargs="*", default=["faker"],
+                        help="Packages that must not be imported at start-up.")
+
+
+def parse_importtime(stderr):
+    """(module, self µs, cumulative µs) per `-X importtime` line, in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_once(code):
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             capture_output=True, text=True, env=os.environ.copy())
+    wall_ms = (time.perf_counter() - started) * 1000
+    if process.returncode:
+        raise SystemExit(process.stderr.strip().splitlines()[-1])
+    return wall_ms, parse_importtime(process.stderr)
+
+
+def measure(code, repeat, top):
+    runs = [import_once(code) for _ in range(repeat)]
+    # Module breakdown from the median run, so one slow disk read doesn't skew it
+    totals = [sum(row[1] for row in rows) / 1000 for _, rows in runs]
+    median_run = runs[sorted(range(repeat), key=totals.__getitem__)[repeat // 2]][1]
+
+    packages = defaultdict(int)
+    for module, self_us, _ in median_run:
+        packages[module.split(".")[0]] += self_us
+    own = [(module, cumulative_us) for module, _, cumulative_us in median_run
+           if module.split(".")[0] in ("chatcampusapp", "chatcampuspro")]
+    return {
+        "import_ms": round(statistics.median(totals), 1),
+        "wall_ms": round(statistics.median(wall for wall, _ in runs), 1),
+        "modules": len(median_run),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in
+                        sorted(packages.items(), key=lambda item: -item[1])[:top]},
+        "slowest_own_modules_ms": {module: round(us / 1000, 1) for module, us in
+                                   sorted(own, key=lambda item: -item[1])[:top]},
+        "imported": {module.split(".")[0] for module, _, _ in median_run},
+    }
+
+
+def run(stdout, options):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chatcampuspro.settings")
+    results, regressions = {}, []
+    for name in options["targets"]:
+        result = measure(TARGETS[name], options["repeat"], options["top"])
+        imported = result.pop("imported")
+        stdout.write(f"{name}: {result['import_ms']} ms importing {result['modules']} modules, "
+                     f"{result['wall_ms']} ms wall")
+        if options["budget_ms"] and result["import_ms"] > options["budget_ms"]:
+            regressions.append(f"{name}: {result['import_ms']} ms, budget is {options['budget_ms']} ms")
+        for package in options["forbid"]:
+            if package in imported:
+                regressions.append(f"{name}: imports {package} at start-up")
+        results[name] = result
+    return {"targets": results, "regressions": regressions}
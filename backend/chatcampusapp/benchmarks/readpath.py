@@ -0,0 +1,168 @@
+"""Compare read throughput of the sync DRF views and the async views.
+
+Opens --clients concurrent clients (default 1000) that each issue --requests
+GETs against the homepage, room details and user profile, first on the sync
+views and then on the async ones. Payloads are cached up front, so this
+measures the cache-hit path that serves most traffic.
+
+Without --url the ASGI application is driven in-process; with --url requests
+go over HTTP/1.1 keep-alive connections to a running server that mounts
+chatcampusapp.benchmarks.readpath_urls (e.g. ROOT_URLCONF pointed at it).
+"""
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from chatcampusapp.benchmarks import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5,
+                        help="Requests per client.")
+    parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000/api/bench")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+
+
+class InProcessClient:
+    def __init__(self, application):
+        self.application = application
+
+    async def get(self, path, headers):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"testserver")] + headers,
+            "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        }
+        disconnect = asyncio.Event()
+        request_sent = False
+        status = None
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.application(scope, receive, send)
+        disconnect.set()
+        return status
+
+    async def close(self):
+        pass
+
+
+class RemoteClient:
+    """Minimal HTTP/1.1 keep-alive client; enough for Content-Length responses."""
+
+    def __init__(self, base_url):
+        self.url = urlsplit(base_url)
+        self.reader = self.writer = None
+
+    async def get(self, path, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.url.hostname, self.url.port or 80)
+        lines = [f"GET {self.url.path.rstrip('/')}{path} HTTP/1.1", f"Host: {self.url.netloc}"]
+        lines += [f"{name.decode()}: {value.decode()}" for name, value in headers]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await self.reader.readexactly(length)
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def drive(make_client, paths, headers, clients, requests):
+    latencies = []
+    statuses = Counter()
+
+    async def client_loop(index):
+        client = make_client()
+        try:
+            for i in range(requests):
+                path = paths[(index + i) % len(paths)]
+                started = time.perf_counter()
+                statuses[await client.get(path, headers)] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(index) for index in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "statuses": dict(statuses),
+        "latency_ms": summarize(latencies),
+    }
+
+
+def sync_only_middleware():
+    """MIDDLEWARE entries that make Django run async views through a thread."""
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    return [path for path in settings.MIDDLEWARE
+            if not getattr(import_string(path), "async_capable", False)]
+
+
+def run(stdout, options):
+    from django.core.cache import cache
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    from chatcampusapp.models import Room, User
+    from chatcampusapp.payloads import homepage_payload, room_detail_payload, user_profile_payload
+
+    room = Room.objects.exclude(owner=None).order_by("id").first()
+    if room is None:
+        raise SystemExit("Needs at least one room with an owner; seed or generate data first.")
+    user = User.objects.get(pk=room.owner_id)
+    cache.set("homepage_cache", homepage_payload(""), timeout=3600)
+    cache.set(f"RoomID{room.id}", room_detail_payload(room.id), timeout=3600)
+    cache.set(f"UserID{user.id}", user_profile_payload(user.id), timeout=3600)
+    headers = [(b"authorization", f"Bearer {AccessToken.for_user(user)}".encode())]
+
+    results = {"clients": options["clients"], "requests_per_client": options["requests"],
+               "sync_only_middleware": sync_only_middleware()}
+    if results["sync_only_middleware"]:
+        stdout.write(f"Sync-only middleware, async views run in threads: {results['sync_only_middleware']}")
+    for mode in options["modes"]:
+        paths = [f"/{mode}/", f"/{mode}/roomDetails/{room.id}/", f"/{mode}/user/profile/{user.id}/"]
+        if options["url"]:
+            results[mode] = asyncio.run(drive(
+                lambda: RemoteClient(options["url"]), paths, headers,
+                options["clients"], options["requests"]))
+        else:
+            from django.core.asgi import get_asgi_application
+
+            with override_settings(ROOT_URLCONF="chatcampusapp.benchmarks.readpath_urls",
+                                   SECURE_SSL_REDIRECT=False, ALLOWED_HOSTS=["*"]):
+                application = get_asgi_application()
+                results[mode] = asyncio.run(drive(
+                    lambda: InProcessClient(application), paths, headers,
+                    options["clients"], options["requests"]))
+        stdout.write(f"{mode}: {results[mode]['requests_per_sec']} req/s, "
+                     f"p99 {results[mode]['latency_ms'].get('p99')} ms, {results[mode]['statuses']}")
+    return results
@@ -0,0 +1,14 @@
+# URLconf used by the `readpath` benchmark to serve the sync DRF views and
+# the async views side by side.
+from django.urls import path
+from chatcampusapp.async_views import homepage_view, room_detail_view, user_profile_view
+from chatcampusapp.views import HomePageAPIView, RoomDetailMessageCreateAPIView, UserProfileAPIView
+
+urlpatterns = [
+    path("sync/", HomePageAPIView.as_view()),
+    path("sync/roomDetails/<int:pk>/", RoomDetailMessageCreateAPIView.as_view()),
+    path("sync/user/profile/<int:pk>/", UserProfileAPIView.as_view()),
+    path("async/", homepage_view),
+    path("async/roomDetails/<int:pk>/", room_detail_view),
+    path("async/user/profile/<int:pk>/", user_profile_view),
+]
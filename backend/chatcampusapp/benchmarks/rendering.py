@@ -0,0 +1,60 @@
+"""Time building and rendering the homepage and room-detail payloads.
+
+Compares DRF serializers + the stdlib JSONRenderer (the old path) with the
+projections + FastJSONRenderer, using the busiest room for room details.
+"""
+import time
+
+from chatcampusapp.benchmarks import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--room", type=int,
+                        help="Room id for room details (default: the room with most messages).")
+
+
+def measure(render, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(render())
+        samples.append((time.perf_counter() - started) * 1000)
+    return size, summarize(samples)
+
+
+def run(stdout, options):
+    from django.db.models import Count
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from chatcampusapp.models import Room
+    from chatcampusapp.payloads import homepage_payload, room_detail_payload
+    from chatcampusapp.renderers import FastJSONRenderer
+
+    room_id = options["room"] or (Room.objects
+                                  .annotate(messages=Count("room_message"))
+                                  .order_by("-messages")
+                                  .values_list("id", flat=True)
+                                  .first())
+    payloads = {"homepage": lambda: homepage_payload("")}
+    if room_id:
+        payloads["room_detail"] = lambda: room_detail_payload(room_id)
+
+    variants = {
+        "drf_stdlib_json": (False, JSONRenderer()),
+        "projection_fast_json": (True, FastJSONRenderer()),
+    }
+    results = {"room_id": room_id}
+    for name, build in payloads.items():
+        results[name] = {}
+        for variant, (fast, renderer) in variants.items():
+            with override_settings(FAST_PROJECTIONS=fast):
+                build_size, build_ms = measure(build, options["repeat"])
+                data = build()
+            size, render_ms = measure(lambda: renderer.render(data), options["repeat"])
+            results[name][variant] = {"build_ms": build_ms, "render_ms": render_ms, "bytes": size}
+        stdout.write(f"{name}: render p50 "
+                     f"{results[name]['drf_stdlib_json']['render_ms']['p50']} ms -> "
+                     f"{results[name]['projection_fast_json']['render_ms']['p50']} ms")
+    return results
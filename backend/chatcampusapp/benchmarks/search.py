@@ -0,0 +1,108 @@
+"""Compare ranked homepage room search with the legacy icontains filter.
+
+Tops the database up to --rooms synthetic rooms (e.g. 100000 or 1000000),
+then times both filters for each query and records their query plans.
+"""
+import random
+import time
+
+from chatcampusapp.benchmarks import summarize
+
+VOCABULARY = [
+    "python", "django", "react", "docker", "kubernetes", "devops", "cloud",
+    "computing", "machine", "learning", "artificial", "intelligence", "data",
+    "databases", "postgres", "redis", "security", "networks", "linux", "rust",
+    "javascript", "typescript", "frontend", "backend", "api", "design", "testing",
+    "performance", "mobile", "android", "ios", "startup", "career", "interview",
+    "algorithms", "compilers", "graphics", "robotics", "embedded", "blockchain",
+]
+
+
+def add_arguments(parser):
+    parser.add_argument("--rooms", type=int, default=100000,
+                        help="Make sure at least this many rooms exist before measuring.")
+    parser.add_argument("--queries", nargs="+",
+                        default=["dev", "python", "cloud computing", "machne lerning", "zzzz"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def ensure_rooms(target, batch_size, seed, stdout):
+    from django.db import connection
+    from chatcampusapp.models import Room, Topic
+    from chatcampusapp.utils.search import rebuild_room_search_vectors
+    from chatcampusapp.utils.topics import recount_topic_rooms
+
+    existing = Room.objects.count()
+    if existing >= target:
+        return 0
+
+    topics = list(Topic.objects.all())
+    if not topics:
+        Topic.objects.bulk_create(
+            [Topic(topic_name=word.title()) for word in VOCABULARY[:10]])
+        topics = list(Topic.objects.all())
+
+    rng = random.Random(seed + existing)
+    for start in range(existing, target, batch_size):
+        Room.objects.bulk_create([
+            Room(room_name=" ".join(rng.sample(VOCABULARY, 2)).title() + f" {i}",
+                 room_description=" ".join(rng.choices(VOCABULARY, k=rng.randint(8, 20))),
+                 topic=rng.choice(topics))
+            for i in range(start, min(start + batch_size, target))
+        ])
+        stdout.write(f"Rooms: {min(start + batch_size, target)}/{target}")
+
+    # bulk_create bypasses the signals that maintain search_vector and room_count
+    rebuild_room_search_vectors()
+    recount_topic_rooms()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE chatcampusapp_room")
+    return target - existing
+
+
+def measure(queryset, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.values_list("id", flat=True)[:10])
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def plan(queryset):
+    # Only the top of the plan; enough to tell a Seq Scan from an index scan
+    return queryset.values_list("id", flat=True)[:10].explain().splitlines()[:6]
+
+
+def run(stdout, options):
+    from django.db.models import Q
+    from chatcampusapp.models import Room
+    from chatcampusapp.utils.search import normalize_query, search_enabled, search_rooms
+
+    created = ensure_rooms(options["rooms"], options["batch_size"], options["seed"], stdout)
+    results = {
+        "rooms": Room.objects.count(),
+        "rooms_created": created,
+        "postgresql": search_enabled(),
+        "queries": {},
+    }
+    for raw_q in options["queries"]:
+        q = normalize_query(raw_q)
+        legacy = Room.objects.filter(Q(topic__topic_name__icontains=q) |
+                                     Q(room_name__icontains=q) |
+                                     Q(room_description__icontains=q))
+        ranked = search_rooms(Room.objects.all(), q)
+        legacy_ms = measure(legacy, options["repeat"])
+        search_ms = measure(ranked, options["repeat"])
+        results["queries"][raw_q] = {
+            "normalized": q,
+            "legacy_ms": legacy_ms,
+            "search_ms": search_ms,
+            "p50_speedup": round(legacy_ms["p50"] / search_ms["p50"], 2) if search_ms["p50"] else None,
+            "legacy_plan": plan(legacy),
+            "search_plan": plan(ranked),
+        }
+    return results
@@ -0,0 +1,55 @@
+"""Compare rows/sec of the compiled projections with the DRF serializers.
+
+Uses the newest --rows rooms and messages already in the database (see the
+`search` benchmark or the seed data to create some). Each side runs the same
+query, so the numbers include fetching as well as building the dicts.
+"""
+import time
+
+from chatcampusapp.benchmarks import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument("--rows", type=int, default=500,
+                        help="Rows per serialization run.")
+    parser.add_argument("--repeat", type=int, default=20)
+
+
+def measure(build, repeat):
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(build())
+        samples.append((time.perf_counter() - started) * 1000)
+    return rows, summarize(samples)
+
+
+def run(stdout, options):
+    from chatcampusapp.models import Message, Room
+    from chatcampusapp.projections import MESSAGE_MINIMAL, MESSAGE_PROFILE, ROOM_MINIMAL, ROOM_PROFILE
+
+    limit, repeat = options["rows"], options["repeat"]
+    cases = {
+        "room_minimal": (ROOM_MINIMAL, Room.objects.select_related("topic", "owner")),
+        "room_profile": (ROOM_PROFILE, Room.objects.select_related("topic", "owner")),
+        "message_minimal": (MESSAGE_MINIMAL, Message.objects.select_related("owner", "room")),
+        "message_profile": (MESSAGE_PROFILE, Message.objects.select_related("owner")),
+    }
+    results = {}
+    for name, (projection, queryset) in cases.items():
+        queryset = queryset[:limit]
+        rows, drf_ms = measure(
+            lambda: projection.serializer_class(queryset, many=True).data, repeat)
+        _, projection_ms = measure(lambda: projection.rows(queryset), repeat)
+        results[name] = {
+            "rows": rows,
+            "drf_ms": drf_ms,
+            "projection_ms": projection_ms,
+            "drf_rows_per_sec": round(rows / drf_ms["p50"] * 1000) if drf_ms.get("p50") else None,
+            "projection_rows_per_sec": (round(rows / projection_ms["p50"] * 1000)
+                                        if projection_ms.get("p50") else None),
+        }
+        stdout.write(f"{name}: {results[name]['drf_rows_per_sec']} -> "
+                     f"{results[name]['projection_rows_per_sec']} rows/sec")
+    return results
@@ -0,0 +1,81 @@
+from contextvars import ContextVar
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.client import DefaultClient
+from django_redis.client.default import CacheKey
+from .cache_serializers import is_payload_key
+from .utils import tracing
+from .utils.metrics import record_cache_delete, record_cache_lookup, record_cache_write
+
+_MISSING = object()
+
+# Size of the last value encoded by this context, picked up by set()
+_encoded_size = ContextVar("cache_encoded_size", default=0)
+# Key of the value set() is encoding, so encode() can pick its format
+_encoding_key = ContextVar("cache_encoding_key", default="")
+
+
+def original_key(key):
+    return key.original_key() if isinstance(key, CacheKey) else str(key)
+
+
+def cache_span(operation, key):
+    return tracing.span(f"cache.{operation}", {"cache.key": key}, kind=tracing.CLIENT)
+
+
+class InstrumentedClient(DefaultClient):
+    """
+    django-redis client that records hits, misses, value sizes and deletes
+    per key family (see utils.metrics.key_family), with a trace span per call,
+    and stores response payloads in the payload format of CodecSerializer.
+    Set as CLIENT_CLASS.
+    """
+
+    def get(self, key, default=None, version=None, client=None):
+        with cache_span("get", original_key(key)) as span:
+            value = super().get(key, default=_MISSING, version=version, client=client)
+            # An entry that decodes to None reads as a miss to the callers
+            hit = value is not _MISSING and value is not None
+            if span is not None:
+                span.attributes["cache.hit"] = hit
+        record_cache_lookup(original_key(key), hit)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        with cache_span("get_many", ",".join(map(original_key, keys))):
+            found = super().get_many(keys, version=version, client=client)
+        for key in keys:
+            record_cache_lookup(original_key(key), found.get(key) is not None)
+        return found
+
+    def encode(self, value):
+        if is_payload_key(_encoding_key.get()):
+            encoded = self._compressor.compress(self._serializer.dumps_payload(value))
+        else:
+            encoded = super().encode(value)
+        # Integers are stored as their decimal string
+        _encoded_size.set(len(encoded) if isinstance(encoded, bytes) else len(str(encoded)))
+        return encoded
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        token = _encoding_key.set(original_key(key))
+        try:
+            with cache_span("set", original_key(key)):
+                stored = super().set(key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx)
+        finally:
+            _encoding_key.reset(token)
+        if stored:
+            record_cache_write(original_key(key), _encoded_size.get())
+        return stored
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        record_cache_delete(original_key(key))
+        with cache_span("delete", original_key(key)):
+            return super().delete(key, version=version, prefix=prefix, client=client)
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        for key in keys:
+            record_cache_delete(original_key(key))
+        with cache_span("delete_many", ",".join(map(original_key, keys))):
+            return super().delete_many(keys, version=version, client=client)
@@ -0,0 +1,151 @@
+import datetime
+import logging
+import uuid
+import zlib
+import msgpack
+from django.conf import settings
+from django_redis.serializers.pickle import PickleSerializer
+from .utils import codec
+from .utils.json_stream import CompressedJSON
+from .utils.metrics import key_family
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional, falls back to zlib
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional, falls back to zlib
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Every entry starts with a tag byte; pickles start with b"\x80", so entries
+# written before this serializer was enabled still load as pickles, and all
+# formats below stay readable whatever CACHE_FORMAT is now.
+JSON_TAG = b"J"
+MSGPACK_TAG = b"M"
+# Marks utils.json_stream payloads, stored and loaded still compressed
+GZIP_JSON_TAG = b"G"
+# Followed by a compressor id byte and a compressed, tagged entry
+COMPRESSED_TAG = b"C"
+
+
+# Key families (utils.metrics.key_family) holding response payloads, which are
+# stored as JSON or msgpack and load as they render: datetimes as strings,
+# tuples as lists. Everything else is pickled and loads exactly as stored.
+PAYLOAD_FAMILIES = frozenset({"RoomID", "UserID", "homepage_cache"})
+
+
+def is_payload_key(key):
+    return key_family(key) in PAYLOAD_FAMILIES
+
+
+def _zstd_compress(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data):
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# Name -> (id byte, compress, decompress, available)
+COMPRESSORS = {
+    "zstd": (b"z", _zstd_compress, _zstd_decompress, zstandard is not None),
+    "lz4": (b"4", lambda data: lz4_frame.compress(data), lambda data: lz4_frame.decompress(data),
+            lz4_frame is not None),
+    "zlib": (b"d", lambda data: zlib.compress(data, 6), zlib.decompress, True),
+}
+# Only the compressors installed in this process; see CodecSerializer.decompress
+DECOMPRESSORS = {id_byte: decompress for id_byte, _, decompress, available in COMPRESSORS.values()
+                 if available}
+
+
+def compressor():
+    """The configured compressor, zlib if its library is missing, or None."""
+    name = settings.CACHE_COMPRESSOR
+    if name == "none":
+        return None
+    entry = COMPRESSORS.get(name)
+    if entry is None or not entry[3]:
+        entry = COMPRESSORS["zlib"]
+    return entry
+
+
+def _msgpack_default(obj):
+    # The same strings orjson writes, so both formats load identical payloads
+    if isinstance(obj, datetime.datetime):
+        return codec.isoformat(obj)
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+class CodecSerializer(PickleSerializer):
+    """
+    django-redis serializer that stores cached response payloads (dicts and
+    lists) as msgpack or JSON (settings.CACHE_FORMAT), compressed once they
+    pass settings.CACHE_COMPRESS_MIN_BYTES, and pickles everything else.
+    cache_clients.InstrumentedClient calls dumps_payload() for the
+    PAYLOAD_FAMILIES keys and dumps() for the rest.
+    """
+
+    def dumps(self, value):
+        if isinstance(value, CompressedJSON):
+            return GZIP_JSON_TAG + value.body
+        return super().dumps(value)
+
+    def dumps_payload(self, value):
+        if isinstance(value, (dict, list)):
+            try:
+                data = self.encode_payload(value)
+            except (TypeError, ValueError, OverflowError):
+                pass
+            else:
+                return self.compress(data)
+        return self.dumps(value)
+
+    def encode_payload(self, value):
+        if settings.CACHE_FORMAT == "msgpack":
+            return MSGPACK_TAG + msgpack.packb(value, default=_msgpack_default)
+        return JSON_TAG + codec.dumps_strict(value)
+
+    def compress(self, data):
+        entry = compressor()
+        if entry is None or len(data) < settings.CACHE_COMPRESS_MIN_BYTES:
+            return data
+        id_byte, compress, _, _ = entry
+        compressed = COMPRESSED_TAG + id_byte + compress(data)
+        # Small or random-looking payloads can grow; keep whichever is shorter
+        return compressed if len(compressed) < len(data) else data
+
+    def decompress(self, value):
+        """
+        The tagged entry inside a compressed one, or None when this process
+        can't read it (its compressor isn't installed here, or it is corrupt).
+        """
+        decompress = DECOMPRESSORS.get(value[1:2])
+        if decompress is not None:
+            try:
+                return decompress(value[2:])
+            except Exception:
+                pass
+        logger.warning("Cannot decompress cache entry with compressor id %r", value[1:2])
+        return None
+
+    def loads(self, value):
+        tag = value[:1]
+        if tag == COMPRESSED_TAG:
+            # Unreadable entries are cache misses, to be rebuilt and overwritten
+            data = self.decompress(value)
+            return None if data is None else self.loads(data)
+        if tag == MSGPACK_TAG:
+            return msgpack.unpackb(value[1:], strict_map_key=False)
+        if tag == JSON_TAG:
+            return codec.loads(value[1:])
+        if tag == GZIP_JSON_TAG:
+            return CompressedJSON(value[1:])
+        return super().loads(value)
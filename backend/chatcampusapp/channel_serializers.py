@@ -0,0 +1,16 @@
+from channels_redis.serializers import BaseMessageSerializer, registry
+from .utils import codec
+
+
+class CodecMessageSerializer(BaseMessageSerializer):
+    """
+    channels_redis message serializer using utils.codec. Unlike msgpack it
+    can carry payloads with datetimes; bytes values are not supported.
+    """
+    as_bytes = staticmethod(codec.dumps)
+    from_bytes = staticmethod(codec.loads)
+
+
+def register():
+    # Referenced as "serializer_format": "codec" in settings.CHANNEL_LAYERS
+    registry.register_serializer("codec", CodecMessageSerializer)
@@ -1,14 +1,18 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
-import json
 from channels.db import database_sync_to_async
+import bleach
 from .models import Message, Room
 from .serializers import MessageSerializer
 from django.shortcuts import get_object_or_404
-import bleach
 from django.http import Http404
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db import close_old_connections
+from django.db import close_old_connections, transaction
 from django.core.cache import cache
+from .db_routers import pin_primary
+from .utils.room_events import publish_room_event
+from .utils import codec, profiling, tracing
+from .utils.metrics import record_websocket_event
+from .utils.dashboard_events import DASHBOARD_GROUP
 
 
 @database_sync_to_async
@@ -19,11 +23,13 @@ def get_message_by_id(message_id):
 @database_sync_to_async
 def delete_message_instance(message):
     message.delete()
+    pin_primary(message.owner_id)
 
 
 @database_sync_to_async
 def get_room_by_id(pk):
-    return get_object_or_404(Room, id=pk)
+    # Messages broadcast with MessageSerializer render the room's owner and topic
+    return get_object_or_404(Room.objects.select_related("owner", "topic"), id=pk)
 
 
 @database_sync_to_async
@@ -33,8 +39,11 @@ def create_message(user, room, body):
         tags=["p", "b", "i", "ol", "li", "a", "strong", "em"],
         attributes={'a': ["href", "title", "rel"]}
     )
-    message = Message.objects.create(owner=user, room=room, body=clean_body)
-    room.participants.add(user)
+    # The membership insert also bumps Room.participants_count
+    with transaction.atomic():
+        message = Message.objects.create(owner=user, room=room, body=clean_body)
+        room.participants.add(user)
+    pin_primary(user.id)
     return message
 
 
@@ -51,7 +60,43 @@ def validate_token_and_get_user(token):
     return user
 
 
-class ChatRoom(AsyncWebsocketConsumer):
+class ConsumerMetricsMixin:
+    """Counts every connect, receive, disconnect and group event by type."""
+
+    async def dispatch(self, message):
+        record_websocket_event(type(self).__name__, message["type"])
+        await super().dispatch(message)
+
+
+class ConsumerTracingMixin:
+    """
+    A span per handled message. Group events carry the sender's `traceparent`,
+    so a delivery joins the trace of the receive that published it.
+    """
+
+    async def dispatch(self, message):
+        kind = tracing.SERVER if message["type"].startswith("websocket.") else tracing.CONSUMER
+        with tracing.trace(f"ws {type(self).__name__} {message['type']}", message.get("traceparent"),
+                           kind=kind, attributes={"ws.path": self.scope.get("path", "")}):
+            await super().dispatch(message)
+
+
+class ConsumerProfilingMixin:
+    """
+    Profile a sampled share of handled messages. The profile spans the
+    awaits, so with cProfile it also includes other coroutines that ran in
+    between on the event loop.
+    """
+
+    async def dispatch(self, message):
+        if not profiling.should_profile():
+            await super().dispatch(message)
+            return
+        with profiling.profiled("ws", f"{type(self).__name__} {message['type']}"):
+            await super().dispatch(message)
+
+
+class ChatRoom(ConsumerTracingMixin, ConsumerMetricsMixin, ConsumerProfilingMixin, AsyncWebsocketConsumer):
 
     async def connect(self):
         close_old_connections()
@@ -60,7 +105,7 @@ class ChatRoom(AsyncWebsocketConsumer):
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps_text({
             'type': 'connection_established',
             'message': "You are now connected!"
         }))
@@ -69,7 +114,7 @@ class ChatRoom(AsyncWebsocketConsumer):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
-        data = json.loads(text_data)
+        data = codec.loads(text_data)
         action = data.get("action")
 
         if action == "Auth_Check":
@@ -84,7 +129,7 @@ class ChatRoom(AsyncWebsocketConsumer):
                 return
 
             self.scope['user'] = user  # Mark connection authenticated
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=codec.dumps_text({
                 "type": "auth_success",
                 "message": "Authentication successful"
             }))
@@ -102,7 +147,7 @@ class ChatRoom(AsyncWebsocketConsumer):
             try:
                 room = await get_room_by_id(room_id)
             except Http404:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps_text({
                     "type": "error",
                     "message": "Room not found"
                 }))
@@ -113,12 +158,12 @@ class ChatRoom(AsyncWebsocketConsumer):
                 cache.delete("homepage_cache")
                 cache.delete(f"UserID{user.id}")
                 serialized_message = await serialize_message_to_dict(message)
-                await self.channel_layer.group_send(self.room_group_name, {
+                await publish_room_event(self.room_id, {
                     "type": "chat_message",
                     "message": serialized_message
                 })
             except Exception as e:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps_text({
                     "type": "error",
                     "message": str(e)
                 }))
@@ -128,7 +173,7 @@ class ChatRoom(AsyncWebsocketConsumer):
             try:
                 message = await get_message_by_id(message_id)
                 if message.owner != user:
-                    await self.send(text_data=json.dumps({
+                    await self.send(text_data=codec.dumps_text({
                         "type": "error",
                         "message": "Unauthorized to delete this message."
                     }))
@@ -137,24 +182,72 @@ class ChatRoom(AsyncWebsocketConsumer):
                 cache.delete(f"RoomID{self.room_id}")
                 cache.delete("homepage_cache")
                 cache.delete(f"UserID{user.id}")
-                await self.channel_layer.group_send(self.room_group_name, {
+                await publish_room_event(self.room_id, {
                     "type": "chat_message_delete",
                     "message_id": message_id,
                 })
             except Message.DoesNotExist:
-                await self.send(text_data=json.dumps({
+                await self.send(text_data=codec.dumps_text({
                     "type": "error",
                     "message": "Message not found"
                 }))
 
     async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps_text({
             "type": "chat_message",
             "message": event["message"]
         }))
 
     async def chat_message_delete(self, event):
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=codec.dumps_text({
             "type": "chat_message_delete",
             "message_id": event["message_id"]
         }))
+
+
+class Dashboard(ConsumerTracingMixin, ConsumerMetricsMixin, AsyncWebsocketConsumer):
+    """Pushes homepage diffs so clients only fetch the snapshot once."""
+
+    async def connect(self):
+        close_old_connections()
+        self.joined = False
+        await self.accept()
+        await self.send(text_data=codec.dumps_text({
+            'type': 'connection_established',
+            'message': "You are now connected!"
+        }))
+
+    async def disconnect(self, code):
+        if self.joined:
+            await self.channel_layer.group_discard(DASHBOARD_GROUP, self.channel_name)
+
+    async def receive(self, text_data):
+        data = codec.loads(text_data)
+        if data.get("action") != "Auth_Check":
+            return
+
+        try:
+            user = await validate_token_and_get_user(data.get("token"))
+        except Exception:
+            await self.close()
+            return
+        if not user or not user.is_authenticated:
+            await self.close()
+            return
+
+        # Only authenticated sockets receive updates, as with the homepage API
+        self.scope['user'] = user
+        await self.channel_layer.group_add(DASHBOARD_GROUP, self.channel_name)
+        self.joined = True
+        await self.send(text_data=codec.dumps_text({
+            "type": "auth_success",
+            "message": "Authentication successful"
+        }))
+
+    async def dashboard_update(self, event):
+        await self.send(text_data=codec.dumps_text({
+            "type": "dashboard_update",
+            "event_id": event["event_id"],
+            "kind": event["kind"],
+            "data": event["data"],
+        }))
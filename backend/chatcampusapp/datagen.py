@@ -0,0 +1,227 @@
+"""
+Synthetic datasets for performance work (`manage.py generate_data`).
+
+Activity is skewed the way chat data is: rooms are picked for messages, and
+users for room ownership, with Zipf weights, and a room's participant count
+follows its activity rank. Rows are written in batches, each in its own
+transaction, with COPY on PostgreSQL and executemany elsewhere. Both paths
+skip the model signals, so counters and search vectors are rebuilt at the end.
+
+Batch n of a table is generated from Random(f"{seed}:{table}:{n}"), so a run
+with the same --seed and --batch-size produces the same rows. An interrupted
+run resumes after the last committed batch. Generated users are recognised
+by their email domain, and rooms and messages by belonging to those users.
+"""
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from chatcampusapp.models import Message, Room, Topic
+from chatcampusapp.utils.participants import recount_room_participants
+from chatcampusapp.utils.search import rebuild_room_search_vectors
+from chatcampusapp.utils.topics import recount_topic_rooms
+
+User = get_user_model()
+
+EMAIL_DOMAIN = "synthetic.chatcampus.test"
+PASSWORD = "securepass123"
+
+WORDS = [
+    "python", "django", "react", "docker", "kubernetes", "devops", "cloud",
+    "computing", "machine", "learning", "artificial", "intelligence", "data",
+    "databases", "postgres", "redis", "security", "networks", "linux", "rust",
+    "javascript", "typescript", "frontend", "backend", "api", "design", "testing",
+    "performance", "mobile", "android", "ios", "startup", "career", "interview",
+    "algorithms", "compilers", "graphics", "robotics", "embedded", "blockchain",
+    "the", "a", "is", "to", "and", "of", "in", "we", "this", "that", "how", "why",
+]
+
+FIRST_NAMES = ["alice", "bob", "charlie", "diana", "ethan", "fiona", "george", "hannah",
+               "ivan", "jasmine", "kai", "lena", "mo", "nadia", "omar", "priya"]
+LAST_NAMES = ["smith", "garcia", "chen", "okafor", "novak", "silva", "kim", "patel"]
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative weights for ranks 0..n-1 with P(rank k) proportional to 1/(k+1)^s."""
+    return list(accumulate(1 / (k + 1) ** exponent for k in range(n)))
+
+
+def ranked(ids, seed, name):
+    """`ids` in a seeded random order, so popularity is not tied to age."""
+    ids = list(ids)
+    random.Random(f"{seed}:{name}:rank").shuffle(ids)
+    return ids
+
+
+def insert_rows(model, fields, rows):
+    """Insert raw rows for `fields` of `model`, bypassing save() and signals."""
+    opts = model._meta
+    columns = [opts.get_field(name).column for name in fields]
+    table = connection.ops.quote_name(opts.db_table)
+    column_list = ", ".join(connection.ops.quote_name(column) for column in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            with cursor.copy(f"COPY {table} ({column_list}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            return
+        placeholders = ", ".join(["%s"] * len(columns))
+        cursor.executemany(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})",
+                           [[adapt(value) for value in row] for row in rows])
+
+
+def adapt(value):
+    if hasattr(value, "tzinfo"):
+        return connection.ops.adapt_datetimefield_value(value)
+    return value
+
+
+class Generator:
+    def __init__(self, users, rooms, messages, topics=10, max_participants=2000,
+                 zipf=1.1, days=365, end=None, seed=0, batch_size=10000, stdout=None):
+        self.targets = {"users": users, "rooms": rooms, "messages": messages}
+        self.topics = topics
+        self.max_participants = max_participants
+        self.zipf = zipf
+        self.seed = seed
+        self.batch_size = batch_size
+        self.stdout = stdout
+        # Today's midnight by default, so a resumed run continues the same timeline
+        self.end = end or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=days)
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def rng(self, table, batch):
+        return random.Random(f"{self.seed}:{table}:{batch}")
+
+    def timestamp(self, index, total):
+        # Rows get later as their index grows, like ids in a live database
+        return self.start + (self.end - self.start) * (index / max(total, 1))
+
+    def run(self):
+        self.started = time.perf_counter()
+        self.written = 0
+        topic_ids = self.ensure_topics()
+        user_ids = self.generate_users()
+        room_ids = self.generate_rooms(user_ids, topic_ids)
+        # Indexes into room_ids, busiest room first
+        activity = ranked(range(len(room_ids)), self.seed, "rooms")
+        members = self.room_members(user_ids, room_ids, activity)
+        self.generate_participants(members, room_ids)
+        self.generate_messages(room_ids, members, activity)
+        self.log("Rebuilding counters and search vectors...")
+        recount_topic_rooms()
+        recount_room_participants()
+        rebuild_room_search_vectors()
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.log(f"Done in {time.perf_counter() - self.started:.1f} s")
+
+    def batches(self, table, done, total):
+        """(batch number, first index, last index) still to write, resuming at `done`."""
+        if done % self.batch_size and done < total:
+            raise ValueError(f"{done} generated {table} is not a whole number of batches; "
+                             f"was --batch-size changed?")
+        for start in range(done, total, self.batch_size):
+            yield start // self.batch_size, start, min(start + self.batch_size, total)
+
+    def write(self, table, model, fields, rows, progress, total):
+        with transaction.atomic():
+            insert_rows(model, fields, rows)
+        self.written += len(rows)
+        rate = self.written / max(time.perf_counter() - self.started, 1e-9)
+        self.log(f"{table}: {progress}/{total} ({rate:,.0f} rows/s)")
+
+    def ensure_topics(self):
+        names = [WORDS[i % 40].title() + ("" if i < 40 else f" {i // 40}") for i in range(self.topics)]
+        Topic.objects.bulk_create([Topic(topic_name=name) for name in names], ignore_conflicts=True)
+        return list(Topic.objects.filter(topic_name__in=names).order_by("id").values_list("id", flat=True))
+
+    def generated_users(self):
+        return User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+
+    def generate_users(self):
+        total = self.targets["users"]
+        done = self.generated_users().count()
+        password = make_password(PASSWORD)
+        fields = ["email", "first_name", "last_name", "bio", "password",
+                  "is_active", "is_staff", "is_superuser"]
+        for batch, first, last in self.batches("users", done, total):
+            rng = self.rng("users", batch)
+            rows = [(f"user{i}@{EMAIL_DOMAIN}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                     " ".join(rng.choices(WORDS, k=rng.randint(5, 20))), password, True, False, False)
+                    for i in range(first, last)]
+            self.write("users", User, fields, rows, last, total)
+        return list(self.generated_users().order_by("id").values_list("id", flat=True))
+
+    def generated_rooms(self):
+        return Room.objects.filter(owner__email__endswith=f"@{EMAIL_DOMAIN}")
+
+    def generate_rooms(self, user_ids, topic_ids):
+        total = self.targets["rooms"]
+        done = self.generated_rooms().count()
+        owners = ranked(user_ids, self.seed, "owners")
+        owner_weights = zipf_cum_weights(len(owners), self.zipf)
+        topics = ranked(topic_ids, self.seed, "topics")
+        topic_weights = zipf_cum_weights(len(topics), self.zipf)
+        fields = ["room_name", "room_description", "owner", "topic",
+                  "participants_count", "created_at", "updated_at"]
+        for batch, first, last in self.batches("rooms", done, total):
+            rng = self.rng("rooms", batch)
+            batch_owners = rng.choices(owners, cum_weights=owner_weights, k=last - first)
+            batch_topics = rng.choices(topics, cum_weights=topic_weights, k=last - first)
+            rows = []
+            for i, owner, topic in zip(range(first, last), batch_owners, batch_topics):
+                created = self.timestamp(i, total)
+                rows.append((" ".join(rng.sample(WORDS[:40], 2)).title() + f" {i}",
+                             " ".join(rng.choices(WORDS, k=rng.randint(8, 30))),
+                             owner, topic, 0, created, created))
+            self.write("rooms", Room, fields, rows, last, total)
+        return list(self.generated_rooms().order_by("id").values_list("id", flat=True))
+
+    def room_members(self, user_ids, room_ids, activity):
+        """Members per room, in room_ids order; the busiest rooms get the most."""
+        owners = dict(Room.objects.filter(pk__in=room_ids).values_list("id", "owner_id"))
+        members = [None] * len(room_ids)
+        for rank, index in enumerate(activity):
+            room_id = room_ids[index]
+            count = min(len(user_ids), 2 + int(self.max_participants / (rank + 1) ** self.zipf))
+            rng = random.Random(f"{self.seed}:participants:{index}")
+            members[index] = sorted(set(rng.sample(user_ids, count)) | {owners[room_id]})
+        return members
+
+    def generate_participants(self, members, room_ids):
+        through = Room.participants.through
+        last_room = through.objects.filter(
+            room__owner__email__endswith=f"@{EMAIL_DOMAIN}").aggregate(last=Max("room_id"))["last"]
+        done = room_ids.index(last_room) + 1 if last_room in room_ids else 0
+        # Whole rooms per transaction, about batch_size memberships each
+        per_room = sum(map(len, members)) / max(len(members), 1)
+        rooms_per_batch = max(1, int(self.batch_size / max(per_room, 1)))
+        for first in range(done, len(room_ids), rooms_per_batch):
+            last = min(first + rooms_per_batch, len(room_ids))
+            rows = [(room_id, user_id) for room_id, room_members in
+                    zip(room_ids[first:last], members[first:last]) for user_id in room_members]
+            self.write("participants (rooms)", through, ["room", "user"], rows, last, len(room_ids))
+
+    def generate_messages(self, room_ids, members, activity):
+        total = self.targets["messages"]
+        done = Message.objects.filter(owner__email__endswith=f"@{EMAIL_DOMAIN}").count()
+        room_weights = zipf_cum_weights(len(activity), self.zipf)
+        fields = ["room", "owner", "body", "created_at"]
+        for batch, first, last in self.batches("messages", done, total):
+            rng = self.rng("messages", batch)
+            batch_rooms = rng.choices(activity, cum_weights=room_weights, k=last - first)
+            rows = [(room_ids[room], rng.choice(members[room]),
+                     " ".join(rng.choices(WORDS, k=rng.randint(3, 40))), self.timestamp(i, total))
+                    for i, room in zip(range(first, last), batch_rooms)]
+            self.write("messages", Message, fields, rows, last, total)
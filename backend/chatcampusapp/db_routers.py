@@ -0,0 +1,98 @@
+"""
+Read-replica routing. Everything goes to the primary unless it runs inside a
+`replica_reads()` block, which the read views and cache warmers use for
+building payloads. After a write the primary is pinned for
+settings.REPLICA_STICKY_SECONDS so replica lag can't serve stale data: per
+user for the read views (read-your-writes), and per cached entry for the
+warmers, whose output is cached for everyone.
+"""
+import random
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+# Pins every entry, for writes that show up in too many payloads to list
+GLOBAL_PIN_KEY = "PrimaryPinned"
+
+_use_replicas = ContextVar("use_replicas", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def user_pin_key(user_id):
+    return f"PrimaryPinnedUserID{user_id}"
+
+
+def entry_pin_key(cache_key):
+    return f"PrimaryPinnedEntry:{cache_key}"
+
+
+def pin_keys(user_id=None, entries=()):
+    """The pins that keep a `replica_reads()` block with these arguments on the primary."""
+    if user_id is not None:
+        return [user_pin_key(user_id)]
+    return [GLOBAL_PIN_KEY, *map(entry_pin_key, entries)]
+
+
+def pin_primary(user_id):
+    """Record a user's write so their next reads use the primary."""
+    if not replica_aliases():
+        return
+    cache.set(user_pin_key(user_id), 1, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def pin_entries(cache_keys=None):
+    """
+    Record a write that changed the cached payloads under `cache_keys`
+    (RoomID{id}, UserID{id}, homepage_cache), so the warmers rebuild them
+    from the primary. None pins them all.
+    """
+    if not replica_aliases():
+        return
+    keys = [GLOBAL_PIN_KEY] if cache_keys is None else map(entry_pin_key, cache_keys)
+    cache.set_many(dict.fromkeys(keys, 1), timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+@contextmanager
+def _routing(use_replicas):
+    token = _use_replicas.set(use_replicas)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+def replica_reads(user_id=None, entries=()):
+    """
+    Route reads in the block to a replica, unless a recent write pinned the
+    primary. Views pass the requesting user's id, warmers the cache keys of
+    the entries they rebuild.
+    """
+    use_replicas = bool(replica_aliases()) and not cache.get_many(pin_keys(user_id, entries))
+    return _routing(use_replicas)
+
+
+@asynccontextmanager
+async def areplica_reads(user_id=None, entries=()):
+    use_replicas = bool(replica_aliases()) and not await cache.aget_many(pin_keys(user_id, entries))
+    with _routing(use_replicas):
+        yield
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replicas.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
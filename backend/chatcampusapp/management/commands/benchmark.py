@@ -0,0 +1,46 @@
+import json
+import platform
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from chatcampusapp.benchmarks import BENCHMARKS, write_report
+
+
+class Command(BaseCommand):
+    help = "Run a performance benchmark and optionally write a JSON report."
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(
+            dest="benchmark", required=True, metavar="benchmark")
+        for name, module_path in BENCHMARKS.items():
+            module = import_module(module_path)
+            subparser = subparsers.add_parser(
+                name, help=(module.__doc__ or "").strip().splitlines()[0])
+            subparser.add_argument(
+                "--json", dest="json_path",
+                help="Write the report to this file for regression tracking.")
+            module.add_arguments(subparser)
+
+    def handle(self, *args, **options):
+        name = options["benchmark"]
+        module = import_module(BENCHMARKS[name])
+
+        started_at = timezone.now()
+        results = module.run(self.stdout, options)
+        report = {
+            "benchmark": name,
+            "started_at": started_at.isoformat(),
+            "python": platform.python_version(),
+            "results": results,
+        }
+
+        self.stdout.write(json.dumps(results, indent=2, default=str))
+        if options["json_path"]:
+            write_report(report, options["json_path"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Report written to {options['json_path']}"))
+        # Benchmarks with a baseline or budget list what got worse
+        if isinstance(results, dict) and results.get("regressions"):
+            raise CommandError(f"{len(results['regressions'])} regression(s) found")
@@ -0,0 +1,153 @@
+import json
+import re
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+
+from chatcampusapp.utils.metrics import (CACHE_DELETES, CACHE_FILL, CACHE_LOOKUPS, CACHE_VALUE_SIZE,
+                                         key_family, read_metrics)
+
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+REDIS_INFO_FIELDS = ("used_memory", "maxmemory", "maxmemory_policy", "evicted_keys",
+                     "expired_keys", "keyspace_hits", "keyspace_misses")
+
+
+def parse_labels(labels):
+    return dict(LABEL.findall(labels))
+
+
+def histogram_totals(fields):
+    """(count, sum) per family from a Histogram's stored fields."""
+    totals = defaultdict(lambda: [0, 0.0])
+    for field, value in fields.items():
+        labels, _, part = field.rpartition("|")
+        family = parse_labels(labels).get("family", "other")
+        if part == "sum":
+            totals[family][1] += float(value)
+        else:
+            totals[family][0] += int(float(value))
+    return totals
+
+
+def live_keys(sample):
+    """Key count and MEMORY USAGE bytes per family for up to `sample` cache keys."""
+    redis = get_redis_connection("default")
+    pattern = cache.make_key("*")
+    prefix = pattern[:-1]
+    keys = []
+    for key in redis.scan_iter(match=pattern, count=500):
+        keys.append(key)
+        if len(keys) >= sample:
+            break
+    pipe = redis.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key)
+    try:
+        sizes = pipe.execute()
+    except ResponseError:
+        # MEMORY USAGE and INFO are missing on some Redis-compatible servers
+        sizes = [None] * len(keys)
+    found = defaultdict(lambda: {"keys": 0, "bytes": 0})
+    for key, size in zip(keys, sizes):
+        family = key_family(key.decode()[len(prefix):])
+        found[family]["keys"] += 1
+        found[family]["bytes"] += size or 0
+    return found, len(keys) >= sample
+
+
+def build_report(sample):
+    fields = dict(read_metrics([CACHE_LOOKUPS, CACHE_VALUE_SIZE, CACHE_FILL, CACHE_DELETES]))
+    families = defaultdict(lambda: {"hits": 0, "misses": 0, "writes": 0, "written_bytes": 0.0,
+                                    "fills": 0, "fill_seconds": 0.0, "deletes": 0,
+                                    "live_keys": 0, "live_bytes": 0})
+    for labels, value in fields[CACHE_LOOKUPS].items():
+        labels = parse_labels(labels)
+        result = "hits" if labels.get("result") == "hit" else "misses"
+        families[labels.get("family", "other")][result] += int(float(value))
+    for family, (count, total) in histogram_totals(fields[CACHE_VALUE_SIZE]).items():
+        families[family]["writes"] = count
+        families[family]["written_bytes"] = total
+    for family, (count, total) in histogram_totals(fields[CACHE_FILL]).items():
+        families[family]["fills"] = count
+        families[family]["fill_seconds"] = total
+    for labels, value in fields[CACHE_DELETES].items():
+        families[parse_labels(labels).get("family", "other")]["deletes"] += int(float(value))
+    live, truncated = live_keys(sample)
+    for family, usage in live.items():
+        families[family]["live_keys"] = usage["keys"]
+        families[family]["live_bytes"] = usage["bytes"]
+
+    rows = {}
+    for family, stats in sorted(families.items()):
+        lookups = stats["hits"] + stats["misses"]
+        rows[family] = {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else None,
+            "writes": stats["writes"],
+            "avg_bytes": round(stats["written_bytes"] / stats["writes"]) if stats["writes"] else None,
+            "avg_fill_ms": round(stats["fill_seconds"] / stats["fills"] * 1000, 1) if stats["fills"] else None,
+            "deletes": stats["deletes"],
+            "live_keys": stats["live_keys"],
+            "live_bytes": stats["live_bytes"],
+        }
+    try:
+        info = get_redis_connection("default").info()
+    except ResponseError:
+        info = {}
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "families": rows,
+        "live_keys_truncated": truncated,
+        "redis": {name: info.get(name) for name in REDIS_INFO_FIELDS},
+    }
+
+
+class Command(BaseCommand):
+    help = "Print cache hits, misses, sizes, fill times and deletes per key family."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample", type=int, default=10000,
+            help="Scan at most this many cache keys for live sizes.")
+        parser.add_argument(
+            "--watch", type=float, metavar="SECONDS",
+            help="Print the report again every SECONDS until interrupted.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        while True:
+            report = build_report(options["sample"])
+            if options["json"]:
+                self.stdout.write(json.dumps(report, indent=2))
+            else:
+                self.write_table(report)
+            if not options["watch"]:
+                return
+            try:
+                time.sleep(options["watch"])
+            except KeyboardInterrupt:
+                return
+
+    def write_table(self, report):
+        columns = ("hits", "misses", "hit_ratio", "writes", "avg_bytes", "avg_fill_ms",
+                   "deletes", "live_keys", "live_bytes")
+        self.stdout.write(f"Cache report at {report['generated_at']}")
+        self.stdout.write(f"{'family':<24}" + "".join(f"{c:>12}" for c in columns))
+        for family, row in report["families"].items():
+            cells = "".join(f"{'-' if row[c] is None else row[c]:>12}" for c in columns)
+            self.stdout.write(f"{family:<24}{cells}")
+        if report["live_keys_truncated"]:
+            self.stdout.write(self.style.WARNING(
+                "Live key sizes cover a sample only; raise --sample for all keys."))
+        # Redis evicts by its maxmemory policy across all keys, so evictions
+        # are only known server-wide
+        redis = report["redis"]
+        self.stdout.write(
+            "Redis: " + ", ".join(f"{name}={redis[name]}" for name in REDIS_INFO_FIELDS))
@@ -0,0 +1,48 @@
+from datetime import datetime, time, timezone
+
+from django.core.management.base import BaseCommand
+
+from chatcampusapp.datagen import Generator
+
+
+def parse_date(value):
+    return datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), time(), tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = ("Generate a synthetic dataset with Zipf-distributed activity for benchmarks. "
+            "Deterministic for a given --seed and --batch-size, and resumable.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--rooms", type=int, default=50000)
+        parser.add_argument("--messages", type=int, default=1000000,
+                            help="Total generated messages, e.g. 50000000.")
+        parser.add_argument("--topics", type=int, default=10)
+        parser.add_argument("--max-participants", type=int, default=2000,
+                            help="Participants in the busiest room; later ranks get fewer.")
+        parser.add_argument("--zipf", type=float, default=1.1,
+                            help="Zipf exponent for room activity, room ownership and topics.")
+        parser.add_argument("--days", type=int, default=365,
+                            help="Spread created_at over this many days up to now.")
+        parser.add_argument("--end", type=parse_date,
+                            help="Last day of the timeline (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10000,
+                            help="Rows per transaction. Keep it the same when resuming.")
+
+    def handle(self, *args, **options):
+        Generator(
+            users=options["users"],
+            rooms=options["rooms"],
+            messages=options["messages"],
+            topics=options["topics"],
+            max_participants=options["max_participants"],
+            zipf=options["zipf"],
+            days=options["days"],
+            end=options["end"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        ).run()
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from chatcampusapp.utils.profiling import sign_profile_request
+
+
+class Command(BaseCommand):
+    help = "Sign a request path or task name for on-demand profiling."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "target", help="Request path (e.g. /api/roomDetails/12/) or Celery task name.")
+
+    def handle(self, *args, **options):
+        signature = sign_profile_request(options["target"])
+        self.stdout.write(f"X-Profile: {signature}")
+        self.stdout.write(self.style.SUCCESS(
+            "Send this header with the request, or pass headers={'x_profile': ...} "
+            "to apply_async for a task. It expires after PROFILING_SIGNATURE_MAX_AGE seconds."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from chatcampusapp.utils.search import rebuild_room_search_vectors, search_enabled
+
+
+class Command(BaseCommand):
+    help = "Recompute Room.search_vector for every room (PostgreSQL only)."
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING(
+                "Full-text search needs PostgreSQL; nothing to rebuild."))
+            return
+        updated = rebuild_room_search_vectors()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt search vectors for {updated} rooms."))
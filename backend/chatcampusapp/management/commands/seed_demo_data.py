@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from chatcampusapp.demo_data import seed_initial_data
+
+
+class Command(BaseCommand):
+    help = ("Create the superuser from DJANGO_SUPER_USER_* and a small demo dataset. "
+            "Does nothing when rooms already exist.")
+
+    def handle(self, *args, **options):
+        seed_initial_data()
+        self.stdout.write(self.style.SUCCESS("Demo data ready."))
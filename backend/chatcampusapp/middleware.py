@@ -1,18 +1,244 @@
 import logging
+import time
 import traceback
+from abc import ABC, abstractmethod
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .db_routers import pin_primary
+from .utils import metrics, profiling, redis_tracking, tracing
+from .utils.query_budget import QueryCounter, check_query_budget, view_query_budget
 
 logger = logging.getLogger(__name__)
 
-class Immediate500Logger:
+
+class HybridMiddleware(ABC):
+    """
+    Base for middleware that runs in whichever mode the handler it wraps
+    uses, so an async view is served on the event loop instead of through
+    async_to_sync in a worker thread. Subclasses implement handle() for sync
+    requests and __acall__() for async ones.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    @abstractmethod
+    def handle(self, request):
+        """The sync request path."""
+
+    @abstractmethod
+    async def __acall__(self, request):
+        """The async request path."""
+
+
+class Immediate500Logger(HybridMiddleware):
+    def handle(self, request):
         try:
             response = self.get_response(request)
-            if response.status_code >= 500:
-                logger.critical(f"500 response for {request.path}")
-            return response
         except Exception as e:
-            logger.critical(f"EXCEPTION in {request.path}: {str(e)}\n{traceback.format_exc()}")
-            raise
\ No newline at end of file
+            self.log_exception(request, e)
+            raise
+        self.log_response(request, response)
+        return response
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        except Exception as e:
+            self.log_exception(request, e)
+            raise
+        self.log_response(request, response)
+        return response
+
+    def log_response(self, request, response):
+        if response.status_code >= 500:
+            logger.critical(f"500 response for {request.path}")
+
+    def log_exception(self, request, e):
+        logger.critical(f"EXCEPTION in {request.path}: {str(e)}\n{traceback.format_exc()}")
+
+
+class PrimaryPinMiddleware(HybridMiddleware):
+    """
+    Pin the primary database for a user after a successful write request, so
+    their next reads don't come from a lagging replica.
+    """
+    def handle(self, request):
+        response = self.get_response(request)
+        if self.is_write(request, response):
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.is_write(request, response):
+            # request.user may still be a lazy session lookup
+            await sync_to_async(self.pin)(request)
+        return response
+
+    def is_write(self, request, response):
+        return request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400
+
+    def pin(self, request):
+        # DRF sets request.user on the underlying request once JWT auth has run
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_primary(user.pk)
+
+
+class QueryBudgetMiddleware(HybridMiddleware):
+    """Count each request's queries against its view's `query_budget`."""
+    def handle(self, request):
+        with QueryCounter(f"{request.method} {request.path}") as counter:
+            response = self.get_response(request)
+        return self.check(request, counter, response)
+
+    async def __acall__(self, request):
+        # The async ORM and sync_to_async run queries in worker threads,
+        # which inherit this context and so record into the counter
+        with QueryCounter(f"{request.method} {request.path}") as counter:
+            response = await self.get_response(request)
+        return self.check(request, counter, response)
+
+    def check(self, request, counter, response):
+        request.query_counter = counter
+        check_query_budget(counter, view_query_budget(
+            getattr(request, "resolver_match", None), request.method))
+        return response
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """Per-route latency, DB time, response size and status counts."""
+    def handle(self, request):
+        with metrics.batch():
+            started = time.perf_counter()
+            response = self.get_response(request)
+            self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        async with metrics.abatch():
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, elapsed):
+        match = getattr(request, "resolver_match", None)
+        # The route pattern, not the path, keeps label cardinality bounded
+        route = match.route if match else "unmatched"
+        metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        metrics.HTTP_LATENCY.observe(elapsed, route=route)
+        counter = getattr(request, "query_counter", None)
+        if counter is not None:
+            metrics.HTTP_DB_TIME.observe(counter.duration, route=route)
+        if not response.streaming:
+            metrics.HTTP_RESPONSE_SIZE.observe(len(response.content), route=route)
+
+
+class TrackingMiddleware(HybridMiddleware):
+    """Write the popularity reads a request makes in one pipeline once it is done."""
+    def handle(self, request):
+        with redis_tracking.buffered():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with redis_tracking.abuffered():
+            return await self.get_response(request)
+
+
+class TracingMiddleware(HybridMiddleware):
+    """Root span per request, joining the caller's trace if it sent `traceparent`."""
+    def handle(self, request):
+        with self.trace(request) as span:
+            response = self.get_response(request)
+            self.annotate(span, request, response)
+        return response
+
+    async def __acall__(self, request):
+        with self.trace(request) as span:
+            response = await self.get_response(request)
+            self.annotate(span, request, response)
+        return response
+
+    def trace(self, request):
+        return tracing.trace(request.method, request.headers.get("traceparent"),
+                             attributes={"http.request.method": request.method})
+
+    def annotate(self, span, request, response):
+        if span is None:
+            return
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "unmatched"
+        span.name = f"{request.method} {route}"
+        span.attributes["http.route"] = route
+        span.attributes["http.response.status_code"] = response.status_code
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """Profile requests with a signed X-Profile header, or a sampled share of them."""
+    def handle(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        with self.profiled(request) as profile:
+            response = self.get_response(request)
+        return self.label(profile, response)
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        # Profiles the event loop thread, so concurrent requests show up too
+        with self.profiled(request) as profile:
+            response = await self.get_response(request)
+        return self.label(profile, response)
+
+    def should_profile(self, request):
+        return profiling.should_profile(request.headers.get("X-Profile"), request.path)
+
+    def profiled(self, request):
+        return profiling.profiled("http", f"{request.method} {request.path}")
+
+    def label(self, profile, response):
+        if profile is not None:
+            response["X-Profile-Id"] = profile.filename
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, which is sync-only, with an async path for the requests it
+    doesn't serve itself. Without it every request to an async view would
+    pass through a worker thread at this point in the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:35
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres import operations as postgres_operations
+from django.db import migrations
+
+
+def backfill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("""
+        UPDATE chatcampusapp_room AS r SET search_vector =
+            setweight(to_tsvector('english', coalesce(r.room_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(
+                (SELECT t.topic_name FROM chatcampusapp_topic AS t WHERE t.id = r.topic_id), '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(r.room_description, '')), 'B')
+    """)
+
+
+# GIN indexes only exist on PostgreSQL, where they are built CONCURRENTLY so
+# the rooms table stays writable; other backends fall back to icontains and
+# only record them in the migration state.
+class AddPostgresIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('chatcampusapp', '0003_message'),
+    ]
+
+    operations = [
+        postgres_operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='room',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddPostgresIndexConcurrently(
+            model_name='room',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='chatcampusa_room_search_gin'),
+        ),
+        AddPostgresIndexConcurrently(
+            model_name='room',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['room_name'], name='chatcampusa_room_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_room_count(apps, schema_editor):
+    Room = apps.get_model("chatcampusapp", "Room")
+    Topic = apps.get_model("chatcampusapp", "Topic")
+    room_counts = (Room.objects
+                   .filter(topic=OuterRef("pk"))
+                   .order_by()
+                   .values("topic")
+                   .annotate(total=Count("pk"))
+                   .values("total"))
+    Topic.objects.update(room_count=Coalesce(Subquery(room_counts[:1]), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatcampusapp', '0004_room_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='room_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-room_count', 'topic_name'], name='chatcampusa_room_co_1c6f21_idx'),
+        ),
+        migrations.RunPython(backfill_room_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_participants_count(apps, schema_editor):
+    Room = apps.get_model("chatcampusapp", "Room")
+    members = (Room.participants.through.objects
+               .filter(room=OuterRef("pk"))
+               .order_by()
+               .values("room")
+               .annotate(total=Count("pk"))
+               .values("total"))
+    Room.objects.update(participants_count=Coalesce(Subquery(members[:1]), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatcampusapp', '0005_topic_room_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_participants_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres import operations as postgres_operations
+from django.db import migrations, models
+
+
+# Building these on a live messages table mustn't block writes: on PostgreSQL
+# they are created and dropped CONCURRENTLY, outside a transaction. Other
+# backends (SQLite in development) get the plain operations.
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexConcurrently(postgres_operations.RemoveIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.RemoveIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.RemoveIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('chatcampusapp', '0006_room_participants_count'),
+    ]
+
+    # The new indexes are built before the ones they replace are dropped
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['room', 'created_at', 'id'], name='chatcampusa_room_id_1648b7_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['owner', 'created_at'], name='chatcampusa_owner_i_dfe992_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='room',
+            index=models.Index(fields=['created_at'], name='chatcampusa_created_17fa12_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='room',
+            index=models.Index(fields=['owner', 'created_at'], name='chatcampusa_owner_i_ca50ae_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='message',
+            name='chatcampusa_room_id_e3e55a_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='room',
+            name='chatcampusa_room_de_a65730_idx',
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='message_owner', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='room',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='room_message', to='chatcampusapp.room'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='room_owner', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
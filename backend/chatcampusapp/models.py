@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from .managers import CustomUserManager
@@ -28,55 +30,93 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+# Keeps denormalized counters, which are only changed with F() updates, out of
+# full saves of existing rows so a stale instance cannot overwrite them
+class CounterFieldsMixin:
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not args and not kwargs.get("force_insert")
+                and kwargs.get("update_fields") is None):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields]
+        super().save(*args, **kwargs)
+
+
 # Topic model
-class Topic(models.Model):
+class Topic(CounterFieldsMixin, models.Model):
     topic_name = models.CharField(gettext_lazy(
         "topic name"), max_length=150, blank=False, null=False, unique=True)
+    # Number of rooms using this topic; maintained by Room signals
+    room_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=["topic_name"])
+            models.Index(fields=["topic_name"]),
+            models.Index(fields=["-room_count", "topic_name"]),
         ]
 
+    counter_fields = ("room_count",)
+
     def __str__(self):
         return self.topic_name
 
 
 # Room model
-class Room(models.Model):
+class Room(CounterFieldsMixin, models.Model):
     room_name = models.CharField(gettext_lazy(
         "room name"), max_length=200, null=False, blank=False)
     room_description = models.TextField(gettext_lazy(
         "room description"), null=False, blank=False)
-    owner = models.ForeignKey(User, on_delete=models.SET_NULL,
+    # Indexed through (owner, created_at) below
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, db_index=False,
                               null=True, blank=True, related_name="room_owner")
     topic = models.ForeignKey(Topic, on_delete=models.SET_NULL,
                               null=True, blank=False, related_name="room_topic")
     participants = models.ManyToManyField(
         User, related_name="room_participants")
+    # Number of participants; maintained by the m2m_changed signal
+    participants_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted room name, topic name and description; kept current by signals
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["topic"]),
             models.Index(fields=["room_name"]),
-            models.Index(fields=["room_description"]),
+            # Homepage (newest rooms) and profile (a user's newest rooms)
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["owner", "created_at"]),
+            # Full-text and trigram search; migration 0004 builds these on
+            # PostgreSQL only
+            GinIndex(fields=["search_vector"], name="chatcampusa_room_search_gin"),
+            GinIndex(fields=["room_name"], name="chatcampusa_room_name_trgm", opclasses=["gin_trgm_ops"]),
         ]
 
+    counter_fields = ("participants_count",)
+
+    def save(self, *args, **kwargs):
+        # The post_save signal adjusts Topic.room_count; commit both together
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.room_name
 
 
 # Message Model
 class Message(models.Model):
-    owner = models.ForeignKey(User, on_delete=models.CASCADE,
+    # Both foreign keys are indexed through the composite indexes below
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False,
                               null=False, blank=False, related_name="message_owner")
-    room = models.ForeignKey(Room, on_delete=models.CASCADE,
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, db_index=False,
                              null=False, blank=False, related_name="room_message")
     body = models.TextField(gettext_lazy(
         "message body"), null=False, blank=False)
@@ -85,7 +125,11 @@ class Message(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["room_id"]),
+            # Room history in order, with id as a stable tie-breaker
+            models.Index(fields=["room", "created_at", "id"]),
+            # A user's latest messages on their profile
+            models.Index(fields=["owner", "created_at"]),
+            # Latest messages on the homepage
             models.Index(fields=["created_at"]),
         ]
 
@@ -0,0 +1,21 @@
+from django.core.paginator import Paginator
+from rest_framework.pagination import PageNumberPagination
+
+
+class ParticipantPagination(PageNumberPagination):
+    """
+    Page-number pagination that can reuse a count the caller already has
+    (e.g. `Room.participants_count`) instead of running COUNT(*) per page.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self, count=None):
+        self.count = count
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        if self.count is not None:
+            paginator.count = self.count
+        return paginator
@@ -0,0 +1,222 @@
+from itertools import groupby
+from operator import itemgetter
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from .models import Message, Room, User
+from .projections import MESSAGE_MINIMAL, MESSAGE_PROFILE, ROOM_MINIMAL, ROOM_PROFILE, TOPIC, USER_MINIMAL
+from .utils import json_stream
+from .utils.participants import PARTICIPANTS_PAGE_SIZE, room_participants
+from .utils.search import search_messages, search_rooms
+from .utils.topics import atopics_count, top_topics, topics_count
+
+
+# Response bodies shared by the read views and the cache warmers in tasks.py,
+# so a cache hit and a cache miss return the same shape. The a*_payload
+# variants build the same bodies with the async ORM for async_views.py.
+def homepage_querysets(q):
+    rooms = (search_rooms(Room.objects.all(), q)
+             .select_related("topic", "owner")[:10])
+    messages = (search_messages(Message.objects.all(), q)
+                .select_related("owner", "room")[:10])
+    return rooms, messages
+
+
+def homepage_payload(q, request=None):
+    rooms, messages = homepage_querysets(q)
+    return {
+        "message": "Homepage details retrieved successfully.",
+        "rooms": ROOM_MINIMAL.serialize(rooms, request),
+        "topics": TOPIC.serialize(top_topics()),
+        "topics_count": topics_count(),
+        "room_messages": MESSAGE_MINIMAL.serialize(messages, request),
+    }
+
+
+async def ahomepage_payload(q, request=None):
+    rooms, messages = homepage_querysets(q)
+    return {
+        "message": "Homepage details retrieved successfully.",
+        "rooms": await ROOM_MINIMAL.aserialize(rooms, request),
+        "topics": await TOPIC.aserialize(top_topics()),
+        "topics_count": await atopics_count(),
+        "room_messages": await MESSAGE_MINIMAL.aserialize(messages, request),
+    }
+
+
+def room_detail_querysets(room_id):
+    room = Room.objects.filter(pk=room_id).select_related("topic", "owner")
+    messages = (Message.objects
+                .filter(room_id=room_id)
+                .select_related("owner")
+                .order_by("created_at", "id"))
+    participants = room_participants(Room(pk=room_id))[:PARTICIPANTS_PAGE_SIZE]
+    return room, messages, participants
+
+
+def room_detail_payload(room_id, request=None):
+    """Room details, or None if the room does not exist."""
+    room, messages, participants = room_detail_querysets(room_id)
+    room = ROOM_PROFILE.serialize_one(room, request)
+    if room is None:
+        return None
+    return {
+        "message": "Room details retrieve successfully",
+        "room": room,
+        "messages": MESSAGE_PROFILE.serialize(messages, request),
+        "participants": USER_MINIMAL.serialize(participants, request),
+    }
+
+
+def compressed_room_detail_payload(room_id, request=None):
+    """
+    room_detail_payload() as CompressedJSON, streaming the messages so memory
+    stays bounded however long the room's history is. None if no such room.
+    """
+    room, messages, participants = room_detail_querysets(room_id)
+    room = ROOM_PROFILE.serialize_one(room, request)
+    if room is None:
+        return None
+    return json_stream.compress({
+        "message": "Room details retrieve successfully",
+        "room": room,
+        "messages": MESSAGE_PROFILE.iter_serialize(messages, request, settings.PAYLOAD_CHUNK_SIZE),
+        "participants": USER_MINIMAL.serialize(participants, request),
+    })
+
+
+def latest_per(queryset, field, ids, limit):
+    """
+    The newest `limit` rows of `queryset` for each of `ids` in `field`, in one
+    query, the way `queryset.filter(field=id)[:limit]` would pick them.
+    """
+    return (queryset
+            .filter(**{f"{field}__in": ids})
+            .annotate(rank=Window(RowNumber(), partition_by=F(field), order_by=F("created_at").desc()))
+            .filter(rank__lte=limit)
+            .order_by(field, "-created_at"))
+
+
+def group_by_owner(items):
+    grouped = {}
+    for item in items:
+        grouped.setdefault(item["owner"]["id"], []).append(item)
+    return grouped
+
+
+def topic_summary():
+    """Topic leaderboard and count, fetched once for a batch of payloads."""
+    return {"topics": TOPIC.serialize(top_topics()), "topics_count": topics_count()}
+
+
+def compressed_room_detail_payloads(room_ids, request=None):
+    """
+    compressed_room_detail_payload() for many rooms, keyed by room id, in four
+    queries whatever the number of rooms. Missing rooms are left out.
+    """
+    rooms = {room["id"]: room for room in ROOM_PROFILE.serialize(
+        Room.objects.filter(pk__in=room_ids).select_related("topic", "owner"), request)}
+    if not rooms:
+        return {}
+
+    # First page of participants per room, in room_participants() order
+    memberships = (Room.participants.through.objects
+                   .filter(room_id__in=rooms)
+                   .annotate(rank=Window(RowNumber(), partition_by=F("room_id"), order_by=F("user_id").asc()))
+                   .filter(rank__lte=PARTICIPANTS_PAGE_SIZE)
+                   .order_by("room_id", "user_id")
+                   .values_list("room_id", "user_id"))
+    participant_ids = {}
+    for room_id, user_id in memberships:
+        participant_ids.setdefault(room_id, []).append(user_id)
+    members = {user["id"]: user for user in USER_MINIMAL.serialize(
+        User.objects.filter(pk__in={user_id for ids in participant_ids.values() for user_id in ids}), request)}
+
+    # Every room's history in one streamed query, split per room as it goes
+    messages = (Message.objects
+                .filter(room_id__in=rooms)
+                .select_related("owner")
+                .order_by("room_id", "created_at", "id"))
+    groups = groupby(MESSAGE_PROFILE.iter_serialize_keyed(
+        messages, "room_id", request, settings.PAYLOAD_CHUNK_SIZE), key=itemgetter(0))
+    group = next(groups, None)
+    built = {}
+    for room_id in sorted(rooms):
+        while group is not None and group[0] < room_id:
+            group = next(groups, None)
+        has_history = group is not None and group[0] == room_id
+        history = (message for _, message in group[1]) if has_history else ()
+        built[room_id] = json_stream.compress({
+            "message": "Room details retrieve successfully",
+            "room": rooms[room_id],
+            "messages": history,
+            "participants": [members[user_id] for user_id in participant_ids.get(room_id, ())
+                             if user_id in members],
+        })
+        if has_history:
+            group = next(groups, None)
+    return built
+
+
+def user_profile_querysets(user_id):
+    user = User.objects.filter(pk=user_id)
+    rooms = (Room.objects
+             .filter(owner_id=user_id)
+             .select_related("topic", "owner")[:10])
+    messages = (Message.objects
+                .filter(owner_id=user_id)
+                .select_related("room", "owner")[:8])
+    return user, rooms, messages
+
+
+def user_profile_payload(user_id, request=None):
+    """A user's profile with their latest rooms and messages, or None."""
+    user, rooms, messages = user_profile_querysets(user_id)
+    user = USER_MINIMAL.serialize_one(user, request)
+    if user is None:
+        return None
+    return {
+        "message": "User profile retrieve successfully",
+        "user": user,
+        "rooms": ROOM_MINIMAL.serialize(rooms, request),
+        "room_messages": MESSAGE_MINIMAL.serialize(messages, request),
+        "topics": TOPIC.serialize(top_topics()),
+        "topics_count": topics_count(),
+    }
+
+
+async def auser_profile_payload(user_id, request=None):
+    user, rooms, messages = user_profile_querysets(user_id)
+    user = await USER_MINIMAL.aserialize_one(user, request)
+    if user is None:
+        return None
+    return {
+        "message": "User profile retrieve successfully",
+        "user": user,
+        "rooms": await ROOM_MINIMAL.aserialize(rooms, request),
+        "room_messages": await MESSAGE_MINIMAL.aserialize(messages, request),
+        "topics": await TOPIC.aserialize(top_topics()),
+        "topics_count": await atopics_count(),
+    }
+
+
+def user_profile_payloads(user_ids, request=None):
+    """
+    user_profile_payload() for many users, keyed by user id, in five queries
+    whatever the number of users. Missing users are left out.
+    """
+    users = {user["id"]: user for user in USER_MINIMAL.serialize(User.objects.filter(pk__in=user_ids), request)}
+    if not users:
+        return {}
+    rooms = group_by_owner(ROOM_MINIMAL.serialize(
+        latest_per(Room.objects.select_related("topic", "owner"), "owner_id", users, 10), request))
+    messages = group_by_owner(MESSAGE_MINIMAL.serialize(
+        latest_per(Message.objects.select_related("room", "owner"), "owner_id", users, 8), request))
+    shared = topic_summary()
+    return {user_id: {
+        "message": "User profile retrieve successfully",
+        "user": user,
+        "rooms": rooms.get(user_id, []),
+        "room_messages": messages.get(user_id, []),
+        **shared,
+    } for user_id, user in users.items()}
@@ -0,0 +1,241 @@
+"""
+Read-only projections that produce the same JSON shapes as the minimal DRF
+serializers, built from `.values_list()` rows instead of model instances.
+
+Each projection compiles its field spec once into a plain function that turns
+a row tuple into nested dicts, so a list of rooms costs one dict literal per
+row rather than a serializer field walk per attribute.
+"""
+import datetime
+from collections import namedtuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import User
+from .serializers import (MessageMinimalSerializer, MessageProfileSerializer, RoomMinimalSerializer,
+                          RoomProfileSerializer, TopicSerializer, UserMinimalSerializer)
+
+# Resolved once per rows() call instead of once per value. With
+# `native_datetimes`, UTC datetimes are left for utils.codec to format, which
+# writes them exactly as DRF would.
+Context = namedtuple("Context", ["request", "timezone", "native_datetimes"])
+
+_datetime_field = serializers.DateTimeField()
+_ZERO = datetime.timedelta(0)
+
+
+def datetime_value(value, context):
+    # Mirrors serializers.DateTimeField.to_representation for ISO 8601 output
+    if value is None:
+        return None
+    if context.native_datetimes and value.utcoffset() == _ZERO:
+        return value
+    if api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+        return _datetime_field.to_representation(value)
+    if context.timezone is not None:
+        if value.tzinfo is not None:
+            value = value.astimezone(context.timezone)
+    elif value.tzinfo is not None:
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def file_url(storage):
+    # Mirrors serializers.FileField.to_representation with use_url=True
+    def convert(value, context):
+        if not value:
+            return None
+        url = storage.url(value)
+        request = context.request
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def make_context(request, native_datetimes):
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    # Leaving datetimes to the codec only matches DRF when it would output UTC
+    native_datetimes = (native_datetimes
+                        and (tz is datetime.timezone.utc or getattr(tz, "key", None) in ("UTC", "Etc/UTC"))
+                        and api_settings.DATETIME_FORMAT.lower() == ISO_8601)
+    return Context(request, tz, native_datetimes)
+
+
+class Column:
+    def __init__(self, path, convert=None):
+        self.path = path
+        self.convert = convert
+
+
+class Nested:
+    """A nested object that is null when the `null_if` column is null."""
+
+    def __init__(self, null_if, fields):
+        self.null_if = null_if
+        self.fields = fields
+
+
+class Projection:
+    def __init__(self, fields, serializer_class):
+        self.fields = fields
+        self.serializer_class = serializer_class
+        self.columns = []
+        self._converters = {}
+        source = f"def project(row, context):\n    return {self._compile(fields)}\n"
+        namespace = dict(self._converters)
+        exec(source, namespace)
+        self._project = namespace["project"]
+
+    def _column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return f"row[{self.columns.index(path)}]"
+
+    def _compile(self, fields):
+        items = []
+        for key, spec in fields.items():
+            if isinstance(spec, str):
+                spec = Column(spec)
+            if isinstance(spec, Nested):
+                expr = f"(None if {self._column(spec.null_if)} is None else {self._compile(spec.fields)})"
+            elif spec.convert is not None:
+                name = f"convert_{len(self._converters)}"
+                self._converters[name] = spec.convert
+                expr = f"{name}({self._column(spec.path)}, context)"
+            else:
+                expr = self._column(spec.path)
+            items.append(f"{key!r}: {expr}")
+        return "{" + ", ".join(items) + "}"
+
+    def rows(self, queryset, request=None, native_datetimes=False):
+        project = self._project
+        context = make_context(request, native_datetimes)
+        return [project(row, context) for row in queryset.values_list(*self.columns)]
+
+    def iter_rows(self, queryset, request=None, native_datetimes=False, chunk_size=2000):
+        """Like rows(), but fetched `chunk_size` rows at a time."""
+        project = self._project
+        context = make_context(request, native_datetimes)
+        for row in queryset.values_list(*self.columns).iterator(chunk_size=chunk_size):
+            yield project(row, context)
+
+    def first(self, queryset, request=None, native_datetimes=False):
+        rows = self.rows(queryset[:1], request, native_datetimes)
+        return rows[0] if rows else None
+
+    def serialize(self, queryset, request=None):
+        """
+        List payload for `queryset`, honouring settings.FAST_PROJECTIONS.
+        Only for payloads that are rendered or cached through utils.codec.
+        """
+        if settings.FAST_PROJECTIONS:
+            return self.rows(queryset, request, native_datetimes=True)
+        return self.serializer_class(queryset, many=True, context={"request": request}).data
+
+    def iter_serialize(self, queryset, request=None, chunk_size=2000):
+        """serialize() as an iterator, for utils.json_stream."""
+        if settings.FAST_PROJECTIONS:
+            yield from self.iter_rows(queryset, request, native_datetimes=True, chunk_size=chunk_size)
+            return
+        context = {"request": request}
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            yield self.serializer_class(instance, context=context).data
+
+    def iter_serialize_keyed(self, queryset, key, request=None, chunk_size=2000):
+        """iter_serialize() as (row's `key` column, item) pairs, e.g. to group by room."""
+        if settings.FAST_PROJECTIONS:
+            project = self._project
+            context = make_context(request, native_datetimes=True)
+            rows = queryset.values_list(*self.columns, key).iterator(chunk_size=chunk_size)
+            for row in rows:
+                yield row[-1], project(row, context)
+            return
+        context = {"request": request}
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            yield getattr(instance, key), self.serializer_class(instance, context=context).data
+
+    def serialize_one(self, queryset, request=None):
+        if settings.FAST_PROJECTIONS:
+            return self.first(queryset, request, native_datetimes=True)
+        instance = queryset.first()
+        if instance is None:
+            return None
+        return self.serializer_class(instance, context={"request": request}).data
+
+    # Async counterparts for the views in async_views.py
+    async def arows(self, queryset, request=None, native_datetimes=False):
+        project = self._project
+        context = make_context(request, native_datetimes)
+        return [project(row, context) async for row in queryset.values_list(*self.columns)]
+
+    async def afirst(self, queryset, request=None, native_datetimes=False):
+        rows = await self.arows(queryset[:1], request, native_datetimes)
+        return rows[0] if rows else None
+
+    async def aserialize(self, queryset, request=None):
+        if settings.FAST_PROJECTIONS:
+            return await self.arows(queryset, request, native_datetimes=True)
+        return await sync_to_async(self.serialize)(queryset, request)
+
+    async def aserialize_one(self, queryset, request=None):
+        if settings.FAST_PROJECTIONS:
+            return await self.afirst(queryset, request, native_datetimes=True)
+        return await sync_to_async(self.serialize_one)(queryset, request)
+
+
+avatar_url = file_url(User._meta.get_field("avatar").storage)
+
+
+def user_minimal_fields(prefix=""):
+    return {
+        "id": f"{prefix}id",
+        "avatar": Column(f"{prefix}avatar", avatar_url),
+        "first_name": f"{prefix}first_name",
+    }
+
+
+USER_MINIMAL = Projection(user_minimal_fields(), UserMinimalSerializer)
+
+TOPIC = Projection({
+    "id": "id",
+    "topic_name": "topic_name",
+    "room_count": "room_count",
+}, TopicSerializer)
+
+ROOM_MINIMAL = Projection({
+    "id": "id",
+    "room_name": "room_name",
+    "owner": Nested("owner__id", user_minimal_fields("owner__")),
+    "created_at": Column("created_at", datetime_value),
+    "participants_count": "participants_count",
+    "topic_details": Nested("topic__id", {"topic_name": "topic__topic_name"}),
+}, RoomMinimalSerializer)
+
+ROOM_PROFILE = Projection({
+    "id": "id",
+    "room_name": "room_name",
+    "room_description": "room_description",
+    "owner": Nested("owner__id", user_minimal_fields("owner__")),
+    "created_at": Column("created_at", datetime_value),
+    "participants_count": "participants_count",
+    "topic_details": Nested("topic__id", {"topic_name": "topic__topic_name"}),
+}, RoomProfileSerializer)
+
+MESSAGE_MINIMAL = Projection({
+    "id": "id",
+    "body": "body",
+    "created_at": Column("created_at", datetime_value),
+    "owner": Nested("owner__id", user_minimal_fields("owner__")),
+    "room": Nested("room__id", {"id": "room__id", "room_name": "room__room_name"}),
+}, MessageMinimalSerializer)
+
+MESSAGE_PROFILE = Projection({
+    "id": "id",
+    "body": "body",
+    "created_at": Column("created_at", datetime_value),
+    "owner": Nested("owner__id", user_minimal_fields("owner__")),
+}, MessageProfileSerializer)
@@ -0,0 +1,27 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from .utils import codec
+
+
+class FastJSONRenderer(BaseRenderer):
+    """JSON renderer backed by utils.codec (orjson when available)."""
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return codec.dumps(data)
+
+
+class FastJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return codec.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -2,5 +2,6 @@ from django.urls import re_path
 from . import consumers
 
 websocket_urlpatterns = [
-    re_path(r"ws/chat/(?P<id>\d+)/$", consumers.ChatRoom.as_asgi())
+    re_path(r"ws/chat/(?P<id>\d+)/$", consumers.ChatRoom.as_asgi()),
+    re_path(r"ws/dashboard/$", consumers.Dashboard.as_asgi()),
 ]
@@ -1,7 +1,6 @@
 from urllib.parse import urlparse
 from rest_framework import serializers
 from .models import Message, Room, Topic, User
-from PIL import Image
 import re
 import bleach
 
@@ -54,6 +53,7 @@ class UserSerializer(serializers.ModelSerializer):
 
         # check uploaded file is a real image
         if hasattr(value, "file"):
+            from PIL import Image
             try:
                 image = Image.open(value)
                 image.verify()
@@ -243,7 +243,7 @@ class RoomProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = ['id', 'room_name', 'room_description',
-                  'owner', 'created_at', 'topic_details']
+                  'owner', 'created_at', 'participants_count', 'topic_details']
 
 
 class MessageProfileSerializer(serializers.ModelSerializer):
@@ -1,167 +1,56 @@
-from django.db.models.signals import post_migrate, post_save, post_delete
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from chatcampusapp.tasks import invalidate_and_warm_all_cache
 from chatcampusapp.models import Topic, Room, Message
-from faker import Faker
-from faker.providers import BaseProvider
-import random
-from decouple import config
-import sys
+from chatcampusapp.db_routers import pin_entries, replica_aliases
+from chatcampusapp.utils.search import update_room_search_vectors
+from chatcampusapp.utils.auth_cache import invalidate_auth_user
+from chatcampusapp.utils.room_events import forget_room_events
+from chatcampusapp.utils.participants import recount_room_participants
+from chatcampusapp.utils.topics import adjust_topic_room_count, invalidate_topics_count
+from chatcampusapp.utils.dashboard_events import message_preview, publish_dashboard_event, room_preview, topic_count
 from django.core.cache import cache
 import logging
 logger = logging.getLogger("chatcampusapp")
 
-fake = Faker()
 User = get_user_model()
 
-TOPIC_NAMES = [
-    "Artificial Intelligence", "Machine Learning", "Web Development", "APIs",
-    "Cloud Computing", "Databases", "Cybersecurity", "DevOps", "Python", "JavaScript"
-]
 
-FIRST_NAMES = [
-    "Alice", "Bob", "Charlie", "Diana", "Ethan", "Fiona", "George", "Hannah", "Ivan", "Jasmine"
-]
+# Keep the cache warmers reading what a write changed from the primary until
+# replicas catch up. Chat traffic (messages, joins) pins only the entries it
+# changed; room, topic and profile edits show up in too many payloads to list.
+@receiver([post_save, post_delete], sender=Message)
+def pin_message_entries(sender, instance, **kwargs):
+    pin_entries(["homepage_cache", f"RoomID{instance.room_id}", f"UserID{instance.owner_id}"])
 
-class TechProvider(BaseProvider):
-    tech_topics = [
-        "technology", "programming", "software development", 
-        "education", "cloud computing", "AI", "web development"
-    ]
-    
-    def tech_sentence(self):
-        topic = random.choice(self.tech_topics)
-        return f"Experienced professional specializing in {topic} with a passion for innovation."
 
-fake.add_provider(TechProvider)
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Topic)
+def pin_all_entries(sender, **kwargs):
+    pin_entries()
 
 
-
-@receiver(post_migrate)
-def initialize_project_data(sender, **kwargs):
-    if 'test' in sys.argv:
-        logging.info("Skipping data seeding during test run.")
-        return
-    seed_initial_data()
+@receiver([post_save, post_delete], sender=User)
+def pin_user_entries(sender, update_fields=None, **kwargs):
+    # Logins only update last_login, which no payload shows
+    if update_fields is None or not update_fields <= {"last_login"}:
+        pin_entries()
 
 
-def seed_initial_data():
-    # Avoid reseeding if data exists
-    if Room.objects.exists():
+@receiver(m2m_changed, sender=Room.participants.through)
+def pin_membership_entries(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear") or not replica_aliases():
         return
-
-    logging.info("🌱 Seeding users...")
-    users = create_users()
-    logging.info("🌱 Seeding topics...")
-    topics = create_topics()
-    logging.info("🏗 Creating rooms...")
-    rooms = create_rooms(users, topics)
-    logging.info("💬 Creating messages...")
-    add_messages_and_participants(rooms, users)
-    logging.info("✅ Seeding completed.")
-
-
-def create_users():
-    if not User.objects.filter(email=config("DJANGO_SUPER_USER_EMAIL")).exists():
-        bio = fake.tech_sentence()
-        User.objects.create_superuser(
-            first_name=config("DJANGO_SUPER_USER_FIRSTNAME"),
-            last_name=config("DJANGO_SUPER_USER_LASTNAME"),
-            email=config("DJANGO_SUPER_USER_EMAIL"),
-            password=config("DJANGO_SUPER_USER_PASSWORD"),
-            bio=bio,
-        )
-
-    users = []
-    for name in FIRST_NAMES:
-        if not User.objects.filter(first_name=name.lower()).exists():
-            bio = fake.tech_sentence()
-            user = User.objects.create_user(
-                first_name=name.lower(),
-                last_name="smith",
-                email=f"{name.lower()}@gmail.com",
-                password="securepass123"
-            )
-            user.bio = bio
-            user.save()
-            users.append(user)
-        else:
-            users.append(User.objects.get(first_name=name.lower()))
-    return users
-
-
-def create_topics():
-    topics_objs = [Topic(topic_name=name) for name in TOPIC_NAMES]
-    Topic.objects.bulk_create(topics_objs, ignore_conflicts=True)
-    return list(Topic.objects.all())
-
-
-def create_rooms(users, topics):
-    rooms = []
-    for i, user in enumerate(users):
-        topic = random.choice(topics)
-        room = Room(
-            owner=user,
-            topic=topic,
-            room_name=f"{topic.topic_name} Discussion {i}",
-            room_description=f"Discussion on {topic.topic_name.lower()} and its applications.",
-        )
-        rooms.append(room)
-    Room.objects.bulk_create(rooms)
-    return list(Room.objects.all())
-
-
-def add_messages_and_participants(rooms, users):
-    through_model = Room.participants.through
-    through_entries = []
-    messages = []
-
-    total_users_count = len(users)
-
-    for room in rooms:
-        available_potential_participants = [
-            u for u in users if u != room.owner]
-        num_available_potential_participants = len(
-            available_potential_participants)
-
-        max_participants_to_add = min(num_available_potential_participants, 10)
-
-        if max_participants_to_add <= 0:
-            num_other_partcipants = 0
-        else:
-            num_other_partcipants = random.randint(1, max_participants_to_add)
-
-        other_participants = random.sample(
-            available_potential_participants,
-            k=num_other_partcipants
-        )
-        participants = set([room.owner])
-        participants.update(other_participants)
-
-        host_message = fake.tech_sentence()
-        messages.append(
-            Message(owner=room.owner, room=room, body=host_message)
-        )
-        through_entries.append(
-            through_model(user_id=room.owner.id, room_id=room.id)
-        )
-
-        for participant in other_participants:
-            through_entries.append(
-                through_model(user_id=participant.id, room_id=room.id)
-            )
-            num_messages = random.randint(1, 3)
-
-            for _ in range(num_messages):
-                message_body = fake.tech_sentence()
-                messages.append(
-                    Message(owner=participant,
-                            room_id=room.id, body=message_body)
-                )
-
-    through_model.objects.bulk_create(through_entries, ignore_conflicts=True)
-    Message.objects.bulk_create(messages)
+    if action == "post_clear":
+        pin_entries()
+    elif pk_set:
+        room_ids, user_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+        # participants_count also shows in the room owners' profiles
+        owner_ids = ([instance.owner_id] if not reverse else
+                     Room.objects.filter(pk__in=room_ids).values_list("owner_id", flat=True))
+        pin_entries(["homepage_cache", *(f"RoomID{room_id}" for room_id in room_ids),
+                     *(f"UserID{user_id}" for user_id in {*user_ids, *owner_ids})])
 
 
 @receiver([post_save], sender=Room)
@@ -180,6 +69,11 @@ def handle_room_delete(sender, instance, **kwargs):
     invalidate_and_warm_all_cache.delay({"model": "Room", "id": instance.id})
 
 
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    invalidate_auth_user(instance.pk)
+
+
 @receiver(post_delete, sender=User)
 def handle_user_delete(sender, instance, **kwargs):
     logger.info(f"User deleted: {instance.id}")
@@ -190,3 +84,145 @@ def handle_user_delete(sender, instance, **kwargs):
 def handle_generic_delete(sender, instance, **kwargs):
     logger.info(f"{sender.__name__} deleted: {instance.id}")
     invalidate_and_warm_all_cache.delay()
+
+
+# Homepage diffs for the dashboard WebSocket group
+def publish_topic_count(topic_id, delta):
+    if topic_id:
+        publish_dashboard_event(
+            "topic_count", lambda: topic_count(topic_id, delta))
+
+
+@receiver(pre_save, sender=Room)
+def remember_previous_room_topic(sender, instance, **kwargs):
+    instance._previous_topic_id = (
+        Room.objects.filter(pk=instance.pk).values_list(
+            "topic_id", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Room)
+def publish_room_dashboard_update(sender, instance, created, **kwargs):
+    previous_topic_id = getattr(instance, "_previous_topic_id", None)
+    if created:
+        publish_dashboard_event(
+            "room_created", lambda: room_preview(instance.pk))
+    if previous_topic_id != instance.topic_id:
+        publish_topic_count(previous_topic_id, -1)
+        publish_topic_count(instance.topic_id, 1)
+
+
+@receiver(post_delete, sender=Room)
+def forget_deleted_room_events(sender, instance, **kwargs):
+    forget_room_events(instance.id)
+
+
+@receiver(post_delete, sender=Room)
+def publish_room_dashboard_delete(sender, instance, **kwargs):
+    room_id = instance.id
+    publish_dashboard_event("room_deleted", lambda: {"id": room_id})
+    publish_topic_count(instance.topic_id, -1)
+
+
+@receiver(post_save, sender=Message)
+def publish_message_dashboard_update(sender, instance, created, **kwargs):
+    if created:
+        publish_dashboard_event(
+            "message_created", lambda: message_preview(instance.pk))
+
+
+@receiver(post_delete, sender=Message)
+def publish_message_dashboard_delete(sender, instance, **kwargs):
+    message_id, room_id = instance.id, instance.room_id
+    publish_dashboard_event(
+        "message_deleted", lambda: {"id": message_id, "room_id": room_id})
+
+
+@receiver(post_save, sender=Topic)
+def publish_topic_dashboard_update(sender, instance, created, **kwargs):
+    if created:
+        publish_dashboard_event("topics_count", lambda: {"delta": 1})
+
+
+@receiver(post_delete, sender=Topic)
+def publish_topic_dashboard_delete(sender, instance, **kwargs):
+    publish_dashboard_event("topics_count", lambda: {"delta": -1})
+
+
+# Keep Room.search_vector in step with room and topic names
+@receiver(post_save, sender=Room)
+def update_room_search_vector(sender, instance, **kwargs):
+    topic_name = instance.topic.topic_name if instance.topic_id else ""
+    update_room_search_vectors(Room.objects.filter(pk=instance.pk), topic_name)
+
+
+@receiver(pre_save, sender=Topic)
+def remember_previous_topic_name(sender, instance, **kwargs):
+    instance._previous_topic_name = (
+        Topic.objects.filter(pk=instance.pk).values_list(
+            "topic_name", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Topic)
+def update_topic_rooms_search_vector(sender, instance, created, **kwargs):
+    previous_name = getattr(instance, "_previous_topic_name", None)
+    if not created and previous_name != instance.topic_name:
+        update_room_search_vectors(instance.room_topic.all(), instance.topic_name)
+
+
+# Denormalized Topic.room_count and the cached total topic count
+@receiver(post_save, sender=Room)
+def update_topic_room_count(sender, instance, **kwargs):
+    previous_topic_id = getattr(instance, "_previous_topic_id", None)
+    if previous_topic_id != instance.topic_id:
+        adjust_topic_room_count(previous_topic_id, -1)
+        adjust_topic_room_count(instance.topic_id, 1)
+
+
+@receiver(post_delete, sender=Room)
+def decrement_topic_room_count(sender, instance, **kwargs):
+    adjust_topic_room_count(instance.topic_id, -1)
+
+
+@receiver(post_save, sender=Topic)
+def invalidate_topics_count_on_create(sender, instance, created, **kwargs):
+    if created:
+        invalidate_topics_count()
+
+
+@receiver(post_delete, sender=Topic)
+def invalidate_topics_count_on_delete(sender, instance, **kwargs):
+    invalidate_topics_count()
+
+
+# Denormalized Room.participants_count
+@receiver(m2m_changed, sender=Room.participants.through)
+def update_participants_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # Remember the rooms a user is about to leave; post_clear has no pk_set
+        instance._cleared_room_ids = list(
+            instance.room_participants.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        # Recount rather than add len(pk_set): concurrent adds of the same
+        # member each report it, though only one row gets inserted
+        recount_room_participants(pk_set if reverse else [instance.pk])
+    elif action == "post_clear":
+        if reverse:
+            recount_room_participants(getattr(instance, "_cleared_room_ids", []))
+        else:
+            Room.objects.filter(pk=instance.pk).update(participants_count=0)
+
+
+# Deleting a user cascades through the membership table without m2m_changed
+@receiver(pre_delete, sender=User)
+def remember_participant_rooms(sender, instance, **kwargs):
+    instance._participant_room_ids = list(
+        instance.room_participants.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=User)
+def recount_participant_rooms(sender, instance, **kwargs):
+    recount_room_participants(getattr(instance, "_participant_room_ids", []))
@@ -1,18 +1,31 @@
 import time
 from celery import shared_task
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
 from django.core.cache import cache
-from django.http import Http404
-from .models import User, Topic, Room, Message
-from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
-from .serializers import RoomProfileSerializer, MessageProfileSerializer, UserMinimalSerializer, RoomMinimalSerializer, MessageMinimalSerializer, TopicSerializer, RoomSerializer, MessageSerializer
-from chatcampusapp.utils.redis_tracking import track_used_query, track_used_room_id, track_used_user_id
-from django_redis import get_redis_connection
+from .db_routers import replica_reads
+from .payloads import (compressed_room_detail_payload, compressed_room_detail_payloads, homepage_payload,
+                       user_profile_payload, user_profile_payloads)
+from chatcampusapp.utils.metrics import cache_fill, task_timer_finished, task_timer_started
+from chatcampusapp.utils.query_budget import task_finished, task_started
+from chatcampusapp.utils.profiling import task_profile_finished, task_profile_started
+from chatcampusapp.utils.tracing import inject_task_headers, task_span_finished, task_span_started
+from chatcampusapp.utils import redis_tracking, search_admission
 
 import logging
 
 logger = logging.getLogger("chatcampusapp")
 
+task_prerun.connect(task_started, dispatch_uid="query_budget_task_started")
+task_postrun.connect(task_finished, dispatch_uid="query_budget_task_finished")
+task_prerun.connect(task_timer_started, dispatch_uid="metrics_task_started")
+task_postrun.connect(task_timer_finished, dispatch_uid="metrics_task_finished")
+before_task_publish.connect(inject_task_headers, dispatch_uid="tracing_inject_task_headers")
+task_prerun.connect(task_span_started, dispatch_uid="tracing_task_started")
+task_postrun.connect(task_span_finished, dispatch_uid="tracing_task_finished")
+task_prerun.connect(task_profile_started, dispatch_uid="profiling_task_started")
+task_postrun.connect(task_profile_finished, dispatch_uid="profiling_task_finished")
+
 
 def should_warm_dashboard_cache(q):
     key = f'dashboard_last_updated_{q}'
@@ -24,110 +37,85 @@ def should_warm_dashboard_cache(q):
     return True
 
 
-@shared_task
+@shared_task(query_budget=3)
 def warm_up_room_detail_view_cache(room_id):
-    try:
-        room = get_object_or_404(
-            Room.objects.select_related(
-                "topic", "owner").prefetch_related("participants"), id=room_id
-        )
-        messages = room.room_message.select_related(
-            "owner").order_by("created_at")
-        participants = room.participants.all()
-        data = {
-            "message": "Room details retrieve successfully",
-            "room": RoomProfileSerializer(room).data,
-            "messages": MessageProfileSerializer(messages, many=True).data,
-            "participants": UserMinimalSerializer(participants, many=True).data
-        }
+    with cache_fill(f"RoomID{room_id}"):
+        with replica_reads(entries=[f"RoomID{room_id}"]):
+            data = compressed_room_detail_payload(room_id)
+        if data is None:
+            logger.warning(f"Room {room_id} resulted in 404. Skipping.")
+            return
         cache.set(f"RoomID{room_id}", data, timeout=300)
-        track_used_room_id(room_id)
-    except Room.DoesNotExist:
-        logging.error("Room does not exist")
-    except Http404:
-        logger.warning(f"Room {room_id} resulted in 404. Skipping.")
 
 
-@shared_task
+@shared_task(query_budget=4)
 def warm_up_dashboard_view_cache(q):
     if not should_warm_dashboard_cache(q):
         logger.info(
             f"Skipped warming cache for query '{q}' as it was updated recently.")
         return
     try:
-        rooms = Room.objects.filter(
-            Q(topic__topic_name__icontains=q) |
-            Q(room_name__icontains=q) |
-            Q(room_description__icontains=q)
-        ).select_related("topic").only("id", "room_name", "room_description", "topic")[:10]
-
-        messages = Message.objects.filter(
-            Q(room__topic__topic_name__icontains=q)
-        ).select_related("owner", "room").only("id", "body", "room_id", "owner_id", "created_at")[:10]
-
-        all_topics = list(
-            Topic.objects.annotate(room_count=Count(
-                "room_topic")).order_by("-room_count")
-        )
-        topics = all_topics[:5]
-
-        data = {
-            "message": "Homepage details retrieved successfully.",
-            "rooms": RoomMinimalSerializer(rooms, many=True).data,
-            "topics": TopicSerializer(topics, many=True).data,
-            "topics_count": len(all_topics),
-            "room_messages": MessageMinimalSerializer(messages, many=True).data,
-        }
-
         cache_key = f'homepage_cache_{q}' if q else 'homepage_cache'
-        cache.set(cache_key, data, timeout=300)
-        track_used_query(q)
+        with cache_fill(cache_key):
+            # Search pages change with the homepage, and share its pin
+            with replica_reads(entries=["homepage_cache"]):
+                data = homepage_payload(q)
+            cache.set(cache_key, data, timeout=300)
+        if q:
+            search_admission.record_entry(q, 300)
 
     except Exception as e:
         logger.error(f"Error in warm_up_dashboard_view_cache: {e}")
 
 
-@shared_task
+@shared_task(query_budget=5)
 def warm_up_user_profile_view_cache(user_id):
-    try:
-        user_details = get_object_or_404(
-            User.objects.prefetch_related('room_owner', 'message_owner'), id=user_id)
-        rooms = user_details.room_owner.all().select_related('topic')
-        messages = user_details.message_owner.all(
-        ).select_related('room')[:8]
-        all_topics = list(Topic.objects.annotate(room_count=Count(
-            "room_topic")).order_by("-room_count"))
-        topics_count = len(all_topics)
-        topics = all_topics[:5]
-        data = {
-            "message": "User profile retrieve successfully",
-            "user": UserMinimalSerializer(user_details).data,
-            "rooms": RoomSerializer(rooms, many=True).data,
-            "room_messages": MessageSerializer(messages, many=True).data,
-            "topics": TopicSerializer(topics, many=True).data,
-            "topics_count": topics_count,
-        }
+    with cache_fill(f"UserID{user_id}"):
+        with replica_reads(entries=[f"UserID{user_id}"]):
+            data = user_profile_payload(user_id)
+        if data is None:
+            logging.error("User does not exist")
+            return
         cache.set(f"UserID{user_id}", data, 300)
-        track_used_user_id(user_id)
-    except User.DoesNotExist:
-        logging.error("User does not exist")
 
 
-@shared_task
+def chunked(ids, size):
+    ids = list(ids)
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
+# Batched warmers for invalidate_and_warm_all_cache: each rebuilds a chunk of
+# entries with a fixed number of set-based queries and writes them in one
+# pipeline, instead of one task, and one set of queries, per key
+@shared_task(query_budget=4)
+def warm_up_room_detail_view_caches(room_ids):
+    with cache_fill("RoomID", entries=len(room_ids)):
+        with replica_reads(entries=[f"RoomID{room_id}" for room_id in room_ids]):
+            built = compressed_room_detail_payloads(room_ids)
+        cache.set_many({f"RoomID{room_id}": data for room_id, data in built.items()}, timeout=300)
+
+
+@shared_task(query_budget=5)
+def warm_up_user_profile_view_caches(user_ids):
+    with cache_fill("UserID", entries=len(user_ids)):
+        with replica_reads(entries=[f"UserID{user_id}" for user_id in user_ids]):
+            built = user_profile_payloads(user_ids)
+        cache.set_many({f"UserID{user_id}": data for user_id, data in built.items()}, timeout=300)
+
+
+@shared_task(query_budget=0)
 def invalidate_and_warm_all_cache(payload=None):
-    redis = get_redis_connection("default")
+    redis_tracking.decay()
 
+    # Every cached search page is stale; only the hottest are rebuilt now,
+    # the rest once they are asked for again
     cache.delete("homepage_cache")
-    q_keys = redis.smembers("homepage_q_keys") or set()
-
-    pipe = redis.pipeline()
-    for q in q_keys:
-        q = q.decode() if isinstance(q, bytes) else q
-        pipe.delete(f"homepage_cache_{q}")
-    pipe.execute()
+    search_admission.invalidate_all()
 
-    for q in q_keys:
-        q = q.decode() if isinstance(q, bytes) else q
+    # One task per search page: each query is its own full-text search, with
+    # nothing to share in a batch
+    for q in redis_tracking.top(redis_tracking.POPULAR_QUERIES, settings.WARM_TOP_QUERIES,
+                                min_score=settings.SEARCH_ADMIT_MIN_HITS):
         warm_up_dashboard_view_cache.delay(q)
 
     warm_up_dashboard_view_cache.delay("")
@@ -136,27 +124,25 @@ def invalidate_and_warm_all_cache(payload=None):
     object_id = payload.get("id") if payload else None
 
     if model == "Room" and object_id:
-        pipe = redis.pipeline()
-        pipe.delete(f"RoomID{object_id}")
-        pipe.srem("room_ids_used", str(object_id))
-        pipe.execute()
+        cache.delete(f"RoomID{object_id}")
+        redis_tracking.forget(redis_tracking.POPULAR_ROOMS, object_id)
         logger.info(f"Deleted RoomID{object_id} from cache.")
         return
 
     if model == "User" and object_id:
-        pipe = redis.pipeline()
-        pipe.delete(f"UserID{object_id}")
-        pipe.srem("user_ids_used", str(object_id))
-        pipe.execute()
+        cache.delete(f"UserID{object_id}")
+        redis_tracking.forget(redis_tracking.POPULAR_USERS, object_id)
         logger.info(f"Deleted UserID{object_id} from cache.")
         return
 
-    room_ids = redis.smembers("room_ids_used") or set()
-    for room_id in room_ids:
-        rid = int(room_id.decode())
-        warm_up_room_detail_view_cache.delay(rid)
-
-    user_ids = redis.smembers("user_ids_used") or set()
-    for user_id in user_ids:
-        uid = int(user_id.decode())
-        warm_up_user_profile_view_cache.delay(uid)
+    # Every page read lately is tracked: rebuild the hottest and drop the
+    # rest, which fill again on their next read
+    room_ids = redis_tracking.top(redis_tracking.POPULAR_ROOMS, settings.TRACKING_MAX_MEMBERS)
+    cache.delete_many([f"RoomID{room_id}" for room_id in room_ids[settings.WARM_TOP_ROOMS:]])
+    for chunk in chunked(map(int, room_ids[:settings.WARM_TOP_ROOMS]), settings.WARM_CHUNK_SIZE):
+        warm_up_room_detail_view_caches.delay(chunk)
+
+    user_ids = redis_tracking.top(redis_tracking.POPULAR_USERS, settings.TRACKING_MAX_MEMBERS)
+    cache.delete_many([f"UserID{user_id}" for user_id in user_ids[settings.WARM_TOP_USERS:]])
+    for chunk in chunked(map(int, user_ids[:settings.WARM_TOP_USERS]), settings.WARM_CHUNK_SIZE):
+        warm_up_user_profile_view_caches.delay(chunk)
@@ -0,0 +1,160 @@
+import asyncio
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp import async_views
+from chatcampusapp.benchmarks.readpath import sync_only_middleware
+from chatcampusapp.models import Topic
+from chatcampusapp.payloads import homepage_payload, room_detail_payload, user_profile_payload
+from chatcampusapp.utils import codec, redis_tracking
+from chatcampusapp.utils.query_budget import QueryBudgetExceeded
+
+User = get_user_model()
+
+
+@skipUnless(settings.ASYNC_READ_VIEWS, "async read views are disabled")
+class AsyncReadViewsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+        cls.user.message_owner.create(room=cls.room, body="DevOps is great")
+
+    def setUp(self):
+        cache.clear()
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def get_json(self, url, **extra):
+        response = self.client.get(url, **{**self.auth, **extra})
+        return response, codec.loads(response.content)
+
+    def test_requires_authentication(self):
+        response = self.client.get(reverse("homepage"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_query_token_is_not_accepted(self):
+        token = AccessToken.for_user(self.user)
+        response = self.client.get(reverse("homepage"), {"token": str(token)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_homepage_matches_sync_payload(self):
+        response, data = self.get_json(reverse("homepage"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data, codec.loads(codec.dumps(homepage_payload(""))))
+
+    def test_room_detail_matches_sync_payload(self):
+        response, data = self.get_json(reverse("room-details-message-create", kwargs={"pk": self.room.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data, codec.loads(codec.dumps(room_detail_payload(self.room.id))))
+
+    def test_user_profile_matches_sync_payload(self):
+        response, data = self.get_json(reverse("user-profile", kwargs={"pk": self.user.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data, codec.loads(codec.dumps(user_profile_payload(self.user.id))))
+
+    def test_missing_room_and_user(self):
+        response, data = self.get_json(reverse("room-details-message-create", kwargs={"pk": 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(data["detail"], "No Room matches the given query.")
+        response, _ = self.get_json(reverse("user-profile", kwargs={"pk": 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_queries_are_counted_on_a_cache_miss(self):
+        # The view's queries run in executor threads, not the loop's own
+        urls = [reverse("homepage"), reverse("room-details-message-create", kwargs={"pk": self.room.id}),
+                reverse("user-profile", kwargs={"pk": self.user.id})]
+        for url in urls:
+            with self.subTest(url):
+                response = await self.async_client.get(url, headers={"Authorization": self.auth["HTTP_AUTHORIZATION"]})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                counter = response.asgi_request.query_counter
+                self.assertGreater(counter.count, 0)
+                self.assertGreater(counter.duration, 0)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    async def test_query_budgets_are_enforced(self):
+        views = [(async_views.homepage_view, reverse("homepage")),
+                 (async_views.room_detail_view, reverse("room-details-message-create", kwargs={"pk": self.room.id})),
+                 (async_views.user_profile_view, reverse("user-profile", kwargs={"pk": self.user.id}))]
+        headers = {"Authorization": self.auth["HTTP_AUTHORIZATION"]}
+        for view, url in views:
+            with self.subTest(url):
+                # Within the real budget on a cache miss, over a budget of none
+                await sync_to_async(cache.clear)()
+                response = await self.async_client.get(url, headers=headers)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                await sync_to_async(cache.clear)()
+                with mock.patch.object(view, "query_budget", 0):
+                    with self.assertRaises(QueryBudgetExceeded):
+                        await self.async_client.get(url, headers=headers)
+
+    def test_serves_cached_payload(self):
+        cache.set(f"RoomID{self.room.id}", {"message": "cached"})
+        _, data = self.get_json(reverse("room-details-message-create", kwargs={"pk": self.room.id}))
+        self.assertEqual(data, {"message": "cached"})
+
+    def test_post_message_goes_to_drf_view(self):
+        response = self.client.post(
+            reverse("room-details-message-create", kwargs={"pk": self.room.id}),
+            {"body": "Hello"}, content_type="application/json", **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.room.room_message.count(), 2)
+
+    def test_deactivated_user_is_rejected(self):
+        response, _ = self.get_json(reverse("homepage"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        response, _ = self.get_json(reverse("homepage"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@skipUnless(settings.ASYNC_READ_VIEWS, "async read views are disabled")
+class AsyncMiddlewareTestCase(TestCase):
+    """One sync-only middleware would run every async view through a worker thread."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="john@example.com", password="securepass123")
+
+    def test_every_middleware_is_async_capable(self):
+        self.assertEqual(sync_only_middleware(), [])
+
+    async def test_views_run_in_the_request_task(self):
+        tasks = []
+        original = async_views.cached_read
+
+        async def probe(*args, **kwargs):
+            tasks.append(asyncio.current_task())
+            return await original(*args, **kwargs)
+
+        with mock.patch.object(async_views, "cached_read", probe):
+            response = await self.async_client.get(
+                reverse("homepage"), headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # A sync middleware in between would run the view in an AsyncToSync task
+        self.assertIs(tasks[0], asyncio.current_task())
+
+    async def test_reads_are_tracked_on_the_async_path(self):
+        await sync_to_async(cache.clear)()
+        response = await self.async_client.get(
+            reverse("homepage"), {"q": "devops"},
+            headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        top = await sync_to_async(redis_tracking.top)(redis_tracking.POPULAR_QUERIES, 5)
+        self.assertEqual(top, ["devops"])
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from chatcampusapp import tasks
+from chatcampusapp.models import Topic
+from chatcampusapp.payloads import (compressed_room_detail_payload, compressed_room_detail_payloads,
+                                    user_profile_payload, user_profile_payloads)
+from chatcampusapp.utils import codec
+
+User = get_user_model()
+
+
+class BatchPayloadTestCase(TestCase):
+    """Batched payloads match the single-key ones they replace in the warmer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.users = [User.objects.create_user(email=f"user{n}@example.com", password="securepass123",
+                                              first_name=f"User {n}") for n in range(4)]
+        cls.rooms = []
+        for n, owner in enumerate(cls.users[:3]):
+            # More rooms and messages than a profile shows, for the per-user limits
+            for r in range(12):
+                room = owner.room_owner.create(topic=cls.topic, room_name=f"Room {n}.{r}",
+                                               room_description="Description")
+                cls.rooms.append(room)
+        busy, quiet = cls.rooms[0], cls.rooms[1]
+        for user in cls.users:
+            busy.participants.add(user)
+            for m in range(5):
+                user.message_owner.create(room=busy, body=f"Message {m} from {user.first_name}")
+        quiet.participants.add(cls.users[3])
+
+    def test_room_details_match(self):
+        room_ids = [room.id for room in self.rooms[:4]] + [999999]
+        built = compressed_room_detail_payloads(room_ids)
+        self.assertEqual(sorted(built), sorted(room_ids[:4]))
+        for room_id, payload in built.items():
+            self.assertEqual(payload.body, compressed_room_detail_payload(room_id).body)
+
+    @override_settings(FAST_PROJECTIONS=False)
+    def test_room_details_match_with_serializers(self):
+        room_ids = [room.id for room in self.rooms[:2]]
+        built = compressed_room_detail_payloads(room_ids)
+        for room_id in room_ids:
+            self.assertEqual(built[room_id].json(), compressed_room_detail_payload(room_id).json())
+
+    def test_user_profiles_match(self):
+        user_ids = [user.id for user in self.users] + [999999]
+        built = user_profile_payloads(user_ids)
+        self.assertEqual(sorted(built), sorted(user_ids[:4]))
+        for user_id, payload in built.items():
+            self.assertEqual(codec.dumps(payload), codec.dumps(user_profile_payload(user_id)))
+            self.assertLessEqual(len(payload["rooms"]), 10)
+            self.assertLessEqual(len(payload["room_messages"]), 8)
+
+    def test_chunk_tasks_fill_the_cache(self):
+        cache.clear()
+        tasks.warm_up_room_detail_view_caches.run([self.rooms[0].id, 999999])
+        tasks.warm_up_user_profile_view_caches.run([self.users[0].id])
+        self.assertIsNotNone(cache.get(f"RoomID{self.rooms[0].id}"))
+        self.assertIsNone(cache.get("RoomID999999"))
+        self.assertEqual(cache.get(f"UserID{self.users[0].id}"),
+                         codec.loads(codec.dumps(user_profile_payload(self.users[0].id))))
+
+    def test_keys_are_split_into_chunks(self):
+        self.assertEqual(tasks.chunked(range(5), 2), [[0, 1], [2, 3], [4]])
@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from chatcampusapp.models import Topic
+from chatcampusapp.tasks import warm_up_room_detail_view_cache
+from chatcampusapp.utils import metrics
+
+User = get_user_model()
+
+
+@override_settings(METRICS_FLUSH_SECONDS=0)
+class CacheInstrumentationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+
+    def setUp(self):
+        cache.clear()
+        metrics.flush()
+        metrics.reset_metrics()
+
+    def report(self):
+        out = StringIO()
+        call_command("cache_report", "--json", stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_records_lookups_writes_and_deletes_per_family(self):
+        self.assertIsNone(cache.get("RoomID1"))
+        cache.set("RoomID1", {"room": "x" * 100})
+        self.assertEqual(cache.get("RoomID1"), {"room": "x" * 100})
+        cache.get_many(["UserID1", "RoomID1"])
+        cache.delete("RoomID1")
+
+        room = self.report()["families"]["RoomID"]
+        self.assertEqual((room["hits"], room["misses"]), (2, 1))
+        self.assertEqual(room["hit_ratio"], 0.667)
+        self.assertEqual(room["writes"], 1)
+        self.assertGreater(room["avg_bytes"], 100)
+        self.assertEqual(room["deletes"], 1)
+        self.assertEqual(self.report()["families"]["UserID"]["misses"], 1)
+
+    def test_default_is_returned_on_miss(self):
+        self.assertEqual(cache.get("RoomID1", "fallback"), "fallback")
+        cache.set("RoomID1", None)
+        self.assertIsNone(cache.get("RoomID1", "fallback"))
+
+    def test_entries_decoding_to_none_count_as_misses(self):
+        cache.set("RoomID1", None)
+        self.assertIsNone(cache.get("RoomID1"))
+        cache.get_many(["RoomID1"])
+        room = self.report()["families"]["RoomID"]
+        self.assertEqual((room["hits"], room["misses"]), (0, 2))
+
+    def test_warmers_record_fill_time_and_live_keys(self):
+        warm_up_room_detail_view_cache.run(self.room.id)
+        report = self.report()
+        room = report["families"]["RoomID"]
+        self.assertEqual(room["writes"], 1)
+        self.assertIsNotNone(room["avg_fill_ms"])
+        self.assertEqual(room["live_keys"], 1)
+        self.assertIn("evicted_keys", report["redis"])
+
+    def test_table_output(self):
+        cache.get("homepage_cache_devops")
+        out = StringIO()
+        call_command("cache_report", stdout=out)
+        self.assertIn("homepage_cache", out.getvalue())
+        self.assertIn("evicted_keys=", out.getvalue())
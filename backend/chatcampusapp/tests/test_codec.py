@@ -0,0 +1,122 @@
+import datetime
+import decimal
+import pickle
+from io import BytesIO
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from chatcampusapp import cache_serializers
+from chatcampusapp.cache_serializers import CodecSerializer
+from chatcampusapp.renderers import FastJSONParser, FastJSONRenderer
+from chatcampusapp.utils import codec
+
+
+class CodecTestCase(SimpleTestCase):
+
+    payload = {
+        "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2025, 1, 2),
+        "price": decimal.Decimal("1.50"),
+        "label": gettext_lazy("room name"),
+        "ids": (1, 2),
+        "body": "café <b>",
+        "nested": [{"a": None, "b": True, "c": 1.5}],
+    }
+
+    def test_backends_produce_identical_json(self):
+        with override_settings(JSON_CODEC="orjson"):
+            fast = codec.dumps(self.payload)
+        with override_settings(JSON_CODEC="json"):
+            slow = codec.dumps(self.payload)
+        self.assertEqual(fast, slow)
+        self.assertIn(b'"2025-01-02T03:04:05.000678Z"', fast)
+
+    def test_renderer_matches_drf_json_renderer(self):
+        data = {"created_at": "2025-01-02T03:04:05Z", "body": "café", "items": [1, 2]}
+        self.assertEqual(codec.loads(FastJSONRenderer().render(data)),
+                         codec.loads(JSONRenderer().render(data)))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_parser_rejects_invalid_json(self):
+        self.assertEqual(FastJSONParser().parse(BytesIO(b'{"body": "hi"}')), {"body": "hi"})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b"{not json"))
+
+
+class CodecSerializerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.serializer = CodecSerializer({})
+
+    @override_settings(CACHE_FORMAT="json")
+    def test_payloads_are_stored_as_json(self):
+        value = {"message": "ok", "rooms": [{"id": 1}]}
+        stored = self.serializer.dumps_payload(value)
+        self.assertTrue(stored.startswith(b"J"))
+        self.assertEqual(self.serializer.loads(stored), value)
+
+    @override_settings(CACHE_FORMAT="msgpack", CACHE_COMPRESS_MIN_BYTES=1024)
+    def test_msgpack_loads_like_json(self):
+        value = {"message": "ok", "created_at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+                 "rooms": [{"id": 1, "tags": ("a", "b")}]}
+        stored = self.serializer.dumps_payload(value)
+        self.assertTrue(stored.startswith(b"M"))
+        self.assertEqual(self.serializer.loads(stored), codec.loads(codec.dumps(value)))
+
+    @override_settings(CACHE_COMPRESSOR="zlib", CACHE_COMPRESS_MIN_BYTES=100)
+    def test_large_payloads_are_compressed(self):
+        small, large = {"body": "x"}, {"messages": [{"body": "hello " * 10, "id": n} for n in range(50)]}
+        self.assertFalse(self.serializer.dumps_payload(small).startswith(b"C"))
+        stored = self.serializer.dumps_payload(large)
+        self.assertTrue(stored.startswith(b"Cd"))
+        self.assertLess(len(stored), len(codec.dumps(large)) / 5)
+        self.assertEqual(self.serializer.loads(stored), large)
+
+    @override_settings(CACHE_COMPRESSOR="no-such-codec", CACHE_COMPRESS_MIN_BYTES=0)
+    def test_unavailable_compressor_falls_back_to_zlib(self):
+        value = {"messages": ["hello"] * 100}
+        self.assertTrue(self.serializer.dumps_payload(value).startswith(b"Cd"))
+        with override_settings(CACHE_COMPRESSOR="none"):
+            self.assertFalse(self.serializer.dumps_payload(value).startswith(b"C"))
+
+    def test_unreadable_compressed_entries_are_misses(self):
+        with override_settings(CACHE_COMPRESSOR="zlib", CACHE_COMPRESS_MIN_BYTES=0):
+            stored = self.serializer.dumps_payload({"messages": ["hello"] * 100})
+        # As in a process without the package the entry was compressed with
+        with mock.patch.dict(cache_serializers.DECOMPRESSORS):
+            del cache_serializers.DECOMPRESSORS[b"d"]
+            self.assertIsNone(self.serializer.loads(stored))
+        self.assertIsNone(self.serializer.loads(b"C?data"))
+        self.assertIsNone(self.serializer.loads(b"Cdnot zlib"))
+
+    def test_reads_entries_written_in_other_formats(self):
+        value = {"message": "ok", "rooms": [{"id": 1}] * 100}
+        for cache_format in ("json", "msgpack"):
+            for compressor in ("none", "zlib"):
+                with override_settings(CACHE_FORMAT=cache_format, CACHE_COMPRESSOR=compressor,
+                                       CACHE_COMPRESS_MIN_BYTES=0):
+                    stored = self.serializer.dumps_payload(value)
+                with override_settings(CACHE_FORMAT="msgpack", CACHE_COMPRESSOR="zstd"):
+                    self.assertEqual(self.serializer.loads(stored), value)
+
+    def test_other_values_are_pickled(self):
+        for value in ({1: "int key"}, {"ids": {1, 2}}, 1.5, "text", ("a", "b")):
+            self.assertEqual(self.serializer.loads(self.serializer.dumps_payload(value)), value)
+
+    def test_only_payload_keys_are_stored_lossily(self):
+        value = {"created_at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+                 "tags": ("a", "b")}
+        cache.set("some_other_value", value)
+        self.assertEqual(cache.get("some_other_value"), value)
+        for key in ("RoomID1", "UserID1", "homepage_cache", "homepage_cache_devops"):
+            cache.set(key, value)
+            self.assertEqual(cache.get(key), codec.loads(codec.dumps(value)))
+        cache.delete_many(["some_other_value", "RoomID1", "UserID1", "homepage_cache",
+                           "homepage_cache_devops"])
+
+    def test_reads_existing_pickled_entries(self):
+        value = {"message": "ok"}
+        self.assertEqual(self.serializer.loads(pickle.dumps(value)), value)
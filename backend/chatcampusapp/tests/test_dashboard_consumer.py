@@ -0,0 +1,84 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Topic
+from chatcampusapp.routing import websocket_urlpatterns
+from chatcampusapp.utils.dashboard_events import DASHBOARD_GROUP, send_dashboard_event
+
+User = get_user_model()
+
+
+class DashboardConsumerTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic1 = Topic.objects.create(topic_name="DevOps")
+
+    def setUp(self):
+        self.application = URLRouter(websocket_urlpatterns)
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(self.application, "/ws/dashboard/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        established = await communicator.receive_json_from()
+        self.assertEqual(established["type"], "connection_established")
+        return communicator
+
+    async def test_dashboard_invalid_token_closes(self):
+        communicator = await self.connect()
+        await communicator.send_json_to({"action": "Auth_Check", "token": "bad"})
+        self.assertEqual((await communicator.receive_output())["type"], "websocket.close")
+
+    async def test_dashboard_authenticated_receives_updates(self):
+        communicator = await self.connect()
+        await communicator.send_json_to({"action": "Auth_Check", "token": self.token})
+        auth = await communicator.receive_json_from()
+        self.assertEqual(auth["type"], "auth_success")
+
+        await sync_to_async(send_dashboard_event)("topics_count", {"delta": 1})
+        update = await communicator.receive_json_from()
+        self.assertEqual(update["type"], "dashboard_update")
+        self.assertEqual(update["kind"], "topics_count")
+        self.assertEqual(update["data"], {"delta": 1})
+        self.assertIn("event_id", update)
+        await communicator.disconnect()
+
+    def receive_group_events(self, action):
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(DASHBOARD_GROUP, channel_name)
+        with self.captureOnCommitCallbacks(execute=True):
+            action()
+        events = {}
+        for _ in range(2):
+            event = async_to_sync(channel_layer.receive)(channel_name)
+            events[event["kind"]] = event["data"]
+        async_to_sync(channel_layer.group_discard)(DASHBOARD_GROUP, channel_name)
+        return events
+
+    def test_room_create_publishes_room_and_topic_diffs(self):
+        room = None
+
+        def create_room():
+            nonlocal room
+            room = self.user.room_owner.create(
+                topic=self.topic1, room_name="Devops room", room_description="Devops room description")
+
+        events = self.receive_group_events(create_room)
+        self.assertEqual(events["room_created"]["id"], room.id)
+        self.assertEqual(events["room_created"]["room_name"], "Devops room")
+        self.assertEqual(events["topic_count"]["id"], self.topic1.id)
+        self.assertEqual(events["topic_count"]["delta"], 1)
+        self.assertEqual(events["topic_count"]["room_count"], 1)
@@ -0,0 +1,49 @@
+from collections import Counter
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from chatcampusapp.datagen import EMAIL_DOMAIN, Generator
+from chatcampusapp.models import Message, Room
+
+SCALE = {"users": 40, "rooms": 20, "messages": 600, "max_participants": 15, "seed": 7, "batch_size": 100}
+
+
+def message_rows():
+    return list(Message.objects.order_by("id").values_list("room__room_name", "owner__email", "body"))
+
+
+class GenerateDataTestCase(TestCase):
+
+    def test_generates_skewed_dataset(self):
+        call_command("generate_data", "--users=40", "--rooms=20", "--messages=600",
+                     "--max-participants=15", "--batch-size=100", stdout=StringIO())
+        self.assertEqual(Room.objects.filter(owner__email__endswith=EMAIL_DOMAIN).count(), 20)
+        self.assertEqual(Message.objects.count(), 600)
+        per_room = Counter(Message.objects.values_list("room_id", flat=True))
+        busiest = per_room.most_common(1)[0][1]
+        # Zipf: the busiest room gets far more than an even share
+        self.assertGreater(busiest, 3 * 600 / 20)
+        room = Room.objects.get(pk=per_room.most_common(1)[0][0])
+        # ...and, being the most active, one of the largest memberships
+        self.assertEqual(room.participants_count, room.participants.count())
+        self.assertGreater(room.participants_count, 10)
+        # Every message is written by a participant of its room
+        for message in Message.objects.select_related("room")[:50]:
+            self.assertTrue(message.room.participants.filter(pk=message.owner_id).exists())
+
+    def test_same_seed_gives_same_rows(self):
+        Generator(**SCALE).run()
+        first = message_rows()
+        Message.objects.all().delete()
+        Generator(**SCALE).run()
+        self.assertEqual(message_rows(), first)
+
+    def test_resumes_after_last_batch(self):
+        Generator(**SCALE).run()
+        complete = message_rows()
+        # Lose the last two batches, as if the run had been interrupted
+        Message.objects.filter(pk__in=Message.objects.order_by("-id").values("pk")[:200]).delete()
+        Generator(**SCALE).run()
+        self.assertEqual(message_rows(), complete)
+        self.assertEqual(Room.participants.through.objects.count(),
+                         sum(Room.objects.values_list("participants_count", flat=True)))
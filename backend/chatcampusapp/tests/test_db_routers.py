@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from chatcampusapp.db_routers import ReplicaRouter, pin_primary, replica_reads
+from chatcampusapp.models import Room, Topic
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(topic=cls.topic, room_name="Devops room")
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_replica_block(self):
+        self.assertIsNone(self.router.db_for_read(Room))
+        self.assertEqual(self.router.db_for_write(Room), "default")
+
+    def test_replica_block_routes_reads_to_replica(self):
+        with replica_reads(self.user.pk):
+            self.assertEqual(self.router.db_for_read(Room), "replica1")
+            self.assertEqual(self.router.db_for_write(Room), "default")
+        self.assertIsNone(self.router.db_for_read(Room))
+
+    def test_users_own_write_pins_primary(self):
+        other = User.objects.create_user(email="jane@example.com", password="securepass123")
+        cache.clear()
+        pin_primary(self.user.pk)
+        with replica_reads(self.user.pk):
+            self.assertIsNone(self.router.db_for_read(Room))
+        with replica_reads(other.pk):
+            self.assertEqual(self.router.db_for_read(Room), "replica1")
+        # The warmers go by the entries a write changed
+        with replica_reads(entries=[f"RoomID{self.room.id}"]):
+            self.assertEqual(self.router.db_for_read(Room), "replica1")
+
+    def test_model_write_pins_primary_for_warmers(self):
+        Topic.objects.create(topic_name="Python")
+        with replica_reads(entries=[f"RoomID{self.room.id}"]):
+            self.assertIsNone(self.router.db_for_read(Room))
+
+    def test_chat_writes_pin_only_the_entries_they_change(self):
+        other_room = self.user.room_owner.create(topic=self.topic, room_name="Python room")
+        member = User.objects.create_user(email="jane@example.com", password="securepass123")
+        cache.clear()
+        self.room.participants.add(member)
+        self.user.message_owner.create(room=self.room, body="Hello")
+        for entries in (["homepage_cache"], [f"RoomID{self.room.id}"],
+                        [f"UserID{self.user.id}"], [f"UserID{member.id}"]):
+            with replica_reads(entries=entries):
+                self.assertIsNone(self.router.db_for_read(Room), entries)
+        with replica_reads(entries=[f"RoomID{other_room.id}"]):
+            self.assertEqual(self.router.db_for_read(Room), "replica1")
+
+    def test_login_does_not_pin_primary(self):
+        cache.clear()
+        response = self.client.post(reverse("token_obtain_pair"),
+                                    {"email": "john@example.com", "password": "securepass123"})
+        self.assertEqual(response.status_code, 200)
+        with replica_reads(entries=[f"UserID{self.user.id}"]):
+            self.assertEqual(self.router.db_for_read(Room), "replica1")
+
+    def test_write_request_pins_primary_for_user(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(
+            reverse("room-details-message-create", kwargs={"pk": self.room.id}),
+            {"body": "Hello"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        with replica_reads(self.user.pk):
+            self.assertIsNone(self.router.db_for_read(Room))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Room))
@@ -0,0 +1,67 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from chatcampusapp.benchmarks import endpoints, write_report
+
+
+def result(p50=10.0, p95=20.0, queries=3, peak_alloc_kb=100.0):
+    return {"latency_ms": {"p50": p50, "p95": p95}, "queries": queries,
+            "peak_alloc_kb": peak_alloc_kb, "statuses": [200]}
+
+
+class CompareTestCase(SimpleTestCase):
+
+    def compare(self, current, threshold=0.2, min_delta_ms=1.0):
+        return endpoints.compare({"homepage_warm": current}, {"homepage_warm": result()},
+                                 threshold, min_delta_ms)
+
+    def test_latency_within_threshold_passes(self):
+        self.assertEqual(self.compare(result(p50=11.9, p95=23.9)), [])
+
+    def test_latency_beyond_threshold_regresses(self):
+        self.assertEqual(self.compare(result(p50=12.5)), ["homepage_warm: p50 10.0 ms -> 12.5 ms"])
+        self.assertEqual(self.compare(result(p95=30.0), threshold=0.5), [])
+
+    def test_small_absolute_changes_pass(self):
+        # 10 ms -> 12.5 ms is past 20%, but not past a 5 ms floor
+        self.assertEqual(self.compare(result(p50=12.5), min_delta_ms=5.0), [])
+        self.assertEqual(len(self.compare(result(p50=15.0), min_delta_ms=5.0)), 1)
+
+    def test_any_query_increase_regresses(self):
+        self.assertEqual(self.compare(result(queries=4)), ["homepage_warm: 3 -> 4 queries"])
+        self.assertEqual(self.compare(result(queries=2)), [])
+
+    def test_allocation_growth_regresses(self):
+        self.assertEqual(self.compare(result(peak_alloc_kb=130.0)),
+                         ["homepage_warm: peak allocations 100.0 KiB -> 130.0 KiB"])
+
+    def test_scenarios_missing_from_baseline_are_skipped(self):
+        self.assertEqual(endpoints.compare({"room_create": result(queries=9)}, {"homepage_warm": result()},
+                                           0.2, 1.0), [])
+
+
+class BaselineTestCase(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "baseline.json")
+
+    def test_loads_saved_baseline(self):
+        write_report({"rooms": {}, "scenarios": {"homepage_warm": result()}}, self.path)
+        self.assertEqual(endpoints.load_baseline(self.path), {"homepage_warm": result()})
+
+    def test_loads_json_report(self):
+        report = {"rooms": {}, "scenarios": {"homepage_warm": result(queries=4)}, "regressions": []}
+        with mock.patch.object(endpoints, "run", return_value=report):
+            call_command("benchmark", "endpoints", "--json", self.path, stdout=StringIO())
+        self.assertEqual(endpoints.load_baseline(self.path), {"homepage_warm": result(queries=4)})
+
+    def test_regressions_fail_the_command(self):
+        report = {"scenarios": {}, "regressions": ["homepage_warm: 3 -> 4 queries"]}
+        with mock.patch.object(endpoints, "run", return_value=report):
+            with self.assertRaisesMessage(CommandError, "1 regression(s) found"):
+                call_command("benchmark", "endpoints", stdout=StringIO())
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient, APITestCase
 from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import status
 
 User = get_user_model()
@@ -46,7 +47,8 @@ class HomePageAPIViewTestCase(APITestCase):
         self.homepage_url = reverse("homepage")
 
     def authenticate(self, user=None):
-        self.client.force_authenticate(user=user or self.user)
+        # Real JWTs: the async read views do their own authentication
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user or self.user)}")
 
     def test_homepage_view_unauthenticated_failed(self):
         response = self.client.get(self.homepage_url)
@@ -0,0 +1,67 @@
+import gzip
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Topic
+from chatcampusapp.payloads import compressed_room_detail_payload, room_detail_payload
+from chatcampusapp.tasks import warm_up_room_detail_view_cache
+from chatcampusapp.utils import codec, json_stream
+
+User = get_user_model()
+
+
+class CompressTestCase(TestCase):
+
+    @override_settings(PAYLOAD_CHUNK_SIZE=2)
+    def test_iterators_become_arrays(self):
+        payload = json_stream.compress({"a": 1, "rows": iter([{"n": n} for n in range(5)]),
+                                        "empty": iter([]), "nested": {"b": [1, 2]}})
+        self.assertEqual(payload.decode(), {"a": 1, "rows": [{"n": n} for n in range(5)],
+                                            "empty": [], "nested": {"b": [1, 2]}})
+
+
+class CompressedRoomDetailTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+        for n in range(5):
+            cls.user.message_owner.create(room=cls.room, body=f"Message {n}")
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+
+    @override_settings(PAYLOAD_CHUNK_SIZE=2)
+    def test_matches_the_dict_payload(self):
+        expected = codec.loads(codec.dumps(room_detail_payload(self.room.id)))
+        self.assertEqual(compressed_room_detail_payload(self.room.id).decode(), expected)
+        self.assertIsNone(compressed_room_detail_payload(999999))
+
+    def test_warmer_caches_it_compressed(self):
+        warm_up_room_detail_view_cache(self.room.id)
+        cached = cache.get(f"RoomID{self.room.id}")
+        self.assertIsInstance(cached, json_stream.CompressedJSON)
+        self.assertEqual(len(cached.decode()["messages"]), 5)
+
+    def test_served_gzipped_when_accepted(self):
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        warm_up_room_detail_view_cache(self.room.id)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br", **auth)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(codec.loads(gzip.decompress(response.content))["room"]["id"], self.room.id)
+
+        response = self.client.get(self.url, **auth)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(codec.loads(response.content)["messages"]), 5)
@@ -0,0 +1,128 @@
+import threading
+from unittest import mock
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Topic
+from chatcampusapp.routing import websocket_urlpatterns
+from chatcampusapp.tasks import warm_up_dashboard_view_cache
+from chatcampusapp.utils import metrics
+
+User = get_user_model()
+
+
+class KeyFamilyTestCase(SimpleTestCase):
+
+    def test_key_family(self):
+        self.assertEqual(metrics.key_family("RoomID12"), "RoomID")
+        self.assertEqual(metrics.key_family("homepage_cache_devops"), "homepage_cache")
+        self.assertEqual(metrics.key_family("homepage_cache"), "homepage_cache")
+        self.assertEqual(metrics.key_family("topics_count"), "topics_count")
+
+
+class RenderTestCase(SimpleTestCase):
+
+    def test_values_render_exactly(self):
+        lines = list(metrics.CACHE_LOOKUPS.render({'family="RoomID"': "1234567", 'family="UserID"': "1234567.125"}))
+        self.assertEqual(lines, ['cache_lookups_total{family="RoomID"} 1234567',
+                                 'cache_lookups_total{family="UserID"} 1234567.125'])
+        lines = list(metrics.HTTP_RESPONSE_SIZE.render({"|+Inf": "2000000", "|sum": "4000000000.5"}))
+        self.assertIn('http_response_size_bytes_bucket{le="+Inf"} 2000000', lines)
+        self.assertIn("http_response_size_bytes_sum 4000000000.5", lines)
+        self.assertIn("http_response_size_bytes_count 2000000", lines)
+
+
+@override_settings(METRICS_TOKEN="scrape-token", METRICS_FLUSH_SECONDS=0)
+class MetricsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+
+    def setUp(self):
+        # Sends queued by earlier tests would otherwise land after the clear
+        metrics.flush()
+        cache.clear()
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def scrape(self):
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode().splitlines()
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        with override_settings(METRICS_TOKEN="", DEBUG=False):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    def test_records_requests_by_route(self):
+        url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+        self.client.get(url, **self.auth)
+        self.client.get(url, **self.auth)
+        lines = self.scrape()
+        self.assertIn('http_requests_total{method="GET",route="api/roomDetails/<int:pk>/",status="200"} 2',
+                      lines)
+        self.assertIn('http_request_duration_seconds_count{route="api/roomDetails/<int:pk>/"} 2', lines)
+        self.assertIn('http_request_duration_seconds_bucket{route="api/roomDetails/<int:pk>/",le="+Inf"} 2',
+                      lines)
+        self.assertIn('http_response_size_bytes_count{route="api/roomDetails/<int:pk>/"} 2', lines)
+        self.assertIn('cache_lookups_total{family="RoomID",result="miss"} 1', lines)
+        self.assertIn('cache_lookups_total{family="RoomID",result="hit"} 1', lines)
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.001, 0.02, 20):
+            metrics.TASK_LATENCY.observe(value, task="example")
+        lines = self.scrape()
+        self.assertIn('celery_task_duration_seconds_bucket{task="example",le="0.005"} 1', lines)
+        self.assertIn('celery_task_duration_seconds_bucket{task="example",le="0.025"} 2', lines)
+        self.assertIn('celery_task_duration_seconds_bucket{task="example",le="10"} 2', lines)
+        self.assertIn('celery_task_duration_seconds_bucket{task="example",le="+Inf"} 3', lines)
+        self.assertIn('celery_task_duration_seconds_count{task="example"} 3', lines)
+
+    def test_records_celery_tasks(self):
+        warm_up_dashboard_view_cache.delay("")
+        lines = self.scrape()
+        name = warm_up_dashboard_view_cache.name
+        self.assertIn(f'celery_tasks_total{{state="SUCCESS",task="{name}"}} 1', lines)
+        self.assertIn(f'celery_task_duration_seconds_count{{task="{name}"}} 1', lines)
+
+    def test_due_flushes_are_sent_off_the_calling_thread(self):
+        senders = []
+        send = metrics._pending._send
+
+        def record(pending):
+            if pending:
+                senders.append(threading.current_thread())
+            send(pending)
+
+        with mock.patch.object(metrics._pending, "_send", record):
+            metrics.record_websocket_event("Dashboard", "websocket.connect")
+            metrics.flush()
+        self.assertEqual(len(senders), 1)
+        self.assertIsNot(senders[0], threading.current_thread())
+
+    async def test_records_websocket_events(self):
+        # Drop counts still pending from earlier consumer tests
+        metrics.flush()
+        metrics.reset_metrics()
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/dashboard/")
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.disconnect()
+        metrics.flush()
+        rendered = metrics.render_metrics()
+        self.assertIn('websocket_events_total{consumer="Dashboard",event="websocket.connect"} 1', rendered)
+        self.assertIn('websocket_events_total{consumer="Dashboard",event="websocket.disconnect"} 1', rendered)
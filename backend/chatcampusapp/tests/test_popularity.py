@@ -0,0 +1,132 @@
+import time
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp import tasks
+from chatcampusapp.models import Topic
+from chatcampusapp.utils import redis_tracking
+
+User = get_user_model()
+
+
+@override_settings(TRACKING_HALF_LIFE_SECONDS=100, TRACKING_MIN_SCORE=0.5, TRACKING_MAX_MEMBERS=3)
+class DecayTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.redis = get_redis_connection("default")
+
+    def scores(self):
+        return {member.decode(): score for member, score in
+                self.redis.zrange(redis_tracking.POPULAR_ROOMS, 0, -1, withscores=True)}
+
+    def test_scores_halve_every_half_life(self):
+        for room_id in (1, 1, 1, 1, 2):
+            redis_tracking.track_used_room_id(room_id)
+        redis_tracking.decay(now=1000)
+        self.assertEqual(self.scores(), {"1": 4, "2": 1})
+        redis_tracking.decay(now=1100)
+        self.assertEqual(self.scores(), {"1": 2, "2": 0.5})
+        # Below TRACKING_MIN_SCORE once it decays under 0.5
+        redis_tracking.decay(now=1200)
+        self.assertEqual(self.scores(), {"1": 1})
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_ROOMS, 5), ["1"])
+
+    def test_only_the_top_members_are_kept(self):
+        for room_id in range(1, 6):
+            for _ in range(room_id):
+                redis_tracking.track_used_room_id(room_id)
+        redis_tracking.decay(now=1000)
+        redis_tracking.decay(now=1000)
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_ROOMS, 10), ["5", "4", "3"])
+        self.assertEqual(self.redis.zcard(redis_tracking.seen_key(redis_tracking.POPULAR_ROOMS)), 3)
+
+    @override_settings(TRACKING_IDLE_SECONDS=60)
+    def test_idle_members_expire_individually(self):
+        now = time.time()
+        redis_tracking.track_used_room_id(1)
+        redis_tracking.track_used_room_id(2)
+        self.redis.zadd(redis_tracking.seen_key(redis_tracking.POPULAR_ROOMS), {"1": now - 120})
+        redis_tracking.decay(now=now)
+        self.assertEqual(self.scores(), {"2": 1})
+
+
+class BufferedTrackingTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.redis = get_redis_connection("default")
+
+    def test_reads_are_written_when_the_block_ends(self):
+        with redis_tracking.buffered():
+            redis_tracking.track_used_room_id(1)
+            redis_tracking.track_used_room_id(1)
+            redis_tracking.track_used_query("devops")
+            self.assertEqual(self.redis.zcard(redis_tracking.POPULAR_ROOMS), 0)
+        self.assertEqual(self.redis.zscore(redis_tracking.POPULAR_ROOMS, "1"), 2)
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_QUERIES, 5), ["devops"])
+        self.assertIsNotNone(self.redis.zscore(redis_tracking.seen_key(redis_tracking.POPULAR_ROOMS), "1"))
+
+    def test_async_reads_join_the_buffer(self):
+        with redis_tracking.buffered():
+            async_to_sync(redis_tracking.atrack)(redis_tracking.POPULAR_USERS, 7)
+            self.assertEqual(self.redis.zcard(redis_tracking.POPULAR_USERS), 0)
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_USERS, 5), ["7"])
+
+
+class WarmingBudgetTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.rooms = [cls.user.room_owner.create(topic=cls.topic, room_name=f"Room {n}",
+                                                room_description="Description") for n in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_reads_are_tracked(self):
+        for room, reads in zip(self.rooms, (3, 1, 0)):
+            for _ in range(reads):
+                self.client.get(reverse("room-details-message-create", kwargs={"pk": room.id}))
+        self.client.get(reverse("room-details-message-create", kwargs={"pk": 999999}))
+        self.client.get(reverse("homepage"), {"q": "devops"})
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_ROOMS, 10),
+                         [str(self.rooms[0].id), str(self.rooms[1].id)])
+        self.assertEqual(redis_tracking.top(redis_tracking.POPULAR_QUERIES, 10), ["devops"])
+
+    @override_settings(WARM_TOP_ROOMS=1, WARM_TOP_QUERIES=1)
+    def test_only_the_hottest_are_rewarmed(self):
+        for room in self.rooms:
+            redis_tracking.track_used_room_id(room.id)
+        redis_tracking.track_used_room_id(self.rooms[2].id)
+        for q in ("devops", "devops", "typo"):
+            redis_tracking.track_used_query(q)
+        with mock.patch.object(tasks.warm_up_room_detail_view_caches, "delay") as warm_rooms, \
+                mock.patch.object(tasks.warm_up_dashboard_view_cache, "delay") as warm_dashboard:
+            tasks.invalidate_and_warm_all_cache()
+        warm_rooms.assert_called_once_with([self.rooms[2].id])
+        self.assertEqual(sorted(call.args[0] for call in warm_dashboard.call_args_list), ["", "devops"])
+
+    @override_settings(WARM_TOP_ROOMS=1)
+    def test_cold_rooms_are_fresh_after_a_write(self):
+        hot, cold = self.rooms[0], self.rooms[1]
+        for room in (hot, hot, cold):
+            self.client.get(reverse("room-details-message-create", kwargs={"pk": room.id}))
+        url = reverse("room-details-message-create", kwargs={"pk": cold.id})
+        self.client.post(url, {"body": "Posted over REST"}, format="json")
+        messages = self.client.get(url).json()["messages"]
+        self.assertIn("Posted over REST", [message["body"] for message in messages])
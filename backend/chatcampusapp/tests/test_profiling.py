@@ -0,0 +1,93 @@
+import pstats
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from chatcampusapp.tasks import warm_up_dashboard_view_cache
+from chatcampusapp.utils.profiling import list_profiles, profile_path, sign_profile_request
+
+User = get_user_model()
+
+
+class ProfilingTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.admin = User.objects.create_user(
+            email="admin@example.com",
+            password="securepass123",
+            is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        settings = override_settings(PROFILING_ENABLED=True, PROFILING_DIR=profile_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = reverse("topic-list")
+
+    def get_profiled(self, signature):
+        self.client.force_authenticate(self.user)
+        return self.client.get(self.url, HTTP_X_PROFILE=signature)
+
+    def test_signed_request_is_profiled(self):
+        response = self.get_profiled(sign_profile_request(self.url))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        name = response["X-Profile-Id"]
+        self.assertTrue(name.endswith(".prof"))
+        stats = pstats.Stats(profile_path(name))
+        self.assertTrue(any(func[2] == "get" for func in stats.stats))
+
+    def test_signature_is_bound_to_the_path(self):
+        response = self.get_profiled(sign_profile_request("/api/rooms/"))
+        self.assertNotIn("X-Profile-Id", response)
+        response = self.get_profiled("forged")
+        self.assertNotIn("X-Profile-Id", response)
+        with override_settings(PROFILING_ENABLED=False):
+            response = self.get_profiled(sign_profile_request(self.url))
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list_profiles(), [])
+
+    @override_settings(PROFILING_MODE="sampling", PROFILING_INTERVAL_MS=1, PROFILING_SAMPLE_RATE=1.0)
+    def test_sampling_mode_writes_folded_stacks(self):
+        response = self.get_profiled("")
+        with open(profile_path(response["X-Profile-Id"])) as f:
+            lines = f.read().splitlines()
+        # Very fast requests may finish before the first sample
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertNotIn(" ", stack)
+
+    def test_signed_task_is_profiled(self):
+        task = warm_up_dashboard_view_cache
+        task.apply(args=("",), headers={"x_profile": sign_profile_request(task.name)})
+        self.assertEqual(len(list_profiles()), 1)
+        self.assertIn("-task-", list_profiles()[0].name)
+
+    def test_profiles_are_listed_for_staff_only(self):
+        name = self.get_profiled(sign_profile_request(self.url))["X-Profile-Id"]
+        self.assertEqual(self.client.get(reverse("profile-list")).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse("profile-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["profiles"][0]["name"], name)
+        self.assertEqual(response.data["profiles"][0]["kind"], "http")
+        download = self.client.get(reverse("profile-download", kwargs={"name": name}))
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        download.close()
+        missing = self.client.get(reverse("profile-download", kwargs={"name": "..prof"}))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
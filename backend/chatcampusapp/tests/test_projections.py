@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from chatcampusapp.models import Message, Room, Topic
+from chatcampusapp.payloads import homepage_payload, room_detail_payload, user_profile_payload
+from chatcampusapp.utils import codec
+from chatcampusapp.projections import (MESSAGE_MINIMAL, MESSAGE_PROFILE, ROOM_MINIMAL, ROOM_PROFILE,
+                                       TOPIC, USER_MINIMAL)
+
+User = get_user_model()
+
+
+class ProjectionTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick",
+            avatar="images/john.png"
+        )
+        cls.user2 = User.objects.create_user(
+            email="james@example.com",
+            password="pass123",
+            first_name="James"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room1 = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+        # A room without owner or topic, both nullable foreign keys
+        cls.room2 = Room.objects.create(room_name="Orphan room", room_description="No owner")
+        cls.room1.participants.add(cls.user, cls.user2)
+        cls.user.message_owner.create(room=cls.room1, body="<b>DevOps</b> is great")
+        cls.user2.message_owner.create(room=cls.room2, body="Anyone here?")
+
+    def setUp(self):
+        self.request = APIRequestFactory().get("/")
+
+    def assertSameAsSerializer(self, projection, queryset):
+        for request in (None, self.request):
+            expected = projection.serializer_class(
+                queryset, many=True, context={"request": request}).data
+            self.assertEqual(projection.rows(queryset, request), expected)
+
+    def test_projections_match_serializers(self):
+        self.assertSameAsSerializer(USER_MINIMAL, User.objects.all())
+        self.assertSameAsSerializer(TOPIC, Topic.objects.all())
+        self.assertSameAsSerializer(ROOM_MINIMAL, Room.objects.all())
+        self.assertSameAsSerializer(ROOM_PROFILE, Room.objects.all())
+        self.assertSameAsSerializer(MESSAGE_MINIMAL, Message.objects.all())
+        self.assertSameAsSerializer(MESSAGE_PROFILE, Message.objects.all())
+
+    def test_projections_match_serializers_in_other_timezone(self):
+        with timezone.override("Asia/Kolkata"):
+            self.assertSameAsSerializer(ROOM_MINIMAL, Room.objects.all())
+            self.assertSameAsSerializer(MESSAGE_PROFILE, Message.objects.all())
+
+    def test_payloads_match_serializer_fallback(self):
+        builders = [
+            lambda request: homepage_payload("", request),
+            lambda request: homepage_payload("devops", request),
+            lambda request: room_detail_payload(self.room1.pk, request),
+            lambda request: user_profile_payload(self.user.pk, request),
+        ]
+        for build in builders:
+            with override_settings(FAST_PROJECTIONS=True):
+                fast = build(self.request)
+            with override_settings(FAST_PROJECTIONS=False):
+                slow = build(self.request)
+            # Fast payloads leave datetimes to the codec, so compare the JSON
+            self.assertEqual(codec.dumps(fast), codec.dumps(slow))
+
+    def test_missing_objects(self):
+        self.assertIsNone(room_detail_payload(999999))
+        self.assertIsNone(user_profile_payload(999999))
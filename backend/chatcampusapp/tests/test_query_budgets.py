@@ -0,0 +1,151 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp import views
+from chatcampusapp.models import Room, Topic
+from chatcampusapp.tasks import (warm_up_dashboard_view_cache, warm_up_room_detail_view_cache,
+                                 warm_up_room_detail_view_caches, warm_up_user_profile_view_cache,
+                                 warm_up_user_profile_view_caches)
+from chatcampusapp.utils.query_budget import (QueryBudgetAssertionsMixin, QueryBudgetExceeded, QueryCounter,
+                                             view_query_budget)
+
+User = get_user_model()
+
+
+class QueryBudgetFixtureMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+        # Enough related rows for an N+1 to repeat a query shape
+        for i in range(5):
+            member = User.objects.create_user(email=f"member{i}@example.com", password="securepass123")
+            cls.room.participants.add(member)
+            member.message_owner.create(room=cls.room, body=f"Message {i}")
+        cls.other_room = member.room_owner.create(
+            topic=cls.topic, room_name="Other room", room_description="Other room description")
+        cls.other_room.participants.add(cls.user)
+        cls.user.message_owner.create(room=cls.other_room, body="Hello")
+
+
+class ViewQueryBudgetTestCase(QueryBudgetFixtureMixin, QueryBudgetAssertionsMixin, APITestCase):
+    """Every budgeted endpoint, on a cache miss, with real JWT authentication."""
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_room_retrieve_update_delete(self):
+        budget = views.RoomUpdateRetrieveDeleteAPIView.query_budget
+        url = reverse("room-get-update-delete", kwargs={"pk": self.room.id})
+        with self.assertQueryBudget(budget["GET"]):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["room"]["participants"]), 5)
+        with self.assertQueryBudget(budget["PATCH"]):
+            response = self.client.patch(url, {"topic": "DevOps", "room_name": "Renamed"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertQueryBudget(budget["DELETE"]):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_room_create(self):
+        with self.assertQueryBudget(views.RoomCreateAPIView.query_budget):
+            response = self.client.post(reverse("room-topic-create-list"), {
+                "topic": "Python", "room_name": "Python room", "room_description": "About Python"
+            }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_room_details_and_message_create(self):
+        budget = views.RoomDetailMessageCreateAPIView.query_budget
+        url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+        with self.assertQueryBudget(budget["GET"]):
+            self.client.get(url)
+        with self.assertQueryBudget(budget["POST"]):
+            response = self.client.post(url, {"body": "Hello"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_read_views(self):
+        cases = [
+            (views.HomePageAPIView, reverse("homepage")),
+            (views.UserProfileAPIView, reverse("user-profile", kwargs={"pk": self.user.id})),
+            (views.RoomParticipantsAPIView, reverse("room-participants", kwargs={"pk": self.room.id})),
+            (views.TopicListAPIView, reverse("topic-list")),
+        ]
+        for view, url in cases:
+            with self.subTest(view.__name__), self.assertQueryBudget(view.query_budget):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_every_read_route_has_a_budget(self):
+        # With ASYNC_READ_VIEWS these resolve to the async function views
+        urls = [reverse("homepage"), reverse("user-profile", kwargs={"pk": self.user.id}),
+                reverse("room-details-message-create", kwargs={"pk": self.room.id})]
+        for url in urls:
+            with self.subTest(url):
+                self.assertIsNotNone(view_query_budget(resolve(url), "GET"))
+
+    def test_message_delete(self):
+        message = self.user.message_owner.create(room=self.room, body="Bye")
+        with self.assertQueryBudget(views.MessageDeleteAPIView.query_budget):
+            response = self.client.delete(reverse("message-delete", kwargs={"pk": message.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class TaskQueryBudgetTestCase(QueryBudgetFixtureMixin, QueryBudgetAssertionsMixin, TestCase):
+
+    def test_warmers_stay_within_budget(self):
+        cases = [
+            (warm_up_dashboard_view_cache, ""),
+            (warm_up_room_detail_view_cache, self.room.id),
+            (warm_up_user_profile_view_cache, self.user.id),
+            # Batches cost the same however many keys they hold
+            (warm_up_room_detail_view_caches, [self.room.id, self.other_room.id]),
+            (warm_up_user_profile_view_caches, list(User.objects.values_list("id", flat=True))),
+        ]
+        for task, arg in cases:
+            cache.clear()
+            with self.subTest(task.name), self.assertQueryBudget(task.query_budget):
+                task.run(arg)
+
+
+class QueryCounterTestCase(QueryBudgetFixtureMixin, TestCase):
+
+    def test_flags_repeated_query_shapes(self):
+        with QueryCounter() as counter:
+            for message in self.room.room_message.all():
+                message.owner.email
+        self.assertEqual(counter.count, 6)
+        self.assertEqual(list(counter.repeated().values()), [5])
+
+    def test_in_lists_share_a_shape(self):
+        with QueryCounter() as counter:
+            list(Room.objects.filter(pk__in=[1]))
+            list(Room.objects.filter(pk__in=[1, 2, 3]))
+        self.assertEqual(len(set(counter.shapes)), 1)
+
+    def test_eager_tasks_are_counted_separately(self):
+        with QueryCounter() as counter:
+            warm_up_room_detail_view_cache.delay(self.room.id)
+        self.assertEqual(counter.count, 0)
+
+    def test_middleware_logs_and_raises_over_budget(self):
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        with mock.patch.object(views.TopicListAPIView, "query_budget", 0):
+            with self.assertLogs("chatcampusapp.queries", "WARNING") as logs:
+                self.client.get(reverse("topic-list"), **auth)
+            self.assertIn("budget is 0", logs.output[0])
+            with override_settings(QUERY_BUDGET_STRICT=True), self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("topic-list"), **auth)
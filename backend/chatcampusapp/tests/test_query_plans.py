@@ -0,0 +1,109 @@
+import json
+import re
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from chatcampusapp.models import Message, Room, Topic
+from chatcampusapp.payloads import homepage_querysets, room_detail_querysets, user_profile_querysets
+from chatcampusapp.utils.participants import recount_room_participants
+from chatcampusapp.utils.topics import recount_topic_rooms, top_topics
+
+User = get_user_model()
+
+# Tables that grow with usage; a full scan of any of them on a hot path is a regression
+LARGE_TABLES = {
+    Message._meta.db_table,
+    Room._meta.db_table,
+    Room.participants.through._meta.db_table,
+    User._meta.db_table,
+}
+
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)( USING (?:COVERING )?INDEX)?")
+
+
+def sequential_scans(queryset):
+    """Large tables that the query plan for `queryset` reads in full."""
+    if connection.vendor == "postgresql":
+        scans = []
+        nodes = [json.loads(queryset.explain(format="json"))[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan" and node["Relation Name"] in LARGE_TABLES:
+                scans.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return scans
+    # SQLite reports any full traversal as SCAN; walking an index in order is
+    # only cheap when a LIMIT stops it early
+    limited = queryset.query.high_mark is not None
+    return [table for table, by_index in SQLITE_SCAN.findall(queryset.explain())
+            if table in LARGE_TABLES and not (by_index and limited)]
+
+
+class QueryPlanTestCase(TestCase):
+    """
+    EXPLAIN the ORM queries behind views.py, tasks.py and consumers.py and
+    fail on sequential scans over large tables. PostgreSQL is run with
+    enable_seqscan off, so a Seq Scan means no index can serve the query.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([
+            User(email=f"user{i}@example.com", first_name=f"user{i}") for i in range(50)])
+        topics = Topic.objects.bulk_create([Topic(topic_name=f"Topic {i}") for i in range(10)])
+        rooms = Room.objects.bulk_create([
+            Room(owner=users[i % len(users)], topic=topics[i % len(topics)],
+                 room_name=f"Room {i}", room_description=f"Room {i} description")
+            for i in range(40)])
+        Message.objects.bulk_create([
+            Message(owner=users[i % len(users)], room=rooms[i % len(rooms)], body=f"Message {i}")
+            for i in range(800)])
+        Room.participants.through.objects.bulk_create([
+            Room.participants.through(room=room, user=users[(room.pk + j) % len(users)])
+            for room in rooms for j in range(10)])
+        recount_topic_rooms()
+        recount_room_participants()
+        cls.room = rooms[0]
+        cls.user = users[0]
+        # Fresh statistics so the planner sees the seeded row counts
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                # Scoped to the test's transaction
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def hot_queries(self):
+        room_id, user_id = self.room.pk, self.user.pk
+        homepage_rooms, homepage_messages = homepage_querysets("")
+        room, room_messages, participants = room_detail_querysets(room_id)
+        profile_user, profile_rooms, profile_messages = user_profile_querysets(user_id)
+        return {
+            # Read views and the warm_up_* tasks (payloads.py)
+            "homepage rooms": homepage_rooms,
+            "homepage messages": homepage_messages,
+            "top topics": top_topics(),
+            "room detail": room,
+            "room messages": room_messages,
+            "room participants": participants,
+            "profile user": profile_user,
+            "profile rooms": profile_rooms,
+            "profile messages": profile_messages,
+            # Lookups by id in views.py and consumers.py
+            "room by id": Room.objects.filter(pk=room_id),
+            "message by id": Message.objects.select_related("owner").filter(pk=1),
+            # Cascades when a room or a user is deleted
+            "room delete cascade": Message.objects.filter(room_id=room_id),
+            "user delete cascade": Message.objects.filter(owner_id=user_id),
+            "user delete set null": Room.objects.filter(owner_id=user_id),
+        }
+
+    def test_hot_queries_avoid_sequential_scans(self):
+        if connection.vendor not in ("postgresql", "sqlite"):
+            self.skipTest(f"No plan parser for {connection.vendor}")
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(name):
+                self.assertEqual(sequential_scans(queryset), [], queryset.explain())
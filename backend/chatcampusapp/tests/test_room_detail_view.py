@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
 
 User = get_user_model()
 
@@ -47,7 +48,8 @@ class RoomDetailAPIViewTestCase(APITestCase):
             "room-details-message-create", kwargs={"pk": self.room1.id})
 
     def authenticate(self, user=None):
-        self.client.force_authenticate(user=user or self.user)
+        # Real JWTs: the async read views do their own authentication
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user or self.user)}")
 
     def test_room_detail_view_unauthenticated_failed(self):
         response = self.client.get(self.room_detail_url)
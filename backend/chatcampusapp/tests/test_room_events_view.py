@@ -0,0 +1,148 @@
+import json
+from unittest import mock
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django_redis import get_redis_connection
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Topic
+from chatcampusapp.utils import room_events
+from chatcampusapp.utils.room_events import record_room_event, room_events_since, room_group_name
+
+User = get_user_model()
+
+
+class RoomEventsViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic1 = Topic.objects.create(topic_name="DevOps")
+        cls.room1 = cls.user.room_owner.create(
+            topic=cls.topic1, room_name="Devops room", room_description="Devops room description")
+
+    def setUp(self):
+        self.token = str(AccessToken.for_user(self.user))
+        self.room_events_url = reverse(
+            "room-events", kwargs={"pk": self.room1.id})
+
+    async def read_events(self, response, count):
+        chunks = []
+        stream = response.streaming_content
+        while len(chunks) < count:
+            chunk = await anext(stream)
+            chunks.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+        await stream.aclose()
+        return chunks
+
+    async def test_room_events_unauthenticated_failed(self):
+        response = await self.async_client.get(self.room_events_url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", response.json())
+
+    async def test_room_events_invalid_token_failed(self):
+        response = await self.async_client.get(
+            self.room_events_url, {"token": "not-a-token"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_room_events_wrong_room_id_failed(self):
+        response = await self.async_client.get(
+            reverse("room-events", kwargs={"pk": 100}), {"token": self.token})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_room_events_stream_headers(self):
+        response = await self.async_client.get(
+            self.room_events_url, headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = await self.read_events(response, 1)
+        self.assertTrue(chunks[0].startswith("retry:"))
+
+    async def test_room_events_resume_from_last_event_id(self):
+        first = record_room_event(self.room1.id, {
+            "type": "chat_message", "message": {"id": 1, "body": "first"}})
+        second = record_room_event(self.room1.id, {
+            "type": "chat_message_delete", "message_id": 1})
+
+        response = await self.async_client.get(
+            self.room_events_url, {"token": self.token},
+            headers={"Last-Event-ID": str(first["event_id"])})
+        self.assertEqual(response.status_code, 200)
+        chunks = await self.read_events(response, 2)
+
+        self.assertIn(f"id: {second['event_id']}", chunks[1])
+        self.assertIn("event: chat_message_delete", chunks[1])
+        data = json.loads(chunks[1].split("data: ", 1)[1])
+        self.assertEqual(data, {"type": "chat_message_delete", "message_id": 1})
+
+    def test_room_events_since_is_complete_within_the_log(self):
+        event = record_room_event(self.room1.id, {
+            "type": "chat_message", "message": {"id": 2, "body": "hello"}})
+        events, complete = room_events_since(self.room1.id, event["event_id"] - 1)
+        self.assertEqual([e["event_id"] for e in events], [event["event_id"]])
+        self.assertTrue(complete)
+
+    def test_room_events_since_detects_gap(self):
+        first = record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 1})
+        with mock.patch.object(room_events, "EVENT_LOG_LENGTH", 1):
+            record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 2})
+            last = record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 3})
+        events, complete = room_events_since(self.room1.id, first["event_id"])
+        self.assertEqual([e["event_id"] for e in events], [last["event_id"]])
+        self.assertFalse(complete)
+
+        # An expired log loses everything, yet the id counter remains
+        get_redis_connection("default").delete(room_events._event_log_key(self.room1.id))
+        events, complete = room_events_since(self.room1.id, first["event_id"])
+        self.assertEqual(events, [])
+        self.assertFalse(complete)
+
+    def test_deleting_the_room_forgets_its_events(self):
+        record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 1})
+        room_id = self.room1.id
+        self.room1.delete()
+        self.assertEqual(get_redis_connection("default").exists(
+            room_events._event_log_key(room_id), room_events._event_id_key(room_id)), 0)
+
+    async def test_room_events_stream_asks_for_resync_after_gap(self):
+        first = record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 1})
+        with mock.patch.object(room_events, "EVENT_LOG_LENGTH", 1):
+            record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 2})
+            last = record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 3})
+
+        response = await self.async_client.get(
+            self.room_events_url, {"token": self.token},
+            headers={"Last-Event-ID": str(first["event_id"])})
+        chunks = await self.read_events(response, 3)
+        self.assertIn("event: resync", chunks[1])
+        self.assertIn(f"id: {last['event_id']}", chunks[2])
+
+    def test_event_ids_follow_log_order(self):
+        ids = [record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": n})["event_id"]
+               for n in range(3)]
+        events, _ = room_events_since(self.room1.id, 0)
+        self.assertEqual([e["event_id"] for e in events], ids)
+        self.assertEqual(ids, sorted(ids))
+
+    async def test_live_events_arriving_out_of_order_are_all_sent(self):
+        latest = record_room_event(self.room1.id, {"type": "chat_message_delete", "message_id": 1})
+        response = await self.async_client.get(
+            self.room_events_url, {"token": self.token},
+            headers={"Last-Event-ID": str(latest["event_id"])})
+        stream = response.streaming_content
+        await anext(stream)  # retry: the stream has joined the room group
+        # Broadcast from two workers: the higher id lands first. The last one
+        # repeats the replay and is skipped.
+        for event_id in (latest["event_id"] + 2, latest["event_id"] + 1, latest["event_id"]):
+            await get_channel_layer().group_send(room_group_name(self.room1.id), {
+                "type": "chat_message_delete", "message_id": event_id, "event_id": event_id})
+        chunks = [(await anext(stream)).decode() for _ in range(2)]
+        await stream.aclose()
+        self.assertIn(f"id: {latest['event_id'] + 2}", chunks[0])
+        self.assertIn(f"id: {latest['event_id'] + 1}", chunks[1])
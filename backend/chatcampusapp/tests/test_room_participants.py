@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Room, Topic
+from chatcampusapp.utils.participants import PARTICIPANTS_PAGE_SIZE
+
+User = get_user_model()
+
+
+class RoomParticipantsCountTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(
+            email=f"user{i}@example.com",
+            password="securepass123",
+            first_name=f"User{i}"
+        ) for i in range(3)]
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+
+    def setUp(self):
+        self.room = self.users[0].room_owner.create(
+            topic=self.topic, room_name="Devops room", room_description="Devops room description")
+
+    def participants_count(self):
+        self.room.refresh_from_db(fields=["participants_count"])
+        return self.room.participants_count
+
+    def test_add_increments_only_new_members(self):
+        self.room.participants.add(self.users[0], self.users[1])
+        self.room.participants.add(self.users[1])
+        self.assertEqual(self.participants_count(), 2)
+
+    def test_repeated_add_signal_does_not_overcount(self):
+        # What a concurrent add of the same member reports after losing the race
+        self.room.participants.add(self.users[1])
+        m2m_changed.send(sender=Room.participants.through, instance=self.room, action="post_add",
+                         reverse=False, model=User, pk_set={self.users[1].pk}, using="default")
+        self.assertEqual(self.participants_count(), 1)
+
+    def test_reverse_add(self):
+        self.users[2].room_participants.add(self.room)
+        self.assertEqual(self.participants_count(), 1)
+
+    def test_remove_and_clear(self):
+        self.room.participants.add(*self.users)
+        self.room.participants.remove(self.users[0])
+        self.assertEqual(self.participants_count(), 2)
+        self.users[1].room_participants.clear()
+        self.assertEqual(self.participants_count(), 1)
+        self.room.participants.clear()
+        self.assertEqual(self.participants_count(), 0)
+
+    def test_deleting_member_decrements_count(self):
+        member = User.objects.create_user(email="member@example.com", password="securepass123")
+        self.room.participants.add(member, self.users[1])
+        member.delete()
+        self.assertEqual(self.participants_count(), 1)
+
+    def test_stale_room_save_keeps_count(self):
+        stale = Room.objects.get(pk=self.room.pk)
+        self.room.participants.add(self.users[1])
+        stale.room_name = "Renamed"
+        stale.save()
+        self.assertEqual(self.participants_count(), 1)
+
+    def test_posting_message_joins_room(self):
+        self.client.force_authenticate(user=self.users[1])
+        url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+        response = self.client.post(url, {"body": "Hello"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.participants_count(), 1)
+
+
+class RoomParticipantsAPIViewTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(
+            email=f"user{i}@example.com",
+            password="securepass123",
+            first_name=f"User{i}"
+        ) for i in range(PARTICIPANTS_PAGE_SIZE + 5)]
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.users[0].room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+        cls.room.participants.add(*cls.users)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        # A real JWT, since room details are served by the async view
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.users[0])}")
+        self.url = reverse("room-participants", kwargs={"pk": self.room.id})
+
+    def test_first_and_last_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], len(self.users))
+        self.assertEqual(len(response.data["participants"]), PARTICIPANTS_PAGE_SIZE)
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(len(response.data["participants"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_unknown_room(self):
+        url = reverse("room-participants", kwargs={"pk": 999999})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_room_detail_embeds_first_page(self):
+        url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["room"]["participants_count"], len(self.users))
+        self.assertEqual(len(response.data["participants"]), PARTICIPANTS_PAGE_SIZE)
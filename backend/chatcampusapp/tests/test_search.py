@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from chatcampusapp.models import Message, Room, Topic
+from chatcampusapp.utils.search import MAX_QUERY_LENGTH, normalize_query, search_messages, search_rooms
+
+User = get_user_model()
+
+
+class NormalizeQueryTestCase(SimpleTestCase):
+
+    def test_normalize_query_collapses_case_and_whitespace(self):
+        self.assertEqual(normalize_query("  Cloud   COMPUTING "), "cloud computing")
+
+    def test_normalize_query_empty(self):
+        self.assertEqual(normalize_query(None), "")
+        self.assertEqual(normalize_query("   "), "")
+
+    def test_normalize_query_truncates(self):
+        self.assertEqual(len(normalize_query("a" * 500)), MAX_QUERY_LENGTH)
+
+
+class SearchRoomsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic1 = Topic.objects.create(topic_name="DevOps")
+        cls.topic2 = Topic.objects.create(topic_name="Docker")
+        cls.room1 = cls.user.room_owner.create(
+            topic=cls.topic1, room_name="Pipelines", room_description="Continuous delivery")
+        cls.room2 = cls.user.room_owner.create(
+            topic=cls.topic2, room_name="Containers", room_description="Images and registries")
+
+    def test_search_rooms_matches_topic_name_prefix(self):
+        rooms = list(search_rooms(Room.objects.all(), "dev"))
+        self.assertEqual(rooms, [self.room1])
+
+    def test_search_rooms_matches_description(self):
+        rooms = list(search_rooms(Room.objects.all(), "registries"))
+        self.assertEqual(rooms, [self.room2])
+
+    def test_search_rooms_tracks_topic_rename(self):
+        self.topic2.topic_name = "Kubernetes"
+        self.topic2.save()
+        rooms = list(search_rooms(Room.objects.all(), "kubernetes"))
+        self.assertEqual(rooms, [self.room2])
+
+    def test_search_rooms_without_query_returns_all(self):
+        self.assertEqual(search_rooms(Room.objects.all(), "").count(), 2)
+
+    def test_search_messages_come_from_matching_rooms(self):
+        first = self.user.message_owner.create(room=self.room1, body="Hello")
+        self.user.message_owner.create(room=self.room2, body="Hello")
+        for q in ("devops", "pipelines", "continuous"):
+            self.assertEqual(list(search_messages(Message.objects.all(), q)), [first], q)
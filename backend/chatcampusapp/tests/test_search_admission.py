@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp import tasks
+from chatcampusapp.models import Topic
+from chatcampusapp.utils import redis_tracking, search_admission
+
+User = get_user_model()
+
+
+@override_settings(SEARCH_ADMIT_MIN_HITS=2, SEARCH_ADMIT_WINDOW_SECONDS=100)
+class AdmissionTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_queries_are_admitted_on_their_second_miss(self):
+        self.assertFalse(search_admission.admit("devops", now=1000))
+        self.assertFalse(search_admission.admit("python", now=1000))
+        self.assertTrue(search_admission.admit("devops", now=1000))
+
+    def test_counts_carry_over_one_window_only(self):
+        search_admission.admit("devops", now=1050)
+        self.assertTrue(search_admission.admit("devops", now=1150))
+        search_admission.admit("python", now=1050)
+        self.assertFalse(search_admission.admit("python", now=1250))
+
+
+class BudgetTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def cache_page(self, q, size=1000):
+        cache.set(search_admission.cache_key(q), {"rooms": "x" * size}, timeout=300)
+        search_admission.record_entry(q, 300, now=1000)
+
+    def test_least_popular_pages_are_evicted_past_the_budget(self):
+        for q in ("devops", "devops", "python"):
+            redis_tracking.track_used_query(q)
+        with override_settings(SEARCH_CACHE_MAX_BYTES=2500, CACHE_COMPRESSOR="none"):
+            for q in ("devops", "python", "typo"):
+                self.cache_page(q)
+        self.assertEqual(sorted(search_admission.cached_queries()), ["devops", "python"])
+        self.assertIsNone(cache.get("homepage_cache_typo"))
+        self.assertIsNotNone(cache.get("homepage_cache_devops"))
+
+    def test_expired_pages_leave_the_index(self):
+        self.cache_page("devops")
+        search_admission.enforce_budget(now=1301)
+        self.assertEqual(search_admission.cached_queries(), [])
+
+
+class HomepageAdmissionTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(topic=cls.topic, room_name="Room",
+                                              room_description="Description")
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_search_pages_are_cached_on_repeated_demand(self):
+        url = reverse("homepage")
+        self.client.get(url, {"q": "devops"})
+        self.assertIsNone(cache.get("homepage_cache_devops"))
+        self.client.get(url, {"q": "devops"})
+        self.assertIsNotNone(cache.get("homepage_cache_devops"))
+        self.assertEqual(search_admission.cached_queries(), ["devops"])
+
+    def test_invalidation_deletes_cached_pages(self):
+        cache.set("homepage_cache_devops", {"rooms": []}, timeout=300)
+        search_admission.record_entry("devops", 300)
+        cache.set(f"RoomID{self.room.id}", {"room": {}}, timeout=300)
+        tasks.invalidate_and_warm_all_cache({"model": "Room", "id": self.room.id})
+        self.assertIsNone(cache.get("homepage_cache_devops"))
+        self.assertIsNone(cache.get(f"RoomID{self.room.id}"))
+        self.assertEqual(search_admission.cached_queries(), [])
@@ -0,0 +1,17 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from chatcampusapp.models import Message, Room, User
+
+
+class SeedDemoDataTestCase(TestCase):
+
+    def test_seeds_once(self):
+        call_command("seed_demo_data", stdout=StringIO())
+        rooms, messages = Room.objects.count(), Message.objects.count()
+        self.assertGreater(rooms, 0)
+        self.assertGreater(messages, rooms)
+        self.assertTrue(User.objects.filter(is_superuser=True).exists())
+        call_command("seed_demo_data", stdout=StringIO())
+        self.assertEqual((Room.objects.count(), Message.objects.count()), (rooms, messages))
+
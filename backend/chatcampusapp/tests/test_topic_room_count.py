@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from chatcampusapp.models import Room, Topic
+from chatcampusapp.utils.topics import TOPICS_COUNT_KEY, recount_topic_rooms, top_topics, topics_count
+
+User = get_user_model()
+
+
+class TopicRoomCountTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic1 = Topic.objects.create(topic_name="Python")
+        cls.topic2 = Topic.objects.create(topic_name="Django")
+
+    def setUp(self):
+        cache.delete(TOPICS_COUNT_KEY)
+
+    def room_count(self, topic):
+        topic.refresh_from_db(fields=["room_count"])
+        return topic.room_count
+
+    def test_room_create_increments_topic(self):
+        self.user.room_owner.create(topic=self.topic1, room_name="Room 1")
+        self.user.room_owner.create(topic=self.topic1, room_name="Room 2")
+        self.assertEqual(self.room_count(self.topic1), 2)
+        self.assertEqual(self.room_count(self.topic2), 0)
+
+    def test_room_topic_change_moves_count(self):
+        room = self.user.room_owner.create(topic=self.topic1, room_name="Room 1")
+        room.topic = self.topic2
+        room.save()
+        self.assertEqual(self.room_count(self.topic1), 0)
+        self.assertEqual(self.room_count(self.topic2), 1)
+
+    def test_room_save_without_topic_change_keeps_count(self):
+        room = self.user.room_owner.create(topic=self.topic1, room_name="Room 1")
+        room.room_name = "Renamed"
+        room.save()
+        self.assertEqual(self.room_count(self.topic1), 1)
+
+    def test_room_delete_decrements_topic(self):
+        room = self.user.room_owner.create(topic=self.topic1, room_name="Room 1")
+        room.delete()
+        self.assertEqual(self.room_count(self.topic1), 0)
+
+    def test_recount_after_bulk_create(self):
+        Room.objects.bulk_create(
+            [Room(topic=self.topic2, room_name=f"Room {i}") for i in range(3)])
+        self.assertEqual(self.room_count(self.topic2), 0)
+        recount_topic_rooms()
+        self.assertEqual(self.room_count(self.topic2), 3)
+
+    def test_top_topics_ordered_by_room_count(self):
+        self.user.room_owner.create(topic=self.topic2, room_name="Room 1")
+        self.assertEqual([topic.topic_name for topic in top_topics()],
+                         ["Django", "Python"])
+
+    def test_topics_count_is_cached_and_invalidated(self):
+        self.assertEqual(topics_count(), 2)
+        self.assertEqual(cache.get(TOPICS_COUNT_KEY), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Topic.objects.create(topic_name="Rust")
+        self.assertIsNone(cache.get(TOPICS_COUNT_KEY))
+        self.assertEqual(topics_count(), 3)
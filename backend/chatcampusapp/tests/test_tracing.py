@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from chatcampusapp.models import Topic
+from chatcampusapp.routing import websocket_urlpatterns
+from chatcampusapp.tasks import warm_up_room_detail_view_cache
+from chatcampusapp.utils import tracing
+
+User = get_user_model()
+
+REMOTE_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+REMOTE_SPAN_ID = "00f067aa0ba902b7"
+
+
+class TracingMixin:
+
+    def setUp(self):
+        super().setUp()
+        tracing.flush()
+        handle, self.export_path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, self.export_path)
+        settings = override_settings(TRACING_ENABLED=True, TRACING_SAMPLE_RATE=1.0,
+                                     TRACING_EXPORT_PATH=self.export_path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Cleanups run last-in first-out: spans a test leaves buffered go to
+        # its own file before the real TRACING_EXPORT_PATH is restored
+        self.addCleanup(tracing.flush)
+
+    def exported_spans(self):
+        tracing.flush()
+        spans = []
+        with open(self.export_path) as f:
+            for line in f:
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        spans.extend(scope["spans"])
+        return spans
+
+    def span_named(self, spans, prefix):
+        matching = [span for span in spans if span["name"].startswith(prefix)]
+        self.assertTrue(matching, f"No span named {prefix}* in {[s['name'] for s in spans]}")
+        return matching[0]
+
+
+class TraceContextTestCase(TracingMixin, SimpleTestCase):
+
+    def test_children_share_the_trace(self):
+        with tracing.trace("root") as root:
+            with tracing.span("child") as child:
+                self.assertEqual(child.parent_id, root.span_id)
+                self.assertEqual(child.trace_id, root.trace_id)
+        self.assertIsNone(tracing.current_span())
+        self.assertEqual({span["name"] for span in self.exported_spans()}, {"root", "child"})
+
+    def test_sampling_decision_is_inherited(self):
+        with override_settings(TRACING_SAMPLE_RATE=0.0), tracing.trace("root") as root:
+            self.assertFalse(root.sampled)
+            self.assertTrue(root.traceparent.endswith("-00"))
+            with tracing.span("child") as child:
+                self.assertIsNone(child)
+        with tracing.trace("remote", f"00-{REMOTE_TRACE_ID}-{REMOTE_SPAN_ID}-00"):
+            pass
+        self.assertEqual(self.exported_spans(), [])
+
+    def test_errors_are_recorded(self):
+        with self.assertRaises(ValueError), tracing.trace("root"):
+            raise ValueError("boom")
+        self.assertEqual(self.exported_spans()[0]["status"]["code"], 2)
+
+    def test_task_headers_carry_the_trace(self):
+        headers = {}
+        with tracing.trace("view") as view:
+            tracing.inject_task_headers(headers=headers)
+        self.assertEqual(tracing.parse_traceparent(headers["traceparent"]),
+                         (view.trace_id, view.span_id, True))
+
+
+class RequestTracingTestCase(TracingMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="john@example.com",
+            password="securepass123",
+            first_name="John",
+            last_name="Wick"
+        )
+        cls.topic = Topic.objects.create(topic_name="DevOps")
+        cls.room = cls.user.room_owner.create(
+            topic=cls.topic, room_name="Devops room", room_description="Devops room description")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def test_request_spans_cover_cache_queries_and_warm_task(self):
+        url = reverse("room-details-message-create", kwargs={"pk": self.room.id})
+        self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {self.token}",
+                        HTTP_TRACEPARENT=f"00-{REMOTE_TRACE_ID}-{REMOTE_SPAN_ID}-01")
+        spans = self.exported_spans()
+        self.assertEqual({span["traceId"] for span in spans}, {REMOTE_TRACE_ID})
+
+        root = self.span_named(spans, "GET api/roomDetails/")
+        self.assertEqual(root["parentSpanId"], REMOTE_SPAN_ID)
+        cache_get = self.span_named(spans, "cache.get")
+        self.assertIn({"key": "cache.hit", "value": {"boolValue": False}}, cache_get["attributes"])
+        self.span_named(spans, "db.query")
+        task = self.span_named(spans, f"task {warm_up_room_detail_view_cache.name}")
+        by_id = {span["spanId"]: span for span in spans}
+        # The eager warm task hangs off the request, and its cache write off the task
+        self.assertIn(task["parentSpanId"], by_id)
+        room_key = {"key": "cache.key", "value": {"stringValue": f"RoomID{self.room.id}"}}
+        cache_set = [span for span in spans
+                     if span["name"] == "cache.set" and room_key in span["attributes"]][0]
+        self.assertEqual(cache_set["parentSpanId"], task["spanId"])
+
+    async def test_websocket_delivery_joins_the_receive_trace(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/chat/{self.room.id}/")
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"action": "Auth_Check", "token": self.token})
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"action": "send_message", "body": "Hello"})
+        message = await communicator.receive_json_from()
+        self.assertEqual(message["type"], "chat_message")
+        self.assertNotIn("traceparent", message)
+        await communicator.disconnect()
+
+        spans = self.exported_spans()
+        receive = [span for span in spans if span["name"] == "ws ChatRoom websocket.receive"][-1]
+        group_send = self.span_named(spans, "channels.group_send")
+        delivery = self.span_named(spans, "ws ChatRoom chat_message")
+        self.assertEqual(group_send["traceId"], receive["traceId"])
+        self.assertEqual(delivery["parentSpanId"], group_send["spanId"])
+        self.assertEqual(delivery["kind"], tracing.CONSUMER)
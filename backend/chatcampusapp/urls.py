@@ -1,6 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenBlacklistView, TokenRefreshView
-from .views import GoogleAuthAPIView, HomePageAPIView, MessageDeleteAPIView, RoomCreateAPIView, RoomDetailMessageCreateAPIView, RoomUpdateRetrieveDeleteAPIView, TopicListAPIView, UserProfileAPIView, UserRetrieveUpdateAPIView, UserCreateAPIView, UserProfileAPIView
+from .async_views import homepage_view, room_detail_view, room_events_view, user_profile_view
+from .views import GoogleAuthAPIView, HomePageAPIView, MessageDeleteAPIView, RoomCreateAPIView, RoomDetailMessageCreateAPIView, RoomParticipantsAPIView, RoomUpdateRetrieveDeleteAPIView, TopicListAPIView, UserProfileAPIView, UserRetrieveUpdateAPIView, UserCreateAPIView, UserProfileAPIView, metrics_view, ProfileDownloadAPIView, ProfileListAPIView
+
+if settings.ASYNC_READ_VIEWS:
+    homepage = homepage_view
+    room_details = room_detail_view
+    user_profile = user_profile_view
+else:
+    homepage = HomePageAPIView.as_view()
+    room_details = RoomDetailMessageCreateAPIView.as_view()
+    user_profile = UserProfileAPIView.as_view()
 
 urlpatterns = [
     path("auth/social/google/",
@@ -15,11 +26,18 @@ urlpatterns = [
     path("rooms/<int:pk>/", RoomUpdateRetrieveDeleteAPIView.as_view(),
          name="room-get-update-delete"),
     path("topics/", TopicListAPIView.as_view(), name="topic-list"),
-    path("roomDetails/<int:pk>/", RoomDetailMessageCreateAPIView.as_view(),
+    path("roomDetails/<int:pk>/", room_details,
          name="room-details-message-create"),
+    path("roomParticipants/<int:pk>/", RoomParticipantsAPIView.as_view(),
+         name="room-participants"),
+    path("roomEvents/<int:pk>/", room_events_view,
+         name="room-events"),
     path("messageDelete/<int:pk>/", MessageDeleteAPIView.as_view(),
          name="message-delete"),
-    path("", HomePageAPIView.as_view(), name="homepage"),
+    path("", homepage, name="homepage"),
     path("user/profile/<int:pk>/",
-         UserProfileAPIView.as_view(), name="user-profile"),
+         user_profile, name="user-profile"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("profiles/", ProfileListAPIView.as_view(), name="profile-list"),
+    path("profiles/<str:name>/", ProfileDownloadAPIView.as_view(), name="profile-download"),
 ]
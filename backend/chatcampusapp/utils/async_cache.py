@@ -0,0 +1,47 @@
+"""
+Cache reads for the async views. Django's `cache.aget` runs the sync
+django-redis client in a worker thread; with settings.ASYNC_REDIS_CACHE this
+reads the same keys through redis.asyncio on the event loop instead and
+decodes them with the django-redis client, so entries stay interchangeable.
+"""
+import asyncio
+import weakref
+from django.conf import settings
+from django.core.cache import cache
+from chatcampusapp.utils import tracing
+from chatcampusapp.utils.metrics import record_cache_lookup
+
+# redis.asyncio connections are bound to the loop that created them
+_clients = weakref.WeakKeyDictionary()
+
+
+def native_enabled():
+    return (getattr(settings, "ASYNC_REDIS_CACHE", False) and
+            settings.CACHES["default"]["BACKEND"] == "django_redis.cache.RedisCache")
+
+
+def _client():
+    from redis.asyncio import Redis
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        location = settings.CACHES["default"]["LOCATION"]
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = Redis.from_url(location)
+        _clients[loop] = client
+    return client
+
+
+async def aget(key, default=None):
+    if not native_enabled():
+        return await cache.aget(key, default)
+    with tracing.span("cache.get", {"cache.key": key}, kind=tracing.CLIENT):
+        value = await _client().get(cache.client.make_key(key))
+    # The sync path is recorded by InstrumentedClient. This is buffered, so no
+    # Redis I/O happens on the event loop here.
+    record_cache_lookup(key, value is not None)
+    if value is None:
+        return default
+    return cache.client.decode(value)
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from chatcampusapp.utils import async_cache
+
+# The async views only need to know that a token's user still exists and is
+# active; caching that keeps the DB lookup off every cache-hit request.
+AUTH_USER_TTL_SECONDS = 60
+
+
+def auth_user_key(user_id):
+    return f"AuthUserID{user_id}"
+
+
+async def aactive_user_id(user_id):
+    """`user_id` if that user exists and is active, otherwise None."""
+    key = auth_user_key(user_id)
+    active = await async_cache.aget(key)
+    if active is None:
+        active = int(await get_user_model().objects.filter(pk=user_id, is_active=True).aexists())
+        await cache.aset(key, active, timeout=AUTH_USER_TTL_SECONDS)
+    return user_id if active else None
+
+
+def invalidate_auth_user(user_id):
+    cache.delete(auth_user_key(user_id))
@@ -0,0 +1,92 @@
+"""
+JSON codec shared by the DRF renderer/parser, the ChatRoom consumer, the
+channel layer and the cache. Uses orjson when available (settings.JSON_CODEC)
+and falls back to the stdlib with the same output for the types we send.
+
+Both backends write datetimes as ISO 8601 with a "Z" suffix for UTC, exactly
+like DRF's DateTimeField, so payload builders may leave datetimes unformatted.
+"""
+import datetime
+import decimal
+import json
+import uuid
+from django.conf import settings
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def isoformat(value):
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def default(obj):
+    """Types neither backend handles natively, mirroring DRF's JSONEncoder."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj):
+    if isinstance(obj, datetime.datetime):
+        return isoformat(obj)
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return default(obj)
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def use_orjson():
+    return orjson is not None and getattr(settings, "JSON_CODEC", "orjson") == "orjson"
+
+
+def dumps(obj):
+    """Serialize `obj` to compact UTF-8 JSON bytes."""
+    if use_orjson():
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_stdlib_default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def dumps_strict(obj):
+    """
+    Serialize only what orjson encodes natively, without the `default` hook
+    or non-str keys. Datetimes come back as ISO strings and tuples as lists.
+    Raises TypeError for anything else, or when orjson is not in use.
+    """
+    if not use_orjson():
+        raise TypeError("strict JSON encoding requires orjson")
+    return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+
+
+def dumps_text(obj):
+    """Like dumps() but returns str, e.g. for WebSocket text frames."""
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data):
+    """Parse JSON from bytes or str. Raises ValueError on invalid input."""
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
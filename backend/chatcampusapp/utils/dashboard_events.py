@@ -0,0 +1,71 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django_redis import get_redis_connection
+from chatcampusapp.models import Message, Room, Topic
+from chatcampusapp.serializers import MessageMinimalSerializer, RoomMinimalSerializer
+from chatcampusapp.utils import tracing
+
+logger = logging.getLogger("chatcampusapp")
+
+DASHBOARD_GROUP = "Dashboard"
+
+
+def send_dashboard_event(kind, data):
+    """
+    Broadcast a compact homepage diff. `event_id` increases by one per event
+    so clients can spot a gap and refetch their snapshot.
+    """
+    redis = get_redis_connection("default")
+    event = {
+        "type": "dashboard_update",
+        "event_id": redis.incr("dashboard_event_id"),
+        "kind": kind,
+        "data": data,
+    }
+    with tracing.span("channels.group_send", {"channels.group": DASHBOARD_GROUP}, kind=tracing.PRODUCER):
+        traceparent = tracing.current_traceparent()
+        if traceparent:
+            event["traceparent"] = traceparent
+        async_to_sync(get_channel_layer().group_send)(DASHBOARD_GROUP, event)
+
+
+def publish_dashboard_event(kind, build_data):
+    """
+    Publish after the current transaction commits. `build_data` runs at that
+    point so it only sees committed rows; returning None skips the event.
+    """
+    def publish():
+        try:
+            data = build_data()
+            if data is not None:
+                send_dashboard_event(kind, data)
+        except Exception as e:
+            logger.error(f"Failed to publish dashboard event {kind}: {e}")
+
+    transaction.on_commit(publish)
+
+
+def room_preview(room_id):
+    room = (Room.objects
+            .filter(pk=room_id)
+            .select_related("topic", "owner")
+            .first())
+    return RoomMinimalSerializer(room).data if room else None
+
+
+def message_preview(message_id):
+    message = (Message.objects
+               .filter(pk=message_id)
+               .select_related("owner", "room")
+               .first())
+    return MessageMinimalSerializer(message).data if message else None
+
+
+def topic_count(topic_id, delta):
+    topic = (Topic.objects
+             .filter(pk=topic_id)
+             .values("id", "topic_name", "room_count")
+             .first())
+    return {**topic, "delta": delta} if topic else None
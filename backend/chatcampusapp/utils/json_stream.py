@@ -0,0 +1,87 @@
+"""
+Incremental JSON for payloads too large to build as one list of dicts, such
+as a room's whole message history. Iterator values are encoded a chunk of
+rows at a time with utils.codec and written straight into a gzip stream, so
+peak memory is the compressed body plus one chunk instead of the rows, their
+dicts and the encoded JSON all at once.
+
+The result is cached as is (see cache_serializers) and sent to clients that
+accept gzip without being decoded again.
+"""
+import gzip
+import io
+import re
+from itertools import islice
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from chatcampusapp.utils import codec
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class CompressedJSON:
+    """A gzip-compressed JSON document."""
+    __slots__ = ("body",)
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return gzip.decompress(self.body)
+
+    def decode(self):
+        return codec.loads(self.json())
+
+    def __eq__(self, other):
+        return isinstance(other, CompressedJSON) and other.body == self.body
+
+
+def compress(payload, chunk_size=None):
+    """
+    Encode the dict `payload`, whose values may be iterators of JSON-able
+    rows (written as arrays), into CompressedJSON.
+    """
+    chunk_size = chunk_size or settings.PAYLOAD_CHUNK_SIZE
+    buffer = io.BytesIO()
+    # mtime=0 keeps the output identical for identical payloads
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=settings.PAYLOAD_GZIP_LEVEL,
+                       mtime=0) as out:
+        out.write(b"{")
+        for index, (key, value) in enumerate(payload.items()):
+            out.write(b"," if index else b"")
+            out.write(codec.dumps(key) + b":")
+            if isinstance(value, (dict, list, str, int, float, bool, type(None))):
+                out.write(codec.dumps(value))
+                continue
+            out.write(b"[")
+            rows = iter(value)
+            separator = b""
+            while chunk := list(islice(rows, chunk_size)):
+                out.write(separator + b",".join(codec.dumps(row) for row in chunk))
+                separator = b","
+            out.write(b"]")
+        out.write(b"}")
+    return CompressedJSON(buffer.getvalue())
+
+
+class CompressedJSONResponse(HttpResponse):
+    """
+    Serves CompressedJSON as is to clients that accept gzip and decompressed
+    to the rest. GZipMiddleware leaves responses with a Content-Encoding alone.
+    """
+
+    def __init__(self, payload, request, status=200):
+        accepts_gzip = ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        super().__init__(payload.body if accepts_gzip else payload.json(),
+                         status=status, content_type="application/json")
+        if accepts_gzip:
+            self["Content-Encoding"] = "gzip"
+        patch_vary_headers(self, ("Accept-Encoding",))
+        self.payload = payload
+
+    @cached_property
+    def data(self):
+        # Like DRF's Response.data, for the API tests; decoded on first use only
+        return self.payload.decode()
@@ -0,0 +1,340 @@
+"""
+Request, cache, Celery and WebSocket metrics in Prometheus text format.
+
+Samples live in Redis hashes so that web workers, Celery workers and the
+Channels processes feed one registry, which /api/metrics/ renders. Writes
+inside `batch()` (one per request or task) go out in a single pipeline.
+Anything else, e.g. WebSocket events where a room broadcast is one event
+per socket, is summed in-process and flushed every METRICS_FLUSH_SECONDS
+from a background thread.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter as Tally
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("chatcampusapp")
+
+KEY_PREFIX = "metrics:"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+REGISTRY = []
+
+_batch = ContextVar("metrics_batch", default=None)
+
+
+def label_string(labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{name}="{escape(value)}"' for name, value in sorted(labels.items()))
+
+
+def format_value(value):
+    # Exact: integral values as ints, the rest with every significant digit
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _execute(pipe):
+    try:
+        pipe.execute()
+    except RedisError as e:
+        # Metrics must never fail the request that produced them
+        logger.warning(f"Dropping metrics: {e}")
+
+
+def open_batch():
+    """Start buffering metric writes; None if disabled or already batching."""
+    if not settings.METRICS_ENABLED or _batch.get() is not None:
+        return None
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    return _batch.set(pipe), pipe
+
+
+def close_batch(opened):
+    if opened is None:
+        return
+    token, pipe = opened
+    _batch.reset(token)
+    _execute(pipe)
+
+
+@contextmanager
+def batch():
+    """Buffer metric writes in the block and send them in one round trip."""
+    opened = open_batch()
+    try:
+        yield
+    finally:
+        close_batch(opened)
+
+
+@asynccontextmanager
+async def abatch():
+    """
+    batch() for async middleware. With native async Redis the pipeline is a
+    redis.asyncio one, so queueing stays in memory and only the final send is
+    awaited on the event loop; otherwise the send runs in a worker thread.
+    """
+    from chatcampusapp.utils import async_cache
+
+    if not settings.METRICS_ENABLED or _batch.get() is not None:
+        yield
+        return
+    native = async_cache.native_enabled()
+    if native:
+        pipe = async_cache._client().pipeline(transaction=False)
+    else:
+        pipe = get_redis_connection("default").pipeline(transaction=False)
+    token = _batch.set(pipe)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        if not native:
+            await sync_to_async(_execute)(pipe)
+        else:
+            try:
+                await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Dropping metrics: {e}")
+
+
+class PendingWrites:
+    """
+    Increments made outside a batch, summed per process between flushes.
+    Due flushes are sent by a background thread, as add() is called from
+    WebSocket consumers on the event loop.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.amounts = Tally()
+        self.last_flush = time.monotonic()
+        self.sends = queue.Queue()
+        self.sender = None
+
+    def add(self, key, ops):
+        with self.lock:
+            for method, field, amount in ops:
+                self.amounts[(method, key, field)] += amount
+            if time.monotonic() - self.last_flush < settings.METRICS_FLUSH_SECONDS:
+                return
+            pending = self._take()
+            self._start_sender()
+        self.sends.put(pending)
+
+    def flush(self):
+        """Send everything pending, waiting for sends already queued."""
+        with self.lock:
+            pending = self._take()
+        self.sends.join()
+        self._send(pending)
+
+    def _take(self):
+        pending = self.amounts
+        self.amounts = Tally()
+        self.last_flush = time.monotonic()
+        return pending
+
+    def _start_sender(self):
+        # Started on first use (and again after a fork), not at import
+        if self.sender is None or not self.sender.is_alive():
+            self.sender = threading.Thread(target=self._run_sender, name="metrics-sender", daemon=True)
+            self.sender.start()
+
+    def _run_sender(self):
+        while True:
+            pending = self.sends.get()
+            try:
+                self._send(pending)
+            finally:
+                self.sends.task_done()
+
+    def _send(self, pending):
+        if not pending:
+            return
+        pipe = get_redis_connection("default").pipeline(transaction=False)
+        for (method, key, field), amount in pending.items():
+            getattr(pipe, method)(key, field, amount)
+        _execute(pipe)
+
+
+_pending = PendingWrites()
+flush = _pending.flush
+atexit.register(flush)
+
+
+class Metric(ABC):
+    kind = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.key = KEY_PREFIX + name
+        REGISTRY.append(self)
+
+    def _write(self, *ops):
+        if not settings.METRICS_ENABLED:
+            return
+        pipe = _batch.get()
+        if pipe is None:
+            _pending.add(self.key, ops)
+            return
+        for method, field, amount in ops:
+            getattr(pipe, method)(self.key, field, amount)
+
+    @abstractmethod
+    def render(self, fields):
+        """Exposition lines for the stored `fields`."""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._write(("hincrbyfloat", label_string(labels), amount))
+
+    def render(self, fields):
+        for labels, value in sorted(fields.items()):
+            yield f"{self.name}{{{labels}}} {format_value(value)}" if labels else f"{self.name} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """Buckets are stored non-cumulative (one write per observation) and summed on render."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        labels = label_string(labels)
+        bucket = next((b for b in self.buckets if value <= b), "+Inf")
+        self._write(("hincrby", f"{labels}|{bucket}", 1),
+                    ("hincrbyfloat", f"{labels}|sum", value))
+
+    def render(self, fields):
+        series = {}
+        for field, value in fields.items():
+            labels, _, part = field.rpartition("|")
+            series.setdefault(labels, {})[part] = float(value)
+        for labels, parts in sorted(series.items()):
+            prefix = f"{labels}," if labels else ""
+            total = 0
+            for bucket in self.buckets + ("+Inf",):
+                total += parts.get(str(bucket), 0)
+                yield f'{self.name}_bucket{{{prefix}le="{bucket}"}} {format_value(total)}'
+            suffix = f"{{{labels}}}" if labels else ""
+            yield f"{self.name}_sum{suffix} {format_value(parts.get('sum', 0))}"
+            yield f"{self.name}_count{suffix} {format_value(total)}"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP responses by route, method and status.")
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Time to produce the response, by route.")
+HTTP_DB_TIME = Histogram("http_request_db_seconds", "Time spent in database queries per request, by route.")
+HTTP_RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size, by route.", SIZE_BUCKETS)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Payload cache lookups by key family and result.")
+CACHE_VALUE_SIZE = Histogram("cache_value_size_bytes", "Serialized size of cache writes, by key family.",
+                             SIZE_BUCKETS)
+CACHE_FILL = Histogram("cache_fill_duration_seconds", "Time to rebuild and store a cache entry, by key family.")
+CACHE_DELETES = Counter("cache_deletes_total", "Cache invalidations by key family.")
+TASK_LATENCY = Histogram("celery_task_duration_seconds", "Celery task run time, by task.")
+TASKS = Counter("celery_tasks_total", "Finished Celery tasks by task and state.")
+WEBSOCKET_EVENTS = Counter("websocket_events_total", "Events handled by WebSocket consumers.")
+
+
+# Keys that end in a search query rather than an id
+QUERY_KEYED = ("homepage_cache", "dashboard_last_updated")
+
+
+def key_family(key):
+    """Cache key without its id or query: RoomID12 -> RoomID."""
+    for prefix in QUERY_KEYED:
+        if key.startswith(prefix):
+            return prefix
+    return key.rstrip("0123456789") or "other"
+
+
+def record_cache_lookup(key, hit):
+    CACHE_LOOKUPS.inc(family=key_family(key), result="hit" if hit else "miss")
+
+
+def record_cache_write(key, size):
+    CACHE_VALUE_SIZE.observe(size, family=key_family(key))
+
+
+def record_cache_delete(key):
+    CACHE_DELETES.inc(family=key_family(key))
+
+
+@contextmanager
+def cache_fill(key, entries=1):
+    """
+    Time rebuilding the entry for `key`, from its queries to the cache write.
+    A batch of `entries` keys of one family counts each at the batch average.
+    """
+    started = time.perf_counter()
+    yield
+    elapsed = (time.perf_counter() - started) / max(entries, 1)
+    for _ in range(entries):
+        CACHE_FILL.observe(elapsed, family=key_family(key))
+
+
+def record_websocket_event(consumer, event):
+    WEBSOCKET_EVENTS.inc(consumer=consumer, event=event)
+
+
+# Celery signal handlers, connected in tasks.py. Each task run is one batch.
+_task_runs = {}
+
+
+def task_timer_started(task_id=None, **kwargs):
+    _task_runs[task_id] = (time.perf_counter(), open_batch())
+
+
+def task_timer_finished(task_id=None, task=None, state=None, **kwargs):
+    run = _task_runs.pop(task_id, None)
+    if run is None:
+        return
+    started, opened = run
+    try:
+        TASK_LATENCY.observe(time.perf_counter() - started, task=task.name)
+        TASKS.inc(task=task.name, state=state or "UNKNOWN")
+    finally:
+        close_batch(opened)
+
+
+def read_metrics(metrics=None):
+    """Stored fields of each metric (all registered by default), after a flush."""
+    metrics = REGISTRY if metrics is None else metrics
+    flush()
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    for metric in metrics:
+        pipe.hgetall(metric.key)
+    return [(metric, {field.decode(): value.decode() for field, value in fields.items()})
+            for metric, fields in zip(metrics, pipe.execute())]
+
+
+def render_metrics():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric, fields in read_metrics():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render(fields))
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    get_redis_connection("default").delete(*(metric.key for metric in REGISTRY))
@@ -0,0 +1,30 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from chatcampusapp.models import Room
+
+PARTICIPANTS_PAGE_SIZE = 20
+
+
+def recount_room_participants(room_ids=None):
+    """
+    Recompute Room.participants_count from the membership table, for all rooms
+    or just `room_ids`. Needed after removals and bulk inserts into the
+    through table, which bypass the m2m_changed bookkeeping.
+
+    Every member counts, active or not: the count also pages the
+    participants list, which shows them all.
+    """
+    through = Room.participants.through
+    members = (through.objects
+               .filter(room=OuterRef("pk"))
+               .order_by()
+               .values("room")
+               .annotate(total=Count("pk"))
+               .values("total"))
+    rooms = Room.objects.all() if room_ids is None else Room.objects.filter(pk__in=room_ids)
+    return rooms.update(participants_count=Coalesce(Subquery(members[:1]), 0))
+
+
+def room_participants(room):
+    """Members of `room` in a stable order for pagination."""
+    return room.participants.only("id", "avatar", "first_name").order_by("id")
@@ -0,0 +1,197 @@
+"""
+On-demand profiling of single requests, Celery tasks and ChatRoom events.
+
+With settings.PROFILING_ENABLED, a unit of work is profiled when it carries a
+valid signature for its target (an `X-Profile` header for the request path,
+an `x_profile` task header for the task name; see `manage.py
+profile_signature`) or wins the PROFILING_SAMPLE_RATE roll.
+
+PROFILING_MODE picks the profiler:
+- "cprofile" writes a .prof file for pstats, snakeviz or gprof2dot.
+- "sampling" snapshots every thread's stack each PROFILING_INTERVAL_MS and
+  writes folded stacks (.folded) for flamegraph.pl or speedscope. It costs
+  far less, and it also sees async views running on the event loop thread.
+
+Only one profile runs at a time per process. Work that arrives while one is
+running is simply not profiled.
+"""
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.text import slugify
+
+logger = logging.getLogger("chatcampusapp")
+
+SIGNING_SALT = "chatcampusapp.profiling"
+
+PROFILE_NAME = re.compile(r"^[\w-]+\.(prof|folded)$")
+
+_active = threading.Lock()
+
+
+def sign_profile_request(target):
+    """Value for the X-Profile header (or x_profile task header) of `target`."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(target)
+
+
+def should_profile(signature=None, target=""):
+    if not settings.PROFILING_ENABLED:
+        return False
+    if signature:
+        try:
+            signed_target = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+                signature, max_age=settings.PROFILING_SIGNATURE_MAX_AGE)
+        except signing.BadSignature:
+            return False
+        return signed_target == target
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+class CProfiler:
+    suffix = ".prof"
+
+    def start(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+class StackSampler:
+    suffix = ".folded"
+
+    def start(self):
+        self.stacks = Counter()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        interval = settings.PROFILING_INTERVAL_MS / 1000
+        own = threading.get_ident()
+        while not self.done.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[fold(names.get(ident, str(ident)), frame)] += 1
+
+    def stop(self):
+        self.done.set()
+        self.thread.join()
+
+    def save(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def fold(thread_name, frame):
+    """One `thread;outer;...;inner` line for flamegraph.pl."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+PROFILERS = {"cprofile": CProfiler, "sampling": StackSampler}
+
+
+@contextmanager
+def profiled(kind, target):
+    """
+    Profile the block and save it under PROFILING_DIR. Yields the profiler,
+    whose `filename` is set once the block exits, or None when another
+    profile is already running.
+    """
+    if not _active.acquire(blocking=False):
+        yield None
+        return
+    try:
+        profiler = PROFILERS[settings.PROFILING_MODE]()
+        profiler.filename = None
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - started
+            profiler.filename = save_profile(profiler, kind, target)
+            logger.info(f"Profiled {kind} {target} in {elapsed * 1000:.0f} ms: {profiler.filename}")
+    finally:
+        _active.release()
+
+
+def save_profile(profiler, kind, target):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    # Sorts by time; the random part keeps concurrent processes apart
+    filename = (f"{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}-{kind}-"
+                f"{slugify(target.replace('/', ' '))[:80] or 'root'}{profiler.suffix}")
+    profiler.save(os.path.join(settings.PROFILING_DIR, filename))
+    prune_profiles()
+    return filename
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    try:
+        entries = [entry for entry in os.scandir(settings.PROFILING_DIR)
+                   if entry.is_file() and PROFILE_NAME.match(entry.name)]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: entry.name, reverse=True)
+    return entries
+
+
+def prune_profiles():
+    for entry in list_profiles()[settings.PROFILING_KEEP:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_path(name):
+    """Path of a saved profile, or None for names that aren't one."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(settings.PROFILING_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+# Celery signal handlers, connected in tasks.py
+_task_profiles = {}
+
+
+def task_profile_started(task_id=None, task=None, **kwargs):
+    request = task.request
+    signature = getattr(request, "x_profile", None) or (request.headers or {}).get("x_profile")
+    if not should_profile(signature, task.name):
+        return
+    stack = ExitStack()
+    stack.enter_context(profiled("task", task.name))
+    _task_profiles[task_id] = stack
+
+
+def task_profile_finished(task_id=None, **kwargs):
+    stack = _task_profiles.pop(task_id, None)
+    if stack is not None:
+        stack.close()
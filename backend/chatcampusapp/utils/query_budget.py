@@ -0,0 +1,146 @@
+"""
+Query counting per request and per Celery task. Every connection gets one
+execute wrapper (installed in apps.py), so this works without DEBUG (unlike
+connection.queries), and records into the counters open in the current
+context. Connections are per thread, but the context follows queries into
+the worker threads of sync_to_async and the async ORM.
+Besides the total it flags SQL shapes that repeat, the usual N+1 signature.
+
+Views declare `query_budget = N` (or a dict per HTTP method); tasks pass `query_budget=N` to
+@shared_task. Going over a budget or repeating a shape is logged, raises
+with settings.QUERY_BUDGET_STRICT, and fails tests that use
+QueryBudgetAssertionsMixin.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+logger = logging.getLogger("chatcampusapp.queries")
+
+# Counters open in this context, outermost first. Tasks start a new list, so
+# tasks run eagerly inside a request don't count against it
+_counters = ContextVar("query_counters", default=())
+
+IN_LIST = re.compile(r"\((?:%s, )*%s\)")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_shape(sql):
+    # Parameters are still placeholders here; only IN lists vary in length
+    return IN_LIST.sub("(%s, ...)", sql)
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection in apps.py."""
+    counters = _counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed, shape = time.perf_counter() - started, query_shape(sql)
+        for counter in counters:
+            counter.record(shape, elapsed)
+
+
+def install_query_counting(sender, connection, **kwargs):
+    # First in the list, so execute_wrapper() blocks keep popping their own
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class QueryCounter:
+    def __init__(self, name="", isolate=False):
+        self.name = name
+        self.isolate = isolate
+        self.shapes = []
+        self.duration = 0.0
+        self._token = None
+
+    def __enter__(self):
+        outer = () if self.isolate else _counters.get()
+        self._token = _counters.set((*outer, self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _counters.reset(self._token)
+
+    def record(self, shape, duration):
+        self.duration += duration
+        self.shapes.append(shape)
+
+    @property
+    def count(self):
+        return len(self.shapes)
+
+    def repeated(self, threshold=None):
+        """SQL shapes run at least `threshold` times, with their counts."""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return {shape: n for shape, n in Counter(self.shapes).items() if n >= threshold}
+
+    def problems(self, budget=None):
+        found = []
+        if budget is not None and self.count > budget:
+            found.append(f"{self.count} queries, budget is {budget}")
+        for shape, n in self.repeated().items():
+            found.append(f"{n}x {shape}")
+        return found
+
+
+def check_query_budget(counter, budget=None):
+    """Log (or raise, with QUERY_BUDGET_STRICT) when `counter` broke its budget."""
+    problems = counter.problems(budget)
+    if not problems:
+        logger.debug("%s: %d queries in %.1f ms", counter.name, counter.count, counter.duration * 1000)
+        return
+    message = f"{counter.name}: " + "; ".join(problems)
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def view_query_budget(resolver_match, method):
+    if resolver_match is None:
+        return None
+    view = getattr(resolver_match.func, "view_class", resolver_match.func)
+    budget = getattr(view, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+# Celery: one counter per task run, keyed by task id
+_task_counters = {}
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    counter = QueryCounter(f"task {task.name}", isolate=True)
+    _task_counters[task_id] = counter.__enter__()
+
+
+def task_finished(task_id=None, task=None, **kwargs):
+    counter = _task_counters.pop(task_id, None)
+    if counter is None:
+        return
+    counter.__exit__(None, None, None)
+    check_query_budget(counter, getattr(task, "query_budget", None))
+
+
+class QueryBudgetAssertionsMixin:
+    """Test helper: `with self.assertQueryBudget(SomeView.query_budget): ...`"""
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        with QueryCounter() as counter:
+            yield counter
+        problems = counter.problems(budget)
+        if problems:
+            self.fail("Query budget exceeded:\n" + "\n".join(problems))
@@ -1,21 +1,191 @@
+"""
+Read popularity of cached pages, used by invalidate_and_warm_all_cache to
+re-warm only the hottest ones.
+
+Each read adds 1 to its member's score in a sorted set, and decay() multiplies
+every score by 2^(-elapsed / TRACKING_HALF_LIFE_SECONDS), so a score is an
+exponentially decayed read count. Members that decay below
+TRACKING_MIN_SCORE, fall outside the top TRACKING_MAX_MEMBERS, or have not
+been read for TRACKING_IDLE_SECONDS (per-member last reads are kept in a
+companion "<key>:seen" sorted set) are dropped.
+
+Reads made inside `buffered()` (one per request, see TrackingMiddleware) are
+summed in memory and written in one pipeline when the block ends.
+"""
+import logging
+import math
+import time
+from collections import Counter as Tally
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from chatcampusapp.utils import async_cache
+
+logger = logging.getLogger("chatcampusapp")
+
+POPULAR_QUERIES = "popular_queries"
+POPULAR_ROOMS = "popular_rooms"
+POPULAR_USERS = "popular_users"
+TRACKED = (POPULAR_QUERIES, POPULAR_ROOMS, POPULAR_USERS)
+LAST_DECAY_KEY = "popularity_last_decay"
+
+# Idle sets disappear after this long without reads
+TTL_SECONDS = 24 * 3600
+
+_buffer = ContextVar("tracking_buffer", default=None)
+
+
+def seen_key(key):
+    return f"{key}:seen"
+
+
+def _queue_reads(pipe, reads, now):
+    for (key, member), count in reads.items():
+        pipe.zincrby(key, count, member)
+        pipe.zadd(seen_key(key), {member: now})
+    for key in {key for key, _ in reads}:
+        pipe.expire(key, TTL_SECONDS)
+        pipe.expire(seen_key(key), TTL_SECONDS)
+
+
+def _send(reads):
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    _queue_reads(pipe, reads, time.time())
+    try:
+        pipe.execute()
+    except RedisError as e:
+        # Popularity only steers warming; never fail a request over it
+        logger.warning(f"Dropping {sum(reads.values())} tracked reads: {e}")
+
+
+async def _asend(reads):
+    if not async_cache.native_enabled():
+        return await sync_to_async(_send)(reads)
+    async with async_cache._client().pipeline(transaction=False) as pipe:
+        _queue_reads(pipe, reads, time.time())
+        try:
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Dropping {sum(reads.values())} tracked reads: {e}")
+
+
+@contextmanager
+def buffered():
+    """Sum reads made in the block and write them in one round trip at the end."""
+    if _buffer.get() is not None:
+        yield
+        return
+    token = _buffer.set(Tally())
+    try:
+        yield
+    finally:
+        reads = _buffer.get()
+        _buffer.reset(token)
+        if reads:
+            _send(reads)
 
-TTL_SECONDS = 300
+
+@asynccontextmanager
+async def abuffered():
+    """buffered() for async middleware; the final write is awaited, not run in a thread."""
+    if _buffer.get() is not None:
+        yield
+        return
+    token = _buffer.set(Tally())
+    try:
+        yield
+    finally:
+        reads = _buffer.get()
+        _buffer.reset(token)
+        if reads:
+            await _asend(reads)
+
+
+def record(key, member):
+    reads = _buffer.get()
+    if reads is not None:
+        reads[(key, str(member))] += 1
+    else:
+        _send(Tally({(key, str(member)): 1}))
 
 
 def track_used_room_id(room_id):
-    redis = get_redis_connection("default")
-    redis.sadd("room_ids_used", room_id)
-    redis.expire("room_ids_used", TTL_SECONDS)
+    record(POPULAR_ROOMS, room_id)
 
 
 def track_used_user_id(user_id):
-    redis = get_redis_connection("default")
-    redis.sadd("user_ids_used", user_id)
-    redis.expire("user_ids_used", TTL_SECONDS)
+    record(POPULAR_USERS, user_id)
 
 
 def track_used_query(q):
+    # The unfiltered homepage is always warmed
+    if q:
+        record(POPULAR_QUERIES, q)
+
+
+async def atrack(key, member):
+    if not member:
+        return
+    reads = _buffer.get()
+    if reads is not None:
+        # Flushed by the middleware; no Redis call on the event loop here
+        reads[(key, str(member))] += 1
+    else:
+        await _asend(Tally({(key, str(member)): 1}))
+
+
+def forget(key, member):
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    pipe.zrem(key, str(member))
+    pipe.zrem(seen_key(key), str(member))
+    pipe.execute()
+
+
+def decay(now=None):
+    """
+    Age every score by the time since the last decay and drop idle members.
+    GETSET hands each interval to exactly one caller, so concurrent warm runs
+    don't decay twice.
+    """
+    redis = get_redis_connection("default")
+    now = time.time() if now is None else now
+    last = redis.getset(LAST_DECAY_KEY, now)
+    redis.expire(LAST_DECAY_KEY, TTL_SECONDS)
+    factor = 1
+    if last is not None:
+        factor = math.pow(2, -max(now - float(last), 0) / settings.TRACKING_HALF_LIFE_SECONDS)
+
+    pipe = redis.pipeline(transaction=False)
+    for key in TRACKED:
+        pipe.zrangebyscore(seen_key(key), "-inf", now - settings.TRACKING_IDLE_SECONDS)
+    idle = dict(zip(TRACKED, pipe.execute()))
+
+    pipe = redis.pipeline()
+    for key in TRACKED:
+        if idle[key]:
+            pipe.zrem(key, *idle[key])
+        if factor < 1:
+            pipe.zunionstore(key, {key: factor})
+        pipe.zremrangebyscore(key, "-inf", f"({settings.TRACKING_MIN_SCORE}")
+        pipe.zremrangebyrank(key, 0, -settings.TRACKING_MAX_MEMBERS - 1)
+        # Keep last reads only for members still scored, timestamps unchanged
+        pipe.zinterstore(seen_key(key), {seen_key(key): 1, key: 0})
+        # ZUNIONSTORE/ZINTERSTORE replace the key, and its TTL with it
+        pipe.expire(key, TTL_SECONDS)
+        pipe.expire(seen_key(key), TTL_SECONDS)
+    pipe.execute()
+
+
+def top(key, count, min_score=None):
+    """The `count` highest-scoring members, hottest first, as strings."""
+    if count <= 0:
+        return []
     redis = get_redis_connection("default")
-    redis.sadd("homepage_q_keys", q)
-    redis.expire("homepage_q_keys", TTL_SECONDS)
+    if min_score is None:
+        members = redis.zrevrange(key, 0, count - 1)
+    else:
+        members = redis.zrevrangebyscore(key, "+inf", min_score, start=0, num=count)
+    return [member.decode() for member in members]
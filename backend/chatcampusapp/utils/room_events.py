@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django_redis import get_redis_connection
+from chatcampusapp.utils import codec, tracing
+
+# Number of recent events kept per room for `Last-Event-ID` resume
+EVENT_LOG_LENGTH = 200
+EVENT_LOG_TTL_SECONDS = 3600
+
+
+def room_group_name(room_id):
+    return f"ChatRoom_{room_id}"
+
+
+def _event_log_key(room_id):
+    return f"ChatRoom_{room_id}_events"
+
+
+def _event_id_key(room_id):
+    # No TTL, unlike the log: ids restarting after an idle hour would make
+    # clients resuming from an older id skip the new events as already seen.
+    # forget_room_events() drops it with the room.
+    return f"ChatRoom_{room_id}_event_id"
+
+
+def record_room_event(room_id, event):
+    """
+    Give `event` a per-room increasing `event_id` and append it to the
+    room's bounded replay log. Returns the event with its id.
+
+    The id and the log entry are committed together (WATCH/MULTI, retried if
+    another writer got in first), so the log is always in id order: any id
+    at or below the newest one in the log is in the log too.
+    """
+    id_key, log_key = _event_id_key(room_id), _event_log_key(room_id)
+
+    def append(pipe):
+        recorded = {**event, "event_id": int(pipe.get(id_key) or 0) + 1}
+        pipe.multi()
+        pipe.set(id_key, recorded["event_id"])
+        pipe.lpush(log_key, codec.dumps(recorded))
+        pipe.ltrim(log_key, 0, EVENT_LOG_LENGTH - 1)
+        pipe.expire(log_key, EVENT_LOG_TTL_SECONDS)
+        return recorded
+
+    return get_redis_connection("default").transaction(append, id_key, value_from_callable=True)
+
+
+def room_events_since(room_id, last_event_id):
+    """
+    Return `(events, complete)` for events after `last_event_id`, oldest first.
+    `complete` is False when the log no longer reaches back that far.
+    """
+    # One MULTI, so an event recorded in between can't look like a gap
+    pipe = get_redis_connection("default").pipeline()
+    pipe.lrange(_event_log_key(room_id), 0, -1)
+    pipe.get(_event_id_key(room_id))
+    entries, latest = pipe.execute()
+    events = [codec.loads(entry) for entry in reversed(entries)]
+    missed = [event for event in events if event["event_id"] > last_event_id]
+    latest = int(latest or 0)
+    expected = max(latest - last_event_id, 0)
+    return missed, len(missed) >= expected
+
+
+def forget_room_events(room_id):
+    get_redis_connection("default").delete(_event_log_key(room_id), _event_id_key(room_id))
+
+
+async def publish_room_event(room_id, event):
+    """Record `event` in the replay log and broadcast it to the room group."""
+    event = await sync_to_async(record_room_event)(room_id, event)
+    group = room_group_name(room_id)
+    with tracing.span("channels.group_send", {"channels.group": group}, kind=tracing.PRODUCER):
+        traceparent = tracing.current_traceparent()
+        # Only on the live broadcast; the replay log entry stays as recorded
+        message = {**event, "traceparent": traceparent} if traceparent else event
+        await get_channel_layer().group_send(group, message)
+    return event
@@ -0,0 +1,102 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q, Value
+from chatcampusapp.models import Room
+
+SEARCH_CONFIG = "english"
+MAX_QUERY_LENGTH = 100
+
+
+def normalize_query(q):
+    """
+    Canonical form of a homepage search so that "DevOps", " devops " and
+    "devops" share one cache entry. Matching is case-insensitive anyway.
+    """
+    return " ".join((q or "").split()).lower()[:MAX_QUERY_LENGTH]
+
+
+def search_enabled():
+    return connection.vendor == "postgresql"
+
+
+def room_search_vector(topic_name):
+    """
+    Expression for `Room.search_vector`. The topic name is passed in because
+    UPDATE statements cannot join, so callers resolve it up front.
+    """
+    return (SearchVector("room_name", weight="A", config=SEARCH_CONFIG) +
+            SearchVector(Value(topic_name or ""), weight="A", config=SEARCH_CONFIG) +
+            SearchVector("room_description", weight="B", config=SEARCH_CONFIG))
+
+
+def update_room_search_vectors(rooms, topic_name):
+    """Refresh the vectors of a Room queryset that shares `topic_name`."""
+    if search_enabled():
+        rooms.update(search_vector=room_search_vector(topic_name))
+
+
+def rebuild_room_search_vectors():
+    """Recompute every room's vector in one statement, e.g. after bulk loads."""
+    if not search_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE chatcampusapp_room AS r SET search_vector =
+                setweight(to_tsvector(%s::regconfig, coalesce(r.room_name, '')), 'A') ||
+                setweight(to_tsvector(%s::regconfig, coalesce(
+                    (SELECT t.topic_name FROM chatcampusapp_topic AS t WHERE t.id = r.topic_id), '')), 'A') ||
+                setweight(to_tsvector(%s::regconfig, coalesce(r.room_description, '')), 'B')
+        """, [SEARCH_CONFIG] * 3)
+        return cursor.rowcount
+
+
+def prefix_search_query(q):
+    # Every word must match as a prefix, so typing "dev" already finds "DevOps"
+    terms = re.findall(r"[^\W_]+", q)
+    if not terms:
+        return None
+    return SearchQuery(" & ".join(f"{term}:*" for term in terms),
+                       search_type="raw", config=SEARCH_CONFIG)
+
+
+def room_matches(q):
+    """Filter for the rooms a non-empty `q` finds; see search_rooms()."""
+    if not search_enabled():
+        return (Q(topic__topic_name__icontains=q) |
+                Q(room_name__icontains=q) |
+                Q(room_description__icontains=q))
+    query = prefix_search_query(q)
+    if query is None:
+        return Q(room_name__trigram_word_similar=q)
+    return Q(search_vector=query) | Q(room_name__trigram_word_similar=q)
+
+
+def search_rooms(queryset, q):
+    """
+    Filter rooms by `q`, best matches first. On PostgreSQL this uses the
+    maintained `search_vector` (GIN) plus trigram similarity on the room name
+    for typos; other databases fall back to substring matching.
+    """
+    if not q:
+        return queryset
+    if not search_enabled():
+        return queryset.filter(room_matches(q))
+
+    query = prefix_search_query(q)
+    rank = TrigramWordSimilarity(q, "room_name")
+    if query is not None:
+        rank = SearchRank(F("search_vector"), query) + rank
+    return (queryset.annotate(rank=rank)
+            .filter(room_matches(q))
+            .order_by("-rank", "-created_at"))
+
+
+def search_messages(queryset, q):
+    """
+    Recent messages from the rooms `q` finds, matched through the same
+    indexes as search_rooms() in a subquery.
+    """
+    if not q:
+        return queryset
+    return queryset.filter(room__in=Room.objects.filter(room_matches(q)))
@@ -0,0 +1,128 @@
+"""
+Admission and a memory budget for homepage search pages (homepage_cache_{q}).
+
+A search page is cached only once its query has been asked for
+SEARCH_ADMIT_MIN_HITS times within the last one to two
+SEARCH_ADMIT_WINDOW_SECONDS windows, counted in a count-min sketch kept in
+Redis (one hash per window, so old counts age out with the key), as in
+TinyLFU. One-off queries, typos and bot traffic are answered uncached rather
+than pushing hot RoomID/UserID entries out of Redis.
+
+Cached search pages are indexed with their size, and once they add up to
+more than SEARCH_CACHE_MAX_BYTES the least popular ones are deleted.
+"""
+import hashlib
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from chatcampusapp.utils import async_cache
+from chatcampusapp.utils.redis_tracking import POPULAR_QUERIES
+
+SKETCH_DEPTH = 4
+SIZES_KEY = "search_cache_sizes"
+EXPIRY_KEY = "search_cache_expiry"
+
+
+def cache_key(q):
+    return f"homepage_cache_{q}"
+
+
+def _cells(q):
+    """One sketch cell per row, from independent slices of one hash."""
+    digest = hashlib.blake2b(q.encode(), digest_size=4 * SKETCH_DEPTH).digest()
+    width = settings.SEARCH_SKETCH_WIDTH
+    return [f"{row}:{int.from_bytes(digest[4 * row:4 * row + 4], 'big') % width}"
+            for row in range(SKETCH_DEPTH)]
+
+
+def _queue_count(pipe, q, now):
+    window_seconds = settings.SEARCH_ADMIT_WINDOW_SECONDS
+    window = int(now // window_seconds)
+    current, previous = f"search_sketch:{window}", f"search_sketch:{window - 1}"
+    cells = _cells(q)
+    for cell in cells:
+        pipe.hincrby(current, cell, 1)
+    pipe.expire(current, 2 * window_seconds)
+    pipe.hmget(previous, cells)
+
+
+def _admitted(results):
+    current, previous = results[:SKETCH_DEPTH], results[-1]
+    # Count-min: collisions only ever inflate a cell, so the minimum is closest
+    estimate = min(count + int(old or 0) for count, old in zip(current, previous))
+    return estimate >= settings.SEARCH_ADMIT_MIN_HITS
+
+
+def admit(q, now=None):
+    """Count a cache miss for `q`; True once it is asked for often enough to cache."""
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    _queue_count(pipe, q, time.time() if now is None else now)
+    return _admitted(pipe.execute())
+
+
+async def aadmit(q):
+    if not async_cache.native_enabled():
+        return await sync_to_async(admit)(q)
+    async with async_cache._client().pipeline(transaction=False) as pipe:
+        _queue_count(pipe, q, time.time())
+        return _admitted(await pipe.execute())
+
+
+def record_entry(q, timeout, now=None):
+    """Index the search page just cached for `q`, then enforce the budget."""
+    redis = get_redis_connection("default")
+    now = time.time() if now is None else now
+    size = redis.strlen(cache.client.make_key(cache_key(q)))
+    pipe = redis.pipeline()
+    pipe.hset(SIZES_KEY, q, size)
+    pipe.zadd(EXPIRY_KEY, {q: now + timeout})
+    pipe.execute()
+    enforce_budget(now)
+
+
+def enforce_budget(now=None):
+    redis = get_redis_connection("default")
+    now = time.time() if now is None else now
+    expired = [q.decode() for q in redis.zrangebyscore(EXPIRY_KEY, "-inf", now)]
+    if expired:
+        _unindex(redis, expired)
+    sizes = {q.decode(): int(size) for q, size in redis.hgetall(SIZES_KEY).items()}
+    total = sum(sizes.values())
+    if total <= settings.SEARCH_CACHE_MAX_BYTES:
+        return []
+    pipe = redis.pipeline(transaction=False)
+    for q in sizes:
+        pipe.zscore(POPULAR_QUERIES, q)
+    popularity = dict(zip(sizes, pipe.execute()))
+    evicted = []
+    for q in sorted(sizes, key=lambda q: popularity[q] or 0):
+        if total <= settings.SEARCH_CACHE_MAX_BYTES:
+            break
+        total -= sizes[q]
+        evicted.append(q)
+    cache.delete_many([cache_key(q) for q in evicted])
+    _unindex(redis, evicted)
+    return evicted
+
+
+def cached_queries():
+    return [q.decode() for q in get_redis_connection("default").hkeys(SIZES_KEY)]
+
+
+def invalidate_all():
+    """Delete every cached search page."""
+    redis = get_redis_connection("default")
+    queries = cached_queries()
+    if queries:
+        cache.delete_many([cache_key(q) for q in queries])
+        _unindex(redis, queries)
+    return queries
+
+
+def _unindex(redis, queries):
+    pipe = redis.pipeline()
+    pipe.hdel(SIZES_KEY, *queries)
+    pipe.zrem(EXPIRY_KEY, *queries)
+    pipe.execute()
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from chatcampusapp.models import Room, Topic
+from chatcampusapp.utils import async_cache
+
+TOPICS_COUNT_KEY = "topics_count"
+TOPICS_COUNT_TTL_SECONDS = 3600
+
+
+def top_topics(limit=5):
+    """Most used topics, served by the (-room_count, topic_name) index."""
+    return Topic.objects.only("id", "topic_name", "room_count").order_by(
+        "-room_count", "topic_name")[:limit]
+
+
+def topics_count():
+    return cache.get_or_set(TOPICS_COUNT_KEY, Topic.objects.count,
+                            timeout=TOPICS_COUNT_TTL_SECONDS)
+
+
+async def atopics_count():
+    count = await async_cache.aget(TOPICS_COUNT_KEY)
+    if count is None:
+        count = await Topic.objects.acount()
+        await cache.aset(TOPICS_COUNT_KEY, count, timeout=TOPICS_COUNT_TTL_SECONDS)
+    return count
+
+
+def invalidate_topics_count():
+    transaction.on_commit(lambda: cache.delete(TOPICS_COUNT_KEY))
+
+
+def adjust_topic_room_count(topic_id, delta):
+    if topic_id:
+        Topic.objects.filter(pk=topic_id).update(
+            room_count=F("room_count") + delta)
+
+
+def recount_topic_rooms():
+    """Recompute every Topic.room_count, e.g. after bulk_create of rooms."""
+    room_counts = (Room.objects
+                   .filter(topic=OuterRef("pk"))
+                   .order_by()
+                   .values("topic")
+                   .annotate(total=Count("pk"))
+                   .values("total"))
+    updated = Topic.objects.update(
+        room_count=Coalesce(Subquery(room_counts[:1]), 0))
+    invalidate_topics_count()
+    return updated
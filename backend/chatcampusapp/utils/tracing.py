@@ -0,0 +1,254 @@
+"""
+Lightweight span tracing across HTTP requests, Celery tasks, cache and ORM
+calls and WebSocket events, so a slow response can be attributed per hop.
+
+The current span lives in a ContextVar. It crosses process boundaries as a
+W3C `traceparent` value: in Celery message headers and in channel-layer
+events. Sampling is decided once at the root (TRACING_SAMPLE_RATE) and the
+flag travels with the trace, so a trace is either complete or absent.
+
+Finished spans are buffered per process and appended to TRACING_EXPORT_PATH
+as OTLP/JSON lines, the format read by the OpenTelemetry Collector's
+`otlpjsonfile` receiver.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+logger = logging.getLogger("chatcampusapp")
+
+# OTLP SpanKind
+INTERNAL, SERVER, CLIENT, PRODUCER, CONSUMER = 1, 2, 3, 4, 5
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = ContextVar("trace_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "kind",
+                 "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name, trace_id, parent_id, sampled, kind=INTERNAL, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": otlp_value(value)}
+                           for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = {"code": 2, "message": self.error}
+        return span
+
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class FileExporter:
+    """Buffers finished spans and appends them as one OTLP/JSON line per flush."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = []
+        self.last_flush = time.monotonic()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+            if (len(self.spans) < settings.TRACING_BATCH_SIZE and
+                    time.monotonic() - self.last_flush < settings.TRACING_FLUSH_SECONDS):
+                return
+            spans = self._take()
+        self._write(spans)
+
+    def flush(self):
+        with self.lock:
+            spans = self._take()
+        self._write(spans)
+
+    def _take(self):
+        spans = self.spans
+        self.spans = []
+        self.last_flush = time.monotonic()
+        return spans
+
+    def _write(self, spans):
+        if not spans:
+            return
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": otlp_value(settings.TRACING_SERVICE_NAME)},
+                {"key": "process.pid", "value": otlp_value(os.getpid())},
+            ]},
+            "scopeSpans": [{"scope": {"name": "chatcampusapp"},
+                            "spans": [span.to_otlp() for span in spans]}],
+        }]})
+        try:
+            # One write per line; O_APPEND keeps lines from several processes whole
+            with open(settings.TRACING_EXPORT_PATH, "a") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Dropping {len(spans)} spans: {e}")
+
+
+_exporter = FileExporter()
+flush = _exporter.flush
+atexit.register(flush)
+
+
+def parse_traceparent(value):
+    """(trace_id, parent_span_id, sampled) from a traceparent string, or None."""
+    match = TRACEPARENT.match(value or "")
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def current_span():
+    return _current.get()
+
+
+def current_traceparent():
+    span = _current.get()
+    return span.traceparent if span is not None else None
+
+
+def begin(name, traceparent=None, kind=SERVER, attributes=None):
+    """
+    Start the span for one hop (a request, task or WebSocket event) and make
+    it current. The parent is `traceparent` when given, else the current
+    span; without either this starts a trace and rolls for sampling.
+    Returns a handle for `end()`, or None when tracing is off.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    parent = parse_traceparent(traceparent)
+    if parent is None and _current.get() is not None:
+        current = _current.get()
+        parent = current.trace_id, current.span_id, current.sampled
+    if parent is None:
+        parent = (f"{random.getrandbits(128):032x}", None,
+                  random.random() < settings.TRACING_SAMPLE_RATE)
+    trace_id, parent_id, sampled = parent
+    span = Span(name, trace_id, parent_id, sampled, kind, attributes)
+    return span, _current.set(span)
+
+
+def end(handle, error=None):
+    if handle is None:
+        return
+    span, token = handle
+    _current.reset(token)
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = error
+    if span.sampled:
+        _exporter.add(span)
+
+
+@contextmanager
+def trace(name, traceparent=None, kind=SERVER, attributes=None):
+    """`begin()`/`end()` as a context manager; yields the span or None."""
+    handle = begin(name, traceparent, kind, attributes)
+    try:
+        yield handle[0] if handle else None
+    except BaseException as e:
+        end(handle, error=repr(e))
+        raise
+    end(handle)
+
+
+@contextmanager
+def span(name, attributes=None, kind=INTERNAL):
+    """
+    Child span of the current one, for calls inside a hop (cache, SQL,
+    channel layer). Does nothing outside a sampled trace.
+    """
+    current = _current.get()
+    if current is None or not current.sampled or not settings.TRACING_ENABLED:
+        yield None
+        return
+    with trace(name, kind=kind, attributes=attributes) as child:
+        yield child
+
+
+def trace_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection in apps.py."""
+    current = _current.get()
+    if current is None or not current.sampled:
+        return execute(sql, params, many, context)
+    connection = context["connection"]
+    with span("db.query", {"db.system": connection.vendor, "db.name": connection.alias,
+                           "db.statement": sql[:2000]}, kind=CLIENT):
+        return execute(sql, params, many, context)
+
+
+def install_query_tracing(sender, connection, **kwargs):
+    # First in the list, so execute_wrapper() blocks keep popping their own
+    if trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, trace_query)
+
+
+# Celery signal handlers, connected in tasks.py
+_task_spans = {}
+
+
+def inject_task_headers(headers=None, **kwargs):
+    traceparent = current_traceparent()
+    if traceparent and headers is not None:
+        headers["traceparent"] = traceparent
+
+
+def task_span_started(task_id=None, task=None, **kwargs):
+    # Workers expose custom headers as request attributes, apply() keeps them
+    # under .headers; eager tasks without either join the caller's span
+    request = task.request
+    traceparent = getattr(request, "traceparent", None) or (request.headers or {}).get("traceparent")
+    _task_spans[task_id] = begin(f"task {task.name}", traceparent,
+                                 kind=CONSUMER, attributes={"celery.task_id": task_id})
+
+
+def task_span_finished(task_id=None, state=None, **kwargs):
+    handle = _task_spans.pop(task_id, None)
+    if handle is None:
+        return
+    handle[0].attributes["celery.state"] = state or "UNKNOWN"
+    end(handle, error=state if state == "FAILURE" else None)
@@ -1,18 +1,33 @@
-from django.db import connection
+import hmac
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.contrib.auth import get_user_model
-from .serializers import MessageMinimalSerializer, MessageProfileSerializer, MessageSerializer, RoomMinimalSerializer, RoomProfileSerializer, RoomSerializer, TopicSerializer, UserMinimalSerializer, UserSerializer
+from .serializers import MessageSerializer, RoomSerializer, TopicSerializer, UserMinimalSerializer, UserSerializer
 from .models import Message, Room, Topic
-from django.db.models import Count, Q
-import bleach
 from rest_framework_simplejwt.tokens import RefreshToken
 import requests
+import bleach
 from decouple import config
 from django.core.cache import cache
 from .tasks import warm_up_dashboard_view_cache, warm_up_room_detail_view_cache, warm_up_user_profile_view_cache
+from asgiref.sync import async_to_sync
+from .utils.room_events import publish_room_event
+from .utils.search import normalize_query
+from .utils.participants import room_participants
+from .pagination import ParticipantPagination
+from .payloads import compressed_room_detail_payload, homepage_payload, user_profile_payload
+from .db_routers import replica_reads
+from .utils.json_stream import CompressedJSON, CompressedJSONResponse
+from .utils.metrics import render_metrics
+from .utils.profiling import list_profiles, profile_path
+from .utils.redis_tracking import track_used_query, track_used_room_id, track_used_user_id
+from .utils import search_admission
 import time
 import logging
 logger = logging.getLogger("dashboard")
@@ -66,9 +81,15 @@ class UserRetrieveUpdateAPIView(APIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Everything RoomSerializer renders, in three queries
+def room_with_relations():
+    return Room.objects.select_related("owner", "topic").prefetch_related("participants")
+
+
 # Create Room and Topic create, list, get, update and delete
 class RoomUpdateRetrieveDeleteAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 3, "PATCH": 8, "DELETE": 12}
 
     def get(self, request, *args, **kwargs):
         """
@@ -77,7 +98,7 @@ class RoomUpdateRetrieveDeleteAPIView(APIView):
         """
         pk = kwargs["pk"]
         if pk:
-            room = get_object_or_404(Room, pk=pk)
+            room = get_object_or_404(room_with_relations(), pk=pk)
             serializer = RoomSerializer(room)
             return Response({
                 "message": "Room retrieve successfully",
@@ -95,7 +116,7 @@ class RoomUpdateRetrieveDeleteAPIView(APIView):
                 "message": "Room ID is required for the update."
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        room = get_object_or_404(Room, pk=pk)
+        room = get_object_or_404(room_with_relations(), pk=pk)
 
         if room.owner != request.user:
             return Response({
@@ -142,6 +163,7 @@ class RoomUpdateRetrieveDeleteAPIView(APIView):
 
 class RoomCreateAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 13
 
     def post(self, request):
         """
@@ -164,15 +186,15 @@ class RoomCreateAPIView(APIView):
 # Topic list
 class TopicListAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
     def get(self, request):
         q = self.request.GET.get("q", "")
         if q:
-            topics = Topic.objects.filter(topic_name__icontains=q).annotate(
-                room_count=Count('room_topic')).order_by('-room_count', 'topic_name')
+            topics = Topic.objects.filter(
+                topic_name__icontains=q).order_by('-room_count', 'topic_name')
         else:
-            topics = Topic.objects.all().annotate(
-                room_count=Count('room_topic')).order_by('-room_count', 'topic_name')
+            topics = Topic.objects.all().order_by('-room_count', 'topic_name')
         serializer = TopicSerializer(topics, many=True)
         return Response({
             "message": "Topics retrieve successfully",
@@ -183,6 +205,7 @@ class TopicListAPIView(APIView):
 # Room details and Message create and delete
 class RoomDetailMessageCreateAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 4, "POST": 9}
 
     def get(self, request, *args, **kwargs):
         pk = kwargs["pk"]
@@ -192,20 +215,14 @@ class RoomDetailMessageCreateAPIView(APIView):
                 return Response({
                     "message": "Room ID is required to get room details."
                 }, status=status.HTTP_400_BAD_REQUEST)
-            room = get_object_or_404(
-                Room.objects.select_related(
-                    "topic", "owner").prefetch_related("participants"), id=pk
-            )
-            messages = room.room_message.select_related(
-                "owner").order_by("created_at")
-            participants = room.participants.all()
-            data = {
-                "message": "Room details retrieve successfully",
-                "room": RoomProfileSerializer(room, context={"request": request}).data,
-                "messages": MessageProfileSerializer(messages, many=True, context={"request": request}).data,
-                "participants": UserMinimalSerializer(participants, many=True, context={"request": request}).data
-            }
+            with replica_reads(request.user.pk):
+                data = compressed_room_detail_payload(pk, request)
+            if data is None:
+                raise Http404("No Room matches the given query.")
             warm_up_room_detail_view_cache.delay(pk)
+        track_used_room_id(pk)
+        if isinstance(data, CompressedJSON):
+            return CompressedJSONResponse(data, request)
         return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
@@ -214,7 +231,8 @@ class RoomDetailMessageCreateAPIView(APIView):
             return Response({
                 "message": "Message ID is required to create message."
             }, status=status.HTTP_400_BAD_REQUEST)
-        room = get_object_or_404(Room, id=pk)
+        # The response's MessageSerializer renders the room's owner and topic
+        room = get_object_or_404(Room.objects.select_related("owner", "topic"), id=pk)
         user = request.user
         body = request.data.get("body", "").strip()
         if not body:
@@ -229,20 +247,48 @@ class RoomDetailMessageCreateAPIView(APIView):
         clean_body = bleach.clean(
             body, tags=allowed_tags, attributes=allowed_attrs)
 
-        message = Message.objects.create(
-            owner=user, room=room, body=clean_body)
+        with transaction.atomic():
+            message = Message.objects.create(
+                owner=user, room=room, body=clean_body)
+            room.participants.add(user)
 
-        room.participants.add(user)
+        serialized_message = MessageSerializer(message).data
+        # Let WebSocket and SSE subscribers of the room see REST-posted messages
+        async_to_sync(publish_room_event)(room.id, {
+            "type": "chat_message",
+            "message": serialized_message
+        })
 
         return Response({
             "message": "Message created successfully",
-            "messages": MessageSerializer(message).data
+            "messages": serialized_message
         }, status=status.HTTP_201_CREATED)
 
 
+# Paginated room participants; room details only embed the first page
+class RoomParticipantsAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        room = get_object_or_404(
+            Room.objects.only("id", "participants_count"), id=kwargs["pk"])
+        paginator = ParticipantPagination(count=room.participants_count)
+        participants = paginator.paginate_queryset(
+            room_participants(room), request, view=self)
+        return Response({
+            "message": "Room participants retrieve successfully",
+            "count": room.participants_count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "participants": UserMinimalSerializer(participants, many=True, context={"request": request}).data
+        }, status=status.HTTP_200_OK)
+
+
 # Message delete
 class MessageDeleteAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
 
     def delete(self, request, *args, **kwargs):
         """
@@ -256,12 +302,17 @@ class MessageDeleteAPIView(APIView):
 
         message = get_object_or_404(Message, pk=pk)
 
-        if request.user != message.owner:
+        if request.user.pk != message.owner_id:
             return Response({
                 "message": "Unauthorised to delete message."
             }, status=status.HTTP_403_FORBIDDEN)
 
+        room_id = message.room_id
         message.delete()
+        async_to_sync(publish_room_event)(room_id, {
+            "type": "chat_message_delete",
+            "message_id": pk,
+        })
         return Response({
             "message": "Message deleted successfully"
         }, status=status.HTTP_204_NO_CONTENT)
@@ -270,57 +321,33 @@ class MessageDeleteAPIView(APIView):
 # Homepage details
 class HomePageAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 5
 
     def get_queryset_data(self, q, request):
-        rooms = (Room.objects
-                 .filter(Q(topic__topic_name__icontains=q) |
-                         Q(room_name__icontains=q) |
-                         Q(room_description__icontains=q))
-                 .select_related("topic", "owner")
-                 .annotate(participants_count=Count("participants",
-                                                    # optional
-                                                    filter=Q(participants__is_active=True)))
-                 .only("id", "room_name", "created_at",
-                       "topic__id", "topic__topic_name",
-                       "owner__id", "owner__first_name", "owner__avatar")[:10])
-
-        messages = Message.objects.filter(
-            Q(room__topic__topic_name__icontains=q)
-        ).select_related("owner", "room").only("id", "body", "created_at",
-                                               "room__id", "room__room_name",
-                                               "owner__id", "owner__first_name", "owner__avatar")[:10]
-
-        all_topics = list(
-            Topic.objects.annotate(room_count=Count(
-                "room_topic")).order_by("-room_count")
-        )
-        topics = all_topics[:5]
-        return {
-            "message": "Homepage details retrieved successfully.",
-            "rooms": RoomMinimalSerializer(rooms, many=True, context={"request": request}).data,
-            "topics": TopicSerializer(topics, many=True).data,
-            "topics_count": len(all_topics),
-            "room_messages": MessageMinimalSerializer(messages, many=True, context={"request": request}).data,
-        }
+        with replica_reads(request.user.pk):
+            return homepage_payload(q, request)
 
     def get(self, request):
         t0 = time.perf_counter()
-        q = request.GET.get("q", "").strip()
+        q = normalize_query(request.GET.get("q", ""))
         cache_key = f'homepage_cache_{q}' if q else 'homepage_cache'
 
         data = cache.get(cache_key)
+        track_used_query(q)
 
         if not data:
             data = self.get_queryset_data(q, request)
-            warm_up_dashboard_view_cache.delay(q)
-        logger.info("Dashboard prod %.0f ms | queries %d",
-                    (time.perf_counter()-t0)*1000, len(connection.queries))
+            # Search pages are only cached once the query repeats
+            if not q or search_admission.admit(q):
+                warm_up_dashboard_view_cache.delay(q)
+        logger.info("Dashboard prod %.0f ms", (time.perf_counter()-t0)*1000)
         return Response(data, status=status.HTTP_200_OK)
 
 
 # UserProfile
 class UserProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
 
     def get(self, request, *args, **kwargs):
         t0 = time.perf_counter()
@@ -331,36 +358,13 @@ class UserProfileAPIView(APIView):
                 return Response({
                     "message": "User ID is required to get user profile."
                 }, status=status.HTTP_400_BAD_REQUEST)
-            user = get_object_or_404(
-                User.objects.only('id', 'avatar', "first_name"), id=pk)
-            rooms = (Room.objects
-                     .filter(owner=user)
-                     .select_related("topic", "owner")          # 1 query
-                     .annotate(participants_count=Count("participants")).only("id", "room_name", "room_description", "created_at",
-                                                                              "topic__id", "topic__topic_name",
-                                                                              "owner__id", "owner__first_name", "owner__avatar")[:10])
-            messages = (Message.objects
-                        .filter(owner=user)
-                        .select_related("room", "owner")
-                        .only("id", "body", "created_at",
-                              "room__id", "room__room_name",
-                              "owner__id", "owner__first_name", "owner__avatar")[:8])
-            all_topics = (Topic.objects
-                          .annotate(room_count=Count("room_topic"))
-                          .order_by("-room_count"))
-            topics_count = len(all_topics)
-            topics = all_topics[:5]
-            data = {
-                "message": "User profile retrieve successfully",
-                "user": UserMinimalSerializer(user, context={"request": request}).data,
-                "rooms": RoomMinimalSerializer(rooms, many=True, context={"request": request}).data,
-                "room_messages": MessageMinimalSerializer(messages, many=True, context={"request": request}).data,
-                "topics": TopicSerializer(topics, many=True).data,
-                "topics_count": topics_count,
-            }
+            with replica_reads(request.user.pk):
+                data = user_profile_payload(pk, request)
+            if data is None:
+                raise Http404("No User matches the given query.")
             warm_up_user_profile_view_cache.delay(pk)
-        logger.info("UserProfile prod %.0f ms | queries %d",
-                    (time.perf_counter()-t0)*1000, len(connection.queries))
+        track_used_user_id(pk)
+        logger.info("UserProfile prod %.0f ms", (time.perf_counter()-t0)*1000)
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -403,3 +407,40 @@ class GoogleAuthAPIView(APIView):
             "email": user.email,
             "first_name": user.first_name,
         })
+
+
+# Prometheus scrape endpoint; off unless METRICS_TOKEN is set, except in DEBUG
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        raise Http404()
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Saved profiles (utils/profiling.py), for staff only
+class ProfileListAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        profiles = [{
+            "name": entry.name,
+            "kind": entry.name.split("-")[2],
+            "size": entry.stat().st_size,
+            "created_at": datetime.fromtimestamp(entry.stat().st_mtime, tz=dt_timezone.utc),
+        } for entry in list_profiles()[:50]]
+        return Response({
+            "message": "Profiles retrieved successfully",
+            "profiles": profiles
+        }, status=status.HTTP_200_OK)
+
+
+class ProfileDownloadAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, name):
+        path = profile_path(name)
+        if path is None:
+            raise Http404()
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 import dj_database_url
 import os
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'chatcampusapp',
     'allauth',
     'allauth.account',
@@ -62,15 +63,22 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chatcampusapp.middleware.TracingMiddleware',
+    'chatcampusapp.middleware.MetricsMiddleware',
+    'chatcampusapp.middleware.TrackingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'chatcampusapp.middleware.Immediate500Logger',
+    'chatcampusapp.middleware.ProfilingMiddleware',
+    'chatcampusapp.middleware.QueryBudgetMiddleware',
     'django.middleware.gzip.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, with an async path so async views stay on the event loop
+    'chatcampusapp.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'chatcampusapp.middleware.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -124,6 +132,23 @@ DATABASES["default"]["OPTIONS"] = {
     }
 }
 
+# Read replicas, as comma-separated database URLs. Only payload reads inside
+# chatcampusapp.db_routers.replica_reads() blocks are sent to them; a write
+# pins reads to the primary for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for index, url in enumerate(config("DATABASE_REPLICA_URLS", default="", cast=Csv()), start=1):
+    alias = f"replica{index}"
+    DATABASES[alias] = dj_database_url.parse(
+        url, conn_max_age=0, ssl_require=not DEBUG and url.startswith("postgres"))
+    if DATABASES[alias]["ENGINE"] == DATABASES["default"]["ENGINE"]:
+        DATABASES[alias]["OPTIONS"] = DATABASES["default"]["OPTIONS"]
+    # Tests read replicas through the primary's test database
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["chatcampusapp.db_routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = config("DATABASE_REPLICA_STICKY_SECONDS", default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -178,12 +203,91 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        "drf_orjson_renderer.renderers.ORJSONRenderer",
+        "chatcampusapp.renderers.FastJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        "chatcampusapp.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Build read payloads from values_list() rows (chatcampusapp.projections)
+# instead of instantiating models for the DRF serializers
+FAST_PROJECTIONS = config("DJANGO_FAST_PROJECTIONS", default=True, cast=bool)
+
+# Serve the homepage, room details and user profile GETs from the async views
+# in chatcampusapp/async_views.py (requires running under ASGI to pay off)
+ASYNC_READ_VIEWS = config("DJANGO_ASYNC_READ_VIEWS", default=True, cast=bool)
+# Let those views read django-redis entries through redis.asyncio
+ASYNC_REDIS_CACHE = config("DJANGO_ASYNC_REDIS_CACHE", default=True, cast=bool)
+
+# JSON backend for chatcampusapp.utils.codec: "orjson" or "json" (stdlib)
+JSON_CODEC = config("DJANGO_JSON_CODEC", default="orjson")
+
+# Cached payloads (chatcampusapp/cache_serializers.py): "json" or "msgpack", and
+# once larger than CACHE_COMPRESS_MIN_BYTES compressed with "zlib", "zstd" or
+# "lz4" (optional packages; zlib is used when they are missing), or "none".
+# Entries in any earlier format still load, and entries whose compressor isn't
+# installed in this process are cache misses. Every process sharing the cache
+# needs the chosen package. Compare them with `manage.py benchmark cachecodec`.
+CACHE_FORMAT = config("DJANGO_CACHE_FORMAT", default="json")
+CACHE_COMPRESSOR = config("DJANGO_CACHE_COMPRESSOR", default="zlib")
+CACHE_COMPRESS_MIN_BYTES = config("DJANGO_CACHE_COMPRESS_MIN_BYTES", default=1024, cast=int)
+
+# Cache warming (chatcampusapp/utils/redis_tracking.py): reads score pages in
+# decaying sorted sets, and each invalidation re-warms only the top N queries,
+# rooms and users; the rest are rebuilt on their next read. Members unread for
+# TRACKING_IDLE_SECONDS are dropped
+TRACKING_HALF_LIFE_SECONDS = config("DJANGO_TRACKING_HALF_LIFE_SECONDS", default=600, cast=float)
+TRACKING_MIN_SCORE = config("DJANGO_TRACKING_MIN_SCORE", default=0.05, cast=float)
+TRACKING_MAX_MEMBERS = config("DJANGO_TRACKING_MAX_MEMBERS", default=5000, cast=int)
+TRACKING_IDLE_SECONDS = config("DJANGO_TRACKING_IDLE_SECONDS", default=6 * 3600, cast=int)
+WARM_TOP_QUERIES = config("DJANGO_WARM_TOP_QUERIES", default=20, cast=int)
+WARM_TOP_ROOMS = config("DJANGO_WARM_TOP_ROOMS", default=50, cast=int)
+WARM_TOP_USERS = config("DJANGO_WARM_TOP_USERS", default=50, cast=int)
+# Rooms and users re-warmed per batched task
+WARM_CHUNK_SIZE = config("DJANGO_WARM_CHUNK_SIZE", default=100, cast=int)
+
+# Search pages (chatcampusapp/utils/search_admission.py) are cached only after
+# SEARCH_ADMIT_MIN_HITS misses within one to two windows, counted in a Redis
+# count-min sketch, and the least popular are evicted once all cached search
+# pages pass SEARCH_CACHE_MAX_BYTES
+SEARCH_ADMIT_MIN_HITS = config("DJANGO_SEARCH_ADMIT_MIN_HITS", default=2, cast=int)
+SEARCH_ADMIT_WINDOW_SECONDS = config("DJANGO_SEARCH_ADMIT_WINDOW_SECONDS", default=600, cast=int)
+SEARCH_SKETCH_WIDTH = config("DJANGO_SEARCH_SKETCH_WIDTH", default=8192, cast=int)
+SEARCH_CACHE_MAX_BYTES = config("DJANGO_SEARCH_CACHE_MAX_BYTES", default=32 * 1024 * 1024, cast=int)
+
+# Room detail payloads are streamed into gzip (chatcampusapp/utils/json_stream.py)
+# this many messages at a time, and cached and served compressed
+PAYLOAD_CHUNK_SIZE = config("DJANGO_PAYLOAD_CHUNK_SIZE", default=2000, cast=int)
+PAYLOAD_GZIP_LEVEL = config("DJANGO_PAYLOAD_GZIP_LEVEL", default=6, cast=int)
+
+# Query budgets (chatcampusapp/utils/query_budget.py): the same SQL shape run
+# this many times in one request or task is reported as a likely N+1, and
+# strict mode raises instead of logging
+QUERY_REPEAT_THRESHOLD = config("DJANGO_QUERY_REPEAT_THRESHOLD", default=3, cast=int)
+QUERY_BUDGET_STRICT = config("DJANGO_QUERY_BUDGET_STRICT", default=False, cast=bool)
+
+# Prometheus metrics (chatcampusapp/utils/metrics.py), kept in Redis and served
+# at /api/metrics/ to scrapers sending "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = config("DJANGO_METRICS_ENABLED", default=True, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+# How long WebSocket event counts are summed in-process before being written
+METRICS_FLUSH_SECONDS = config("DJANGO_METRICS_FLUSH_SECONDS", default=5, cast=int)
+
+# Span tracing (chatcampusapp/utils/tracing.py). A sampled share of requests,
+# tasks and WebSocket events is traced through cache, SQL and Celery hops and
+# written as OTLP/JSON lines for the OpenTelemetry Collector's file receiver
+TRACING_ENABLED = config("DJANGO_TRACING_ENABLED", default=False, cast=bool)
+TRACING_SAMPLE_RATE = config("DJANGO_TRACING_SAMPLE_RATE", default=0.01, cast=float)
+TRACING_EXPORT_PATH = config("DJANGO_TRACING_EXPORT_PATH", default=os.path.join(BASE_DIR, "logs", "traces.jsonl"))
+TRACING_SERVICE_NAME = config("DJANGO_TRACING_SERVICE_NAME", default="chatcampus")
+TRACING_BATCH_SIZE = config("DJANGO_TRACING_BATCH_SIZE", default=512, cast=int)
+TRACING_FLUSH_SECONDS = config("DJANGO_TRACING_FLUSH_SECONDS", default=5, cast=int)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'ChatCampus API',
     'DESCRIPTION': 'DRF with SSO for ChatCampus',
@@ -261,6 +365,7 @@ CHANNEL_LAYERS = {
             'hosts': [config("REDIS_URL")],
             "capacity": 5000,
             "expiry": 30,
+            "serializer_format": "codec",
             "symmetric_encryption_keys": [config("SECRET_KEY")],
         }
     }
@@ -279,7 +384,8 @@ if not DEBUG:
             'BACKEND': 'django_redis.cache.RedisCache',
             'LOCATION': f'{config('REDIS_URL')}',
             'OPTIONS': {
-                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'CLIENT_CLASS': 'chatcampusapp.cache_clients.InstrumentedClient',
+                'SERIALIZER': 'chatcampusapp.cache_serializers.CodecSerializer',
             }
         }
     }
@@ -298,7 +404,8 @@ if DEBUG:
             'BACKEND': 'django_redis.cache.RedisCache',
             'LOCATION': 'redis://127.0.0.1:6379/1',
             'OPTIONS': {
-                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'CLIENT_CLASS': 'chatcampusapp.cache_clients.InstrumentedClient',
+                'SERIALIZER': 'chatcampusapp.cache_serializers.CodecSerializer',
             }
         }
     }
@@ -308,6 +415,18 @@ LOG_DIR = os.path.join(BASE_DIR, 'logs')
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+# On-demand profiling (chatcampusapp/utils/profiling.py) of requests, Celery
+# tasks and ChatRoom events that carry a signature from
+# `manage.py profile_signature` or win the sample rate. Mode is "cprofile"
+# (.prof for pstats) or "sampling" (folded stacks for flame graphs)
+PROFILING_ENABLED = config("DJANGO_PROFILING_ENABLED", default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config("DJANGO_PROFILING_SAMPLE_RATE", default=0.0, cast=float)
+PROFILING_MODE = config("DJANGO_PROFILING_MODE", default="cprofile")
+PROFILING_INTERVAL_MS = config("DJANGO_PROFILING_INTERVAL_MS", default=5, cast=int)
+PROFILING_SIGNATURE_MAX_AGE = config("DJANGO_PROFILING_SIGNATURE_MAX_AGE", default=600, cast=int)
+PROFILING_DIR = os.path.join(LOG_DIR, "profiles")
+PROFILING_KEEP = config("DJANGO_PROFILING_KEEP", default=200, cast=int)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -365,6 +484,12 @@ LOGGING = {
             "handlers": ["console", "file"],
             "level": "DEBUG",
             "propagate": False,
+        },
+        # Query budget warnings; per-request counts are logged at DEBUG
+        "chatcampusapp.queries": {
+            "handlers": ["console", "file"],
+            "level": "INFO",
+            "propagate": False,
         }
     }
 }
@@ -15,3 +15,6 @@ export const updateRoomById = (id: string, data: RoomCreateData) =>
 export const deleteRoom = (id: number) => api.delete(`rooms/${id}/`);
 
 export const getRoomDetail = (id: string) => api.get(`roomDetails/${id}/`);
+
+export const getRoomParticipants = (id: string, page: number) =>
+  api.get(`roomParticipants/${id}/`, { params: { page } });
@@ -0,0 +1,107 @@
+import { useQueryClient } from "@tanstack/react-query";
+import { useEffect } from "react";
+import type { Message } from "types/Message.types";
+import type { Room } from "types/Room.types";
+import type { Topic } from "types/Topic.types";
+import { getAccessToken } from "../utils/tokenStorage";
+
+const WS_URL = import.meta.env.VITE_WEBSOCKET_URL;
+const MAX_ROOMS = 10;
+const MAX_MESSAGES = 10;
+const MAX_TOPICS = 5;
+const RECONNECT_MIN_DELAY_MS = 1000;
+const RECONNECT_MAX_DELAY_MS = 30000;
+
+const applyTopicCount = (topics: Topic[], update: any): Topic[] => {
+  const others = topics.filter((t) => t.id !== update.id);
+  const updated = [...others, { id: update.id, topic_name: update.topic_name, room_count: update.room_count }];
+  return updated.sort((a, b) => b.room_count - a.room_count).slice(0, MAX_TOPICS);
+};
+
+// Keeps the unfiltered dashboard snapshot current from server-pushed diffs
+const useDashboardWebSocket = (enabled: boolean) => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    const queryKey = ["dashboardDetails", ""];
+    let socket: WebSocket;
+    let lastEventId: number | null = null;
+    let reconnectDelay = RECONNECT_MIN_DELAY_MS;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    // Events sent while we weren't subscribed are lost, so the snapshot is
+    // refetched whenever a subscription starts (the server joins us to the
+    // group on auth_success) or the connection drops
+    const connect = () => {
+      socket = new WebSocket(`${WS_URL}/ws/dashboard/`);
+      lastEventId = null;
+
+      socket.onopen = () => {
+        reconnectDelay = RECONNECT_MIN_DELAY_MS;
+        socket.send(
+          JSON.stringify({ action: "Auth_Check", token: getAccessToken() })
+        );
+      };
+      socket.onmessage = (e) => {
+        const update = JSON.parse(e.data);
+        if (update.type === "auth_success") {
+          queryClient.invalidateQueries({ queryKey });
+          return;
+        }
+        if (update.type !== "dashboard_update") return;
+
+        // A skipped event means our snapshot is stale; fetch a fresh one
+        if (lastEventId !== null && update.event_id !== lastEventId + 1) {
+          queryClient.invalidateQueries({ queryKey });
+        }
+        lastEventId = update.event_id;
+
+        queryClient.setQueryData(queryKey, (old: any) => {
+          if (!old) return old;
+          const data = update.data;
+          switch (update.kind) {
+            case "room_created":
+              return { ...old, rooms: [data, ...old.rooms].slice(0, MAX_ROOMS) };
+            case "room_deleted":
+              return { ...old, rooms: old.rooms.filter((r: Room) => r.id !== data.id) };
+            case "message_created":
+              return {
+                ...old,
+                room_messages: [data, ...old.room_messages].slice(0, MAX_MESSAGES),
+              };
+            case "message_deleted":
+              return {
+                ...old,
+                room_messages: old.room_messages.filter((m: Message) => m.id !== data.id),
+              };
+            case "topic_count":
+              return { ...old, topics: applyTopicCount(old.topics, data) };
+            case "topics_count":
+              return { ...old, topics_count: old.topics_count + data.delta };
+            default:
+              return old;
+          }
+        });
+      };
+      socket.onerror = (error) => console.error("Websocket error: ", error);
+      socket.onclose = () => {
+        if (closed) return;
+        queryClient.invalidateQueries({ queryKey });
+        reconnectTimer = setTimeout(connect, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, RECONNECT_MAX_DELAY_MS);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      socket.close();
+    };
+  }, [enabled, queryClient]);
+};
+
+export default useDashboardWebSocket;
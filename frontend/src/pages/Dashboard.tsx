@@ -10,6 +10,7 @@ import { useQuery } from "@tanstack/react-query";
 import TopicsSideBarSkeleton from "../components/TopicsSideBarSkeleton";
 import RoomDetailsCardSkeleton from "../components/RoomDetailsCardSkeleton";
 import ActivityCardSkeleton from "../components/ActivityCardSkeleton";
+import useDashboardWebSocket from "../hooks/useDashboardWebSocket";
 
 import { memo } from "react";
 
@@ -25,10 +26,13 @@ const Dashboard = () => {
   const { data, isLoading } = useQuery({
     queryKey: ["dashboardDetails", q],
     queryFn: () => dashboardDetails(urlQuery).then((res) => res.data),
-    staleTime: 5 * 60 * 1000,
-    refetchInterval: 5 * 60 * 1000,
+    // The unfiltered view is kept current over the dashboard WebSocket, which
+    // also refetches it whenever it (re)subscribes or its connection drops
+    staleTime: q ? 5 * 60 * 1000 : Infinity,
+    refetchInterval: q ? 5 * 60 * 1000 : false,
     refetchOnWindowFocus: false,
   });
+  useDashboardWebSocket(!q);
 
   const topics: Topic[] = data?.topics ?? [];
   const topicsCount: number = data?.topics_count ?? 0;
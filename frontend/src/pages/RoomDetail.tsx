@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Link, useNavigate, useParams } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
 import type { UserType } from "../types/User.types";
@@ -7,7 +7,7 @@ import type { Message } from "../types/Message.types";
 import defaultAvatar from "../assets/avatar.svg";
 import { formatDistanceToNow } from "date-fns";
 import ConfirmModal from "../components/ConfirmModal";
-import { deleteRoom } from "../api/room";
+import { deleteRoom, getRoomParticipants } from "../api/room";
 import Toast from "../components/Toast";
 import useRoomWebSocket from "../hooks/useRoomWebSocket";
 import useRoom from "../hooks/useRoom";
@@ -23,12 +23,42 @@ const RoomDetail = () => {
     useState<boolean>(false);
   const [messageToDelete, setMessageToDelete] = useState<Message | null>(null);
   const [error, setError] = useState<string[] | null>(null);
+  // Participants beyond the first page embedded in the room details
+  const [moreParticipants, setMoreParticipants] = useState<UserType[]>([]);
+  const [participantsPage, setParticipantsPage] = useState<number>(1);
+  const [hasMoreParticipants, setHasMoreParticipants] = useState<boolean>(true);
 
   const { data, isLoading } = useRoom(id);
   const { send } = useRoomWebSocket(id);
 
-  const participants: UserType[] = data?.participants ?? [];
+  // Start paging again from the embedded first page on a new room or a
+  // refetch; WebSocket updates only replace the messages
+  useEffect(() => {
+    setMoreParticipants([]);
+    setParticipantsPage(1);
+    setHasMoreParticipants(true);
+  }, [id, data?.participants]);
+
   const roomsDetails: Room = data?.room ?? {};
+  const participants: UserType[] = [
+    ...(data?.participants ?? []),
+    ...moreParticipants,
+  ];
+  const participantsCount: number =
+    roomsDetails?.participants_count ?? participants.length;
+
+  const loadMoreParticipants = async () => {
+    if (!id) return;
+    try {
+      const nextPage = participantsPage + 1;
+      const response = await getRoomParticipants(id, nextPage);
+      setMoreParticipants((prev) => [...prev, ...response.data.participants]);
+      setParticipantsPage(nextPage);
+      setHasMoreParticipants(!!response.data.next);
+    } catch (error) {
+      console.error("Error while loading room participants", error);
+    }
+  };
   const roomMessages: Message[] = data?.messages ?? [];
 
   const isHost = user?.id === roomsDetails?.owner?.id;
@@ -261,7 +291,7 @@ const RoomDetail = () => {
       <div className="w-full lg:w-[30%] bg-[#3f4156] rounded-lg shadow flex flex-col max-h-screen overflow-hidden">
         <div className="px-4 py-3 bg-[#696d97] border-b border-[#e0e0e0]">
           <h3 className="text-white text-base font-semibold">
-            PARTICIPANTS ({participants?.length} Joined)
+            PARTICIPANTS ({participantsCount} Joined)
           </h3>
         </div>
 
@@ -287,6 +317,15 @@ const RoomDetail = () => {
               </div>
             </div>
           ))}
+          {hasMoreParticipants && participants.length < participantsCount && (
+            <button
+              type="button"
+              onClick={loadMoreParticipants}
+              className="w-full py-2 text-sm text-[#71c6dd] hover:underline"
+            >
+              Show more participants
+            </button>
+          )}
         </div>
       </div>
     </div>